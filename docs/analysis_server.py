@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Local HTTP analysis service for the climate visualization generator
+
+Keeps one process warm so many clients (e.g. the web app, instead of
+calling NASA POWER from every browser) share the same fetches. Parsed
+series stay in the generator's in-memory LRU caches and every response
+body (JSON or PNG) is kept in an LRU cache of its own. Identical
+requests that arrive while the first one is still running wait for its
+result instead of starting another upstream fetch or render.
+
+Endpoints (GET, CORS enabled):
+    /health                        cache statistics
+    /figures                       figure names and the inputs they need
+    /series?lat=&lon=[&month=&day=]
+                                   daily series (whole calendar, or one date)
+    /evaluate?lat=&lon=&month=&day=[&hour=]
+                                   criteria results (see evaluate_location)
+    /figure/<name>.png?lat=&lon=&month=&day=[&hour=]
+                                   one rendered figure
+
+/evaluate and /figure also take pool_days, pool_weighting, name and any
+CLIMATE_CRITERIA key (e.g. temp_max=33, humidity_max=none) as overrides.
+
+Usage:
+python analysis_server.py --port 8000
+curl "http://127.0.0.1:8000/evaluate?lat=-22.9&lon=-43.17&month=12&day=25"
+"""
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import matplotlib
+matplotlib.use('Agg')
+
+import generate_visualizations as gv
+from climate_series import day_of_year
+from memory_cache import LRUCache
+from power_cache import snap_to_grid
+
+SERVER_CONFIG = {
+    'host': '127.0.0.1',
+    'port': 8000,
+    'export': 'draft',       # Export profile of /figure responses (must include PNG)
+    'response_cache': 256,   # JSON/PNG response bodies kept in memory
+    'max_age': 3600          # Cache-Control max-age of successful responses (seconds)
+}
+
+
+class BadRequest(ValueError):
+    """Invalid or missing query parameter (HTTP 400)"""
+
+
+class NotFound(LookupError):
+    """Unknown endpoint or figure (HTTP 404)"""
+
+
+def _number(query, key, kind=float, default=None, required=True):
+    if key not in query:
+        if required and default is None:
+            raise BadRequest(f"Missing query parameter '{key}'")
+        return default
+    try:
+        return kind(query[key])
+    except ValueError:
+        raise BadRequest(f"Query parameter '{key}' must be {'an integer' if kind is int else 'a number'}")
+
+
+def parse_request(query, need_date=True):
+    """
+    Normalized request parameters from a query dict
+
+    Returns a dict with latitude, longitude, month, day, hour, name,
+    criteria and pooling; raises BadRequest on invalid values.
+    """
+    latitude = _number(query, 'lat')
+    longitude = _number(query, 'lon')
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise BadRequest("lat must be within [-90, 90] and lon within [-180, 180]")
+
+    params = {'latitude': latitude, 'longitude': longitude, 'month': None, 'day': None, 'hour': None}
+    if need_date or 'month' in query or 'day' in query:
+        params['month'] = _number(query, 'month', int)
+        params['day'] = _number(query, 'day', int)
+        try:
+            day_of_year(params['month'], params['day'])
+        except ValueError:
+            raise BadRequest(f"Invalid date {params['month']}/{params['day']}")
+    hour = _number(query, 'hour', int, required=False)
+    if hour is not None and not 0 <= hour <= 23:
+        raise BadRequest("hour must be within 0-23")
+    params['hour'] = hour
+
+    criteria = dict(gv.CLIMATE_CRITERIA)
+    for key in gv.CLIMATE_CRITERIA:
+        if key in query:
+            criteria[key] = None if query[key].lower() == 'none' else _number(query, key)
+    params['criteria'] = criteria
+
+    pooling = dict(gv.POOLING_CONFIG)
+    pooling['days'] = _number(query, 'pool_days', int, default=pooling['days'])
+    pooling['weighting'] = query.get('pool_weighting', pooling['weighting'])
+    if pooling['days'] < 0 or pooling['weighting'] not in gv.WINDOW_WEIGHTS:
+        raise BadRequest(f"pool_days must be >= 0 and pool_weighting one of {', '.join(gv.WINDOW_WEIGHTS)}")
+    params['pooling'] = pooling
+
+    params['name'] = query.get('name') or f'{latitude:.2f}, {longitude:.2f}'
+    return params
+
+
+class AnalysisService:
+    """
+    Request handling shared by all server threads
+
+    Args:
+        export: Export profile used to render /figure responses
+        response_cache: Response bodies kept in memory
+    """
+
+    def __init__(self, export=None, response_cache=None):
+        self.export = export or SERVER_CONFIG['export']
+        if 'png' not in [fmt for fmt, _ in gv.export_formats(self.export)]:
+            raise ValueError(f"Export profile '{self.export}' does not produce PNG")
+        self.responses = LRUCache(response_cache or SERVER_CONFIG['response_cache'])
+        # pyplot is not thread-safe: figures are rendered one at a time
+        self.render_lock = threading.Lock()
+        self.output_dir = tempfile.mkdtemp(prefix='climate-figures-')
+        self.started = time.time()
+        self.figures = {name: arg_names for name, _, arg_names, _ in gv.FIGURES}
+
+    def handle(self, path, query):
+        """
+        Return (body bytes, content type, cache state) for a GET request
+
+        cache state is 'hit' when the body came from the response cache
+        or from an identical request running at the same time.
+        """
+        if path == '/health':
+            return self._json(self.health()), 'application/json', 'none'
+        if path == '/figures':
+            return self._json({name: list(args) for name, args in self.figures.items()}), 'application/json', 'none'
+
+        if path == '/series':
+            params = parse_request(query, need_date=False)
+            compute, content_type = (lambda: self._json(self.series(params))), 'application/json'
+        elif path == '/evaluate':
+            params = parse_request(query)
+            compute, content_type = (lambda: self._json(self.evaluate(params))), 'application/json'
+        elif path.startswith('/figure/') and path.endswith('.png'):
+            name = path[len('/figure/'):-len('.png')]
+            if name not in self.figures:
+                raise NotFound(f"Unknown figure '{name}' (see /figures)")
+            params = parse_request(query)
+            compute, content_type = (lambda: self.render(name, params)), 'image/png'
+        else:
+            raise NotFound(f"Unknown endpoint '{path}'")
+
+        computed = []
+
+        def run():
+            computed.append(True)
+            return compute()
+
+        key = (path, json.dumps(params, sort_keys=True))
+        body = self.responses.get_or_compute(key, run)
+        return body, content_type, 'miss' if computed else 'hit'
+
+    @staticmethod
+    def _json(data):
+        return json.dumps(data).encode()
+
+    def health(self):
+        caches = {
+            'responses': self.responses.stats(),
+            'daily_series': gv._daily_series.stats(),
+            'hourly_months': gv._hourly_months.stats()
+        }
+        power_cache = gv.get_response_cache()
+        if power_cache is not None:
+            caches['power_responses'] = power_cache.stats()
+        return {'status': 'ok', 'uptime_s': round(time.time() - self.started, 1), 'caches': caches}
+
+    def series(self, params):
+        series = gv.fetch_daily_series(params['latitude'], params['longitude'])
+        result = {
+            'latitude': params['latitude'],
+            'longitude': params['longitude'],
+            'cell': list(snap_to_grid(params['latitude'], params['longitude'])),
+            'years': series.years.tolist()
+        }
+        if params['month'] is None:
+            result['dates'] = [f'{m:02d}-{d:02d}' for m, d in gv.calendar_dates()]
+            result['values'] = {col: [gv._json_list(row) for row in series.values(col)] for col in series.data}
+        else:
+            doy = day_of_year(params['month'], params['day'])
+            result['date'] = f"{params['month']:02d}-{params['day']:02d}"
+            result['values'] = {col: gv._json_list(series.values(col)[:, doy]) for col in series.data}
+        return result
+
+    def evaluate(self, params):
+        return gv.evaluate_location(params['latitude'], params['longitude'], params['month'], params['day'],
+                                    params['hour'], criteria=params['criteria'], pooling=params['pooling'])
+
+    def render(self, name, params):
+        """Render one figure for the request and return the PNG bytes"""
+        latitude, longitude = params['latitude'], params['longitude']
+        month, day, hour = params['month'], params['day'], params['hour']
+        arg_names = self.figures[name]
+
+        series = gv.fetch_daily_series(latitude, longitude)
+        hourly = None
+        if hour is not None or 'hourly' in arg_names:
+            hourly = gv.fetch_hourly_month(latitude, longitude, month)
+        df = series.for_date(month, day) if hour is None else hourly.for_hour(day, hour)
+        if len(df) == 0:
+            raise RuntimeError("No complete years of data for this date")
+
+        ctx = gv.default_context()
+        ctx.update(location={'latitude': latitude, 'longitude': longitude, 'name': params['name']},
+                   event_date={'month': month, 'day': day, 'hour': hour},
+                   criteria=params['criteria'], pooling=params['pooling'],
+                   export=self.export, output_dir=self.output_dir, reuse_figures=True)
+        grid = None
+        if 'grid' in arg_names:
+            grid = gv.fetch_grid(ctx['grid']['bbox'], ctx['grid']['resolution'], month, day, ctx['criteria'])
+
+        inputs = gv.figure_inputs(df, series, ctx, grid, hourly)
+        func = next(func for figure, func, _, _ in gv.FIGURES if figure == name)
+        with self.render_lock:
+            func(*(inputs[arg] for arg in arg_names), ctx=ctx)
+            with open(f'{self.output_dir}/{name}.png', 'rb') as f:
+                return f.read()
+
+
+class AnalysisHandler(BaseHTTPRequestHandler):
+    server_version = 'ClimateAnalysis/1.0'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        cache_state = 'none'
+        try:
+            body, content_type, cache_state = self.server.service.handle(url.path.rstrip('/') or '/', query)
+            status = 200
+        except BadRequest as e:
+            status, body, content_type = 400, json.dumps({'error': str(e)}).encode(), 'application/json'
+        except NotFound as e:
+            status, body, content_type = 404, json.dumps({'error': str(e)}).encode(), 'application/json'
+        except RuntimeError as e:
+            # Upstream fetch failures (NASA POWER down, offline cache miss, no data)
+            status, body, content_type = 502, json.dumps({'error': str(e)}).encode(), 'application/json'
+        except Exception as e:
+            status, body, content_type = 500, json.dumps({'error': f'{type(e).__name__}: {e}'}).encode(), \
+                'application/json'
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('X-Cache', cache_state)
+        if status == 200 and cache_state != 'none':
+            self.send_header('Cache-Control', f"public, max-age={SERVER_CONFIG['max_age']}")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(host=None, port=None, export=None, response_cache=None):
+    """Run the service until interrupted"""
+    host = host or SERVER_CONFIG['host']
+    port = port or SERVER_CONFIG['port']
+    server = ThreadingHTTPServer((host, port), AnalysisHandler)
+    server.daemon_threads = True
+    server.service = AnalysisService(export, response_cache)
+
+    print(f"🌐 Climate analysis service on http://{host}:{server.server_port}")
+    print("   /health  /figures  /series  /evaluate  /figure/<name>.png")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n   Stopped")
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve climate analysis and figures over HTTP")
+    parser.add_argument('--host', default=SERVER_CONFIG['host'])
+    parser.add_argument('--port', type=int, default=SERVER_CONFIG['port'])
+    parser.add_argument('--export', default=SERVER_CONFIG['export'],
+                        help=f"Export profile for /figure (needs PNG): {', '.join(gv.EXPORT_PROFILES)}")
+    parser.add_argument('--response-cache', type=int, default=SERVER_CONFIG['response_cache'],
+                        help="Response bodies kept in memory")
+    parser.add_argument('--series-cache', type=int, default=gv.MEMORY_CACHE_CONFIG['daily_series'],
+                        help="Parsed location series kept in memory")
+    parser.add_argument('--offline', action='store_true',
+                        help="Serve NASA POWER responses only from the local cache")
+    args = parser.parse_args()
+
+    gv.CACHE_CONFIG['offline'] = gv.CACHE_CONFIG['offline'] or args.offline
+    gv._daily_series.maxsize = args.series_cache
+    serve(args.host, args.port, args.export, args.response_cache)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Multi-location batch runner for the climate visualization generator
+
+Reads a CSV or JSON list of venues and event dates and streams them
+through a pipeline: fetch threads (shared response cache and pooled
+POWER client) feed the analysis, which feeds a process pool sized to the
+available cores that renders the figures. Bounded queues between the
+stages keep the network and the CPUs busy at the same time without
+letting fetched data pile up. Each location's figures go to their own
+subdirectory; a failure at one location does not stop the rest.
+
+Input columns / keys:
+    name, latitude, longitude, month, day[, hour]
+JSON entries may also carry a "criteria" object overriding CLIMATE_CRITERIA.
+
+Usage:
+python batch_runner.py locations.csv --output-dir visualizations/batch
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+
+import pandas as pd
+
+import generate_visualizations as gv
+from climate_trends import series_trends, trend_table, trend_direction
+from stage_pipeline import Pipeline, Stage
+
+
+def load_locations(path):
+    """Read a CSV or JSON list of locations into task dicts"""
+    if path.lower().endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            rows = json.load(f)
+    else:
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+
+    tasks = []
+    for i, row in enumerate(rows):
+        hour = row.get('hour')
+        tasks.append({
+            'name': row.get('name') or f'location-{i + 1}',
+            'latitude': float(row['latitude']),
+            'longitude': float(row['longitude']),
+            'month': int(row['month']),
+            'day': int(row['day']),
+            'hour': int(hour) if hour not in (None, '') else None,
+            'criteria': row.get('criteria') if isinstance(row.get('criteria'), dict) else None
+        })
+    return tasks
+
+
+def slugify(name):
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'location'
+
+
+def _context(task, output_dir, export):
+    """Plot context for one task, based on the generator's defaults"""
+    ctx = gv.default_context()
+    ctx['export'] = export
+    ctx['location'] = {'latitude': task['latitude'], 'longitude': task['longitude'], 'name': task['name']}
+    ctx['event_date'] = {'month': task['month'], 'day': task['day'], 'hour': task['hour']}
+    if task['criteria']:
+        ctx['criteria'] = {**ctx['criteria'], **task['criteria']}
+    ctx['output_dir'] = output_dir
+    # Each worker renders many locations: keep the figure templates open
+    ctx['reuse_figures'] = True
+    return ctx
+
+
+def _fetch(task):
+    """
+    Fetch stage: per-date rows, daily series and, as in a single-location
+    run, the hourly month when the task has an hour (or HOURLY_PROFILE is on)
+    """
+    df = gv.fetch_nasa_data(task['latitude'], task['longitude'], task['month'], task['day'], task['hour'])
+    series = gv.fetch_daily_series(task['latitude'], task['longitude'])
+    hourly = None
+    if task['hour'] is not None or gv.HOURLY_PROFILE:
+        # Already fetched for hourly tasks: served from the in-memory cache
+        hourly = gv.fetch_hourly_month(task['latitude'], task['longitude'], task['month'])
+    return df, series, hourly
+
+
+def _render_job(job):
+    """Render stage (worker process): one figure of one location"""
+    i, index, args, ctx = job
+    elapsed, drained = gv._render_figure_in_worker(index, args, ctx)
+    return [(i, index, elapsed, drained)]
+
+
+def run_batch(tasks, output_dir, workers=None, fetch_workers=4, export=None, force=False, trends=False,
+              analyze_workers=1, queue_size=None):
+    """
+    Run every task and return a summary DataFrame (one row per location)
+
+    Locations stream through three stages connected by bounded queues:
+    fetch threads (I/O-bound) feed the analysis threads, which evaluate
+    the criteria, plan the figures against each location's manifest and
+    hand every figure to the render processes (CPU-bound). A location is
+    analyzed as soon as its own fetch finishes, so rendering overlaps
+    with the network waits of the locations behind it.
+
+    With trends, every location also gets a trends.csv (see
+    climate_trends.trend_table; daily values for every calendar date)
+    and the summary gains the event's pass-rate trend columns, taken
+    from the same trends as figure 7 (the event hour for hourly tasks).
+    """
+    workers = workers or os.cpu_count() or 1
+    export = export or gv.EXPORT_PROFILE
+    queue_size = queue_size or 2 * workers
+    results = {i: {'name': t['name'], 'status': 'ok', 'fetch_s': 0.0, 'render_s': 0.0,
+                   'probability': None, 'ci_low': None, 'ci_high': None, 'error': ''} for i, t in enumerate(tasks)}
+    subdirs = {}
+    trend_rows = {}
+    used = set()
+    for i, task in enumerate(tasks):
+        # Keep directories unique when two venues share a name
+        slug = slugify(task['name'])
+        while slug in used:
+            slug = f'{slug}-{i + 1}'
+        used.add(slug)
+        subdirs[i] = os.path.join(output_dir, slug)
+
+    lock = threading.Lock()
+    locations = {}  # i -> manifest, hashes, formats, figures still rendering and log lines
+    out = sys.stdout
+
+    def finish(i):
+        """Save the manifest and log of a location whose figures are all done"""
+        location = locations[i]
+        gv.save_manifest(subdirs[i], location['manifest'])
+        with open(os.path.join(subdirs[i], 'run.log'), 'w', encoding='utf-8') as log:
+            log.write('\n'.join(location['log']) + '\n')
+        if results[i]['status'] == 'ok':
+            print(f"✓ {tasks[i]['name']}", file=out, flush=True)
+        else:
+            print(f"❌ {tasks[i]['name']}: {results[i]['error']}", file=out, flush=True)
+
+    def fetch(i):
+        start = time.perf_counter()
+        df, series, hourly = _fetch(tasks[i])
+        results[i]['fetch_s'] = time.perf_counter() - start
+        return [(i, df, series, hourly)]
+
+    def analyze(item):
+        i, df, series, hourly = item
+        task = tasks[i]
+        if len(df) < 10:
+            raise RuntimeError("Insufficient data received from NASA API")
+        ctx = _context(task, subdirs[i], export)
+        os.makedirs(subdirs[i], exist_ok=True)
+
+        inputs = gv.figure_inputs(df, series, ctx, hourly=hourly)
+        jobs, hashes, manifest = gv.plan_figures(inputs, ctx, force)
+        # Same headline estimate as the gauge (pooled days when pooling is on)
+        estimate = inputs['estimate']
+        ci_low, ci_high = gv.estimate_bootstrap(estimate, gv.CONFIDENCE_CONFIG)
+        results[i].update(probability=estimate['probability'], ci_low=float(ci_low),
+                          ci_high=float(ci_high), years=inputs['total_years'])
+        if trends:
+            # Daily trends for all 366 dates
+            table = trend_table(series_trends(series, ctx['criteria'], ctx['trends']['window']),
+                                ctx['trends']['alpha'])
+            table.to_csv(os.path.join(subdirs[i], 'trends.csv'), index=False)
+            # The summary reports the event's trend as figure 7 shows it
+            fit = inputs['trends']['pass']
+            trend_rows[i] = {
+                'pass_slope': fit['slope'] * 10 if fit['slope'] is not None else None,
+                'pass_p': fit['p_value'],
+                'pass_trend': trend_direction(fit, ctx['trends']['alpha'])
+            }
+
+        rendering = {gv.FIGURES[index][0] for index, _, _ in jobs}
+        locations[i] = {
+            'manifest': manifest,
+            'hashes': hashes,
+            'formats': [fmt for fmt, _ in gv.export_formats(export)],
+            'pending': len(jobs),
+            'log': [f"• Up to date: {name}" for name in hashes if name not in rendering]
+        }
+        if not jobs:
+            finish(i)
+        return [(i, index, args, job_ctx) for index, args, job_ctx in jobs]
+
+    def figure_done(i):
+        with lock:
+            locations[i]['pending'] -= 1
+            done = locations[i]['pending'] == 0
+        if done:
+            finish(i)
+
+    def rendered(output):
+        i, index, elapsed, drained = output
+        gv.METRICS.replay(drained)
+        name = gv.FIGURES[index][0]
+        location = locations[i]
+        with lock:
+            gv.record_figure(location['manifest'], name, location['hashes'][name], location['formats'], elapsed)
+            location['log'].append(f"✓ Generated: {name}.{'/'.join(location['formats'])} ({elapsed:.2f}s)")
+            results[i]['render_s'] += elapsed
+        figure_done(i)
+
+    def failed(stage, item, error):
+        i = item if stage == 'fetch' else item[0]
+        with lock:
+            if results[i]['status'] == 'ok':
+                results[i].update(status=f'{stage} failed', error=str(error))
+        if stage != 'render':
+            print(f"❌ {tasks[i]['name']}: {error}", file=out, flush=True)
+        else:
+            with lock:
+                locations[i]['log'].append(f"❌ {gv.FIGURES[item[1]][0]}: {error}")
+            figure_done(i)
+
+    pipeline = Pipeline([
+        Stage('fetch', fetch, fetch_workers),
+        Stage('analyze', analyze, analyze_workers),
+        Stage('render', _render_job, workers, processes=True, initializer=gv._render_worker_init)
+    ], queue_size=queue_size)
+
+    print(f"🚀 Processing {len(tasks)} locations: {fetch_workers} fetch threads, {analyze_workers} analysis "
+          f"threads, {workers} render processes (queues of {queue_size})")
+    # Forked render workers inherit the plotting setup instead of importing it again
+    gv.setup_plotting()
+    # Per-location progress from the generator would interleave, so only warnings are logged meanwhile
+    level = gv.LOG.level
+    gv.LOG.setLevel(logging.WARNING)
+    try:
+        pipeline.run(range(len(tasks)), sink=rendered, on_error=failed)
+    finally:
+        gv.LOG.setLevel(level)
+
+    print("\n⏱️  Pipeline stages:")
+    print(pipeline.report())
+
+    summary = pd.DataFrame([results[i] for i in sorted(results)])
+    summary['output'] = [subdirs[i] for i in sorted(results)]
+    if trends:
+        rows = [trend_rows.get(i) or {} for i in sorted(results)]
+        for column in ('pass_slope', 'pass_p', 'pass_trend'):
+            summary[column] = [row.get(column) for row in rows]
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate visualizations for many locations")
+    parser.add_argument('locations', help="CSV or JSON file with name, latitude, longitude, month, day[, hour]")
+    parser.add_argument('--output-dir', default=os.path.join(gv.OUTPUT_DIR, 'batch'))
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Render processes (default: number of CPU cores)")
+    parser.add_argument('--fetch-workers', type=int, default=4,
+                        help="Locations fetched concurrently")
+    parser.add_argument('--analyze-workers', type=int, default=1,
+                        help="Threads evaluating criteria and planning figures")
+    parser.add_argument('--queue-size', type=int, default=None,
+                        help="Capacity of the queue in front of each stage (default: 2 x --workers)")
+    parser.add_argument('--export', default=gv.EXPORT_PROFILE,
+                        help=f"Export profile(s), comma-separated: {', '.join(gv.EXPORT_PROFILES)}")
+    parser.add_argument('--force', action='store_true',
+                        help="Re-render every figure even if its inputs did not change")
+    parser.add_argument('--offline', action='store_true',
+                        help="Serve NASA POWER responses only from the local cache")
+    parser.add_argument('--trends', action='store_true',
+                        help="Write each location's per-day trend table (trends.csv) and add the "
+                             "event date's pass-rate trend to the summary")
+    args = parser.parse_args()
+
+    gv.configure_logging()
+    gv.CACHE_CONFIG['offline'] = gv.CACHE_CONFIG['offline'] or args.offline
+
+    gv.export_formats(args.export)  # fail fast on unknown or conflicting profiles
+    tasks = load_locations(args.locations)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    summary = run_batch(tasks, args.output_dir, args.workers, args.fetch_workers, args.export, args.force,
+                        args.trends, args.analyze_workers, args.queue_size)
+    elapsed = time.perf_counter() - start
+
+    summary.to_csv(os.path.join(args.output_dir, 'batch_summary.csv'), index=False)
+
+    print()
+    columns = ['name', 'status', 'fetch_s', 'render_s', 'probability', 'ci_low', 'ci_high', 'error']
+    if args.trends:
+        columns[-1:-1] = ['pass_slope', 'pass_trend']
+    print(summary[columns].to_string(index=False, float_format=lambda v: f'{v:.1f}'))
+    ok = (summary['status'] == 'ok').sum()
+    print(f"\n✅ {ok}/{len(summary)} locations completed in {elapsed:.1f}s "
+          f"(summary: {os.path.join(args.output_dir, 'batch_summary.csv')})")
+
+
+if __name__ == "__main__":
+    main()
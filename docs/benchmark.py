@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the fetch -> analyze -> render pipeline
+
+Runs fully offline: POWER payloads are generated locally in the exact
+layout the API returns (seeded, with sparse -999 gaps), and the
+end-to-end fetch stage is served from a response cache filled with them.
+
+Stages:
+    parse:json / parse:stream   payload bytes -> per-parameter arrays, via
+                                json.loads or the streaming parser
+    build:series                arrays -> DailySeries -> per-date DataFrame
+    fetch:daily_series          fetch_daily_series through an offline cache
+    evaluate:iterrows           the original per-row criteria loop
+    evaluate:mask               criteria_mask over the same rows
+    evaluate:calendar           all 366 dates per location (calendar_probabilities)
+    evaluate:polyfit            one np.polyfit per parameter and date
+    evaluate:trends             the same trends in one batched fit (series_trends)
+    render:<figure>             each plot function, including savefig
+    render:<figure>:reused      the same with the figure template kept open
+                                between runs (batch workers)
+    startup:data / :figures     importing the generator in a fresh interpreter,
+                                without / with the plotting libraries
+
+Every stage is run at each scale (locations x years). Wall time is the
+best of a few runs; peak memory comes from one extra run under
+tracemalloc, so tracing overhead does not distort the timings. Render
+stages depend only on the number of years and run for one location.
+
+Usage:
+python benchmark.py
+python benchmark.py --scales 1x20,1000x40 --save baseline.json
+python benchmark.py --compare baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from calendar import monthrange
+from datetime import date, datetime
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+
+import generate_visualizations as gv
+from climate_series import DailySeries, DAILY_PARAMETERS
+from climate_trends import series_trends
+from criteria import criteria_mask
+from hourly_series import HourlyMonth, HOURLY_PARAMETERS
+from power_cache import ResponseCache
+from power_stream import parse_power_stream
+from probability_grid import grid_cells, grid_probabilities
+
+DEFAULT_SCALES = '1x20,10x20,100x40,1000x40'
+
+FIXTURE_SEED = 2025
+
+# json.loads and the row and polyfit loops are only run up to this many locations;
+# past it they take minutes and only confirm what the small scales show
+LEGACY_MAX_LOCATIONS = 100
+
+# fetch:daily_series writes one cache entry per location
+FETCH_MAX_LOCATIONS = 10
+
+# Code timed in a fresh interpreter for each startup stage
+STARTUP_MODES = {
+    'startup:data': 'import generate_visualizations',
+    'startup:figures': 'import generate_visualizations as gv; gv.setup_plotting()',
+}
+
+STARTUP_SCRIPT = '''
+import sys, time, tracemalloc
+if sys.argv[1] == 'trace':
+    tracemalloc.start()
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start, tracemalloc.get_traced_memory()[1])
+'''
+
+# Typical values and spread of each POWER parameter for the fixtures
+FIXTURE_CLIMATE = {
+    'T2M_MAX': (31, 3), 'T2M_MIN': (23, 2), 'T2M': (26, 4),
+    'PRECTOTCORR': (4, 6), 'WS10M': (4, 2), 'RH2M': (75, 10),
+}
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+def fixture_payload(start, end, parameters, hourly=False, seed=FIXTURE_SEED):
+    """
+    POWER point payload for start..end (datetime.date) as bytes
+
+    Values are seeded per parameter, rounded to two decimals like the API,
+    with about 0.2% of them replaced by -999.
+    """
+    rng = np.random.default_rng(seed)
+    days = np.arange(np.datetime64(start), np.datetime64(end) + 1)
+    stamps = [d.strftime('%Y%m%d') for d in days.astype(object)]
+    if hourly:
+        stamps = [f'{d}{h:02d}' for d in stamps for h in range(24)]
+
+    parameter = {}
+    for name in parameters:
+        mean, spread = FIXTURE_CLIMATE[name]
+        values = np.round(rng.normal(mean, spread, len(stamps)), 2)
+        if name == 'PRECTOTCORR':
+            values = np.abs(values)
+        values[rng.random(len(stamps)) < 0.002] = -999
+        parameter[name] = ', '.join(f'"{k}": {v}' for k, v in zip(stamps, values.tolist()))
+
+    body = ', '.join(f'"{name}": {{{values}}}' for name, values in parameter.items())
+    return (
+        '{"type": "Feature", "geometry": {"type": "Point", "coordinates": [-43.17, -22.91, 6.2]}, '
+        f'"properties": {{"parameter": {{{body}}}}}, '
+        '"header": {"title": "NASA/POWER fixture", "fill_value": -999}, "messages": [], '
+        '"parameters": {}, "times": {"data": 0.1, "process": 0.1}}'
+    ).encode()
+
+
+def fixture_daily(years):
+    """(payload bytes, start tuple, number of days) for years ending last year"""
+    end_year = datetime.now().year - 1
+    start = date(end_year - years + 1, 1, 1)
+    end = date(end_year, 12, 31)
+    payload = fixture_payload(start, end, DAILY_PARAMETERS)
+    return payload, (start.year, 1, 1), (end - start).days + 1
+
+
+def fixture_hourly(years, month):
+    """HourlyMonth for month over the last `years` years, from fixture payloads"""
+    end_year = datetime.now().year - 1
+    all_years = list(range(end_year - years + 1, end_year + 1))
+    payloads = []
+    for year in all_years:
+        days_in_month = monthrange(year, month)[1]
+        raw = fixture_payload(date(year, month, 1), date(year, month, days_in_month), HOURLY_PARAMETERS,
+                              hourly=True, seed=FIXTURE_SEED + year)
+        payloads.append(parse_power_stream(chunked(raw), (year, month, 1), days_in_month, hourly=True))
+    return HourlyMonth.from_hour_arrays(all_years, month, payloads)
+
+
+def chunked(raw, size=gv.STREAM_CHUNK_SIZE):
+    view = memoryview(raw)
+    return (bytes(view[i:i + size]) for i in range(0, len(raw), size))
+
+
+def per_location(fn, locations):
+    """Run fn once per location, dropping results so memory does not pile up"""
+    def run():
+        for _ in range(locations):
+            fn()
+    return run
+
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def measure(fn, repeat=3, min_time=1.0):
+    """Best wall time of up to `repeat` runs and peak traced memory (MB)"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+        if sum(times) >= min_time:
+            break
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), peak / 1e6
+
+
+def measure_startup(code, repeat=3):
+    """
+    Best time of `code` over `repeat` fresh interpreters, and its peak
+    traced memory (MB) from one more traced run
+    """
+    def run(mode):
+        out = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT.format(code=code), mode],
+                             cwd=os.path.dirname(os.path.abspath(__file__)),
+                             capture_output=True, text=True, check=True).stdout
+        seconds, peak = out.split()[-2:]
+        return float(seconds), int(peak)
+
+    wall = min(run('time')[0] for _ in range(repeat))
+    return wall, run('trace')[1] / 1e6
+
+
+def json_arrays(payload, start, n_days):
+    """json.loads the payload, then align it into arrays like parse_power_stream"""
+    origin = np.datetime64(date(*start))
+    arrays = {}
+    for name, values in json.loads(payload)['properties']['parameter'].items():
+        days = np.array([np.datetime64(f'{k[:4]}-{k[4:6]}-{k[6:8]}') for k in values]) - origin
+        out = np.full(n_days, np.nan)
+        out[days.astype(int)] = np.array(list(values.values()), dtype=float)
+        out[out == -999] = np.nan
+        arrays[name] = out
+    return arrays
+
+
+def legacy_iterrows_mask(df, criteria):
+    """The per-row criteria loop the plots used before criteria_mask"""
+    return [(
+        row['temp_min'] >= criteria['temp_min'] and
+        row['temp_max'] <= criteria['temp_max'] and
+        row['precipitation'] <= criteria['precipitation_max'] and
+        row['wind'] <= criteria['wind_max'] and
+        row['humidity'] <= criteria['humidity_max']
+    ) for _, row in df.iterrows()]
+
+
+def legacy_polyfit_trends(series):
+    """Slope of every parameter on every date, one np.polyfit per series"""
+    slopes = {}
+    for col in series.data:
+        values = series.values(col)
+        slopes[col] = np.full(values.shape[1], np.nan)
+        for doy in range(values.shape[1]):
+            present = np.isfinite(values[:, doy])
+            if present.sum() >= 2:
+                slopes[col][doy] = np.polyfit(series.years[present], values[present, doy], 1)[0]
+    return slopes
+
+
+def pipeline_stages(locations, years, cache_dir):
+    """(stage name, callable) for one scale"""
+    criteria = gv.CLIMATE_CRITERIA
+    month, day = gv.EVENT_DATE['month'], gv.EVENT_DATE['day']
+    payload, start, n_days = fixture_daily(years)
+    start_year = start[0]
+    end_year = start_year + years - 1
+    arrays = parse_power_stream(chunked(payload), start, n_days)
+    series = DailySeries.from_day_arrays(arrays, start_year, end_year)
+    # One row per location and year, as the per-date plots see it
+    rows = pd.concat([series.for_date(month, day)] * locations, ignore_index=True)
+
+    stages = []
+    if locations <= LEGACY_MAX_LOCATIONS:
+        stages.append(('parse:json', per_location(lambda: json_arrays(payload, start, n_days), locations)))
+    stages.append(('parse:stream', per_location(
+        lambda: parse_power_stream(chunked(payload), start, n_days), locations)))
+    stages.append(('build:series', per_location(
+        lambda: DailySeries.from_day_arrays(arrays, start_year, end_year).for_date(month, day), locations)))
+
+    if locations <= FETCH_MAX_LOCATIONS:
+        coordinates = [(-22.9 + i, -43.2) for i in range(locations)]
+        cache = ResponseCache(cache_dir, max_size_mb=10_000, max_age_days=365)
+        for lat, lon in coordinates:
+            key = ResponseCache.make_key(f"{gv.POWER_API_URL}/temporal/daily/point", lat, lon,
+                                         ','.join(DAILY_PARAMETERS), f'{start_year}0101', f'{end_year}1231')
+            with cache.writer(key) as out:
+                out.write(payload)
+
+        def fetch():
+            gv._daily_series.clear()
+            for lat, lon in coordinates:
+                gv.fetch_daily_series(lat, lon, start_year, end_year).for_date(month, day)
+        stages.append(('fetch:daily_series', fetch))
+
+    if locations <= LEGACY_MAX_LOCATIONS:
+        stages.append(('evaluate:iterrows', lambda: legacy_iterrows_mask(rows, criteria)))
+    stages.append(('evaluate:mask', lambda: criteria_mask(rows, criteria)))
+    stages.append(('evaluate:calendar', per_location(
+        lambda: gv.calendar_probabilities(series, criteria), locations)))
+    if locations <= LEGACY_MAX_LOCATIONS:
+        stages.append(('evaluate:polyfit', per_location(lambda: legacy_polyfit_trends(series), locations)))
+    stages.append(('evaluate:trends', per_location(
+        lambda: series_trends(series, criteria, gv.TREND_CONFIG['window']), locations)))
+    return stages, series
+
+
+def render_stages(years, series, output_dir, export):
+    """(stage name, callable) for every figure, rendered for one location"""
+    ctx = gv.default_context()
+    ctx.update(output_dir=output_dir, export=export)
+    os.makedirs(output_dir, exist_ok=True)
+    # Plotting imports are timed by startup:figures, not by the first figure
+    gv.setup_plotting()
+    month, day = ctx['event_date']['month'], ctx['event_date']['day']
+
+    df = series.for_date(month, day)
+    cells = grid_cells(ctx['grid']['bbox'], ctx['grid']['resolution'])
+    grid = grid_probabilities(cells, [series] * len(cells), month, day, ctx['criteria'])
+    inputs = gv.figure_inputs(df, series, ctx, grid, fixture_hourly(years, month))
+
+    stages = [(f'render:{name}', lambda func=func, args=tuple(inputs[a] for a in arg_names): func(*args, ctx=ctx))
+              for name, func, arg_names, _ in gv.FIGURES]
+
+    # Templated figures again with the built figure kept between runs, as batch workers do
+    reuse_ctx = dict(ctx, reuse_figures=True)
+    stages += [(f'render:{name}:reused',
+                lambda func=func, args=tuple(inputs[a] for a in arg_names): func(*args, ctx=reuse_ctx))
+               for name, func, arg_names, _ in gv.FIGURES if name in gv.FIGURE_TEMPLATES]
+    return stages
+
+
+def run(scales, export, repeat):
+    """Run every stage at every scale and return result dicts"""
+    # Fetches must come from the fixture cache, never the network
+    gv.CACHE_CONFIG['offline'] = True
+    gv.STORE_CONFIG['enabled'] = False
+
+    results = []
+    for name, code in STARTUP_MODES.items():
+        wall, peak = measure_startup(code, repeat)
+        results.append({'stage': name, 'scale': 'process', 'wall_s': round(wall, 6), 'peak_mb': round(peak, 3)})
+        print(f"  {name:<36} {'process':>8} {wall:9.3f}s {peak:9.1f} MB", flush=True)
+
+    rendered_years = set()
+    with tempfile.TemporaryDirectory() as tmp:
+        for locations, years in scales:
+            cache_dir = os.path.join(tmp, f'cache-{locations}x{years}')
+            gv.CACHE_CONFIG['dir'] = cache_dir
+            gv._response_cache = None
+
+            stages, series = pipeline_stages(locations, years, cache_dir)
+            scale = f'{locations}x{years}'
+            if years not in rendered_years:
+                rendered_years.add(years)
+                stages += [(name, fn) for name, fn in
+                           render_stages(years, series, os.path.join(tmp, f'figures-{years}'), export)]
+
+            for name, fn in stages:
+                stage_scale = f'1x{years}' if name.startswith('render:') else scale
+                wall, peak = measure(fn, repeat)
+                results.append({'stage': name, 'scale': stage_scale,
+                                'wall_s': round(wall, 6), 'peak_mb': round(peak, 3)})
+                print(f"  {name:<36} {stage_scale:>8} {wall:9.3f}s {peak:9.1f} MB", flush=True)
+    return results
+
+
+# ============================================================================
+# BASELINES
+# ============================================================================
+
+def save_results(path, results):
+    meta = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=2)
+
+
+def compare(results, baseline_path, tolerance, min_seconds=0.005):
+    """
+    Print results next to a saved baseline
+
+    A stage regresses when it is more than `tolerance` slower (ratio) and
+    the difference is above min_seconds, which filters timer noise on
+    very fast stages. Returns the regressed rows.
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r['stage'], r['scale']): r for r in json.load(f)['results']}
+
+    regressions = []
+    print(f"\n{'stage':<36} {'scale':>8} {'baseline':>10} {'now':>10} {'ratio':>7} {'peak MB':>15}")
+    for r in results:
+        base = baseline.get((r['stage'], r['scale']))
+        if base is None:
+            print(f"{r['stage']:<36} {r['scale']:>8} {'-':>10} {r['wall_s']:9.3f}s {'new':>7}")
+            continue
+        ratio = r['wall_s'] / base['wall_s'] if base['wall_s'] > 0 else float('inf')
+        regressed = ratio > 1 + tolerance and r['wall_s'] - base['wall_s'] > min_seconds
+        flag = '  ⚠️' if regressed else ''
+        print(f"{r['stage']:<36} {r['scale']:>8} {base['wall_s']:9.3f}s {r['wall_s']:9.3f}s {ratio:6.2f}x "
+              f"{base['peak_mb']:7.1f}->{r['peak_mb']:<7.1f}{flag}")
+        if regressed:
+            regressions.append(r)
+    return regressions
+
+
+def parse_scales(text):
+    scales = []
+    for item in text.split(','):
+        locations, _, years = item.strip().partition('x')
+        scales.append((int(locations), int(years)))
+    return scales
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fetch -> analyze -> render pipeline offline")
+    parser.add_argument('--scales', default=DEFAULT_SCALES,
+                        help="Comma-separated LOCATIONSxYEARS scales (default: %(default)s)")
+    parser.add_argument('--export', default='draft',
+                        help=f"Export profile for render stages: {', '.join(gv.EXPORT_PROFILES)}")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Timed runs per stage (fewer when a stage takes over a second)")
+    parser.add_argument('--save', metavar='JSON', help="Write the results as a baseline file")
+    parser.add_argument('--compare', metavar='JSON', help="Compare against a saved baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed slowdown before a stage counts as a regression (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    gv.export_formats(args.export)  # fail fast on unknown or conflicting profiles
+    scales = parse_scales(args.scales)
+    # Layout/glyph warnings from the figures are the same on every run
+    warnings.filterwarnings('ignore', category=UserWarning)
+
+    print("⏱️  Benchmarking fetch -> analyze -> render (offline fixtures)\n")
+    results = run(scales, args.export, args.repeat)
+
+    if args.save:
+        save_results(args.save, results)
+        print(f"\n✓ Saved results to '{args.save}'")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} stage(s) slower than the baseline by more than {args.tolerance:.0%}")
+            sys.exit(1)
+        print("\n✅ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Columnar daily climate series for one location
+
+The full POWER daily range is kept as one (years x 366) float array per
+parameter, indexed by a leap-year day-of-year calendar. Feb 29 of
+non-leap years and -999 gaps are stored as NaN, so any month/day (or
+window of days) can be sliced out without touching the network again.
+"""
+
+from datetime import date
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# NASA POWER daily parameter -> DataFrame column used by the plots
+DAILY_PARAMETERS = {
+    'T2M_MAX': 'temp_max',
+    'T2M_MIN': 'temp_min',
+    'PRECTOTCORR': 'precipitation',
+    'WS10M': 'wind',
+    'RH2M': 'humidity'
+}
+
+COLUMNS = list(DAILY_PARAMETERS.values())
+
+DAYS_PER_YEAR = 366
+
+# POWER reports values with two decimals; float32 storage is rounded back
+# to this precision on read so results match the float64 fetch path
+POWER_DECIMALS = 2
+
+# Offset of the first day of each month in a leap year (index 0 unused)
+_MONTH_OFFSET = np.array([0, 0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335])
+
+def day_of_year(month, day):
+    """Zero-based day index in the fixed 366-day calendar"""
+    date(2000, month, day)  # validates month/day, 2000 is a leap year
+    return int(_MONTH_OFFSET[month] + day - 1)
+
+
+def calendar_dates():
+    """(month, day) for each of the 366 calendar slots"""
+    days_in_month = [31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+    return [(m, d) for m in range(1, 13) for d in range(1, days_in_month[m - 1] + 1)]
+
+
+class DailySeries:
+    """
+    Daily values for one location as (years x 366) arrays
+
+    Args:
+        years: 1-D array of consecutive years covered by the series
+        data: Mapping of column name -> (len(years), 366) float array.
+              float32 arrays (including read-only memory maps from
+              SeriesStore) are kept as they are and only converted when
+              a slice of them is read.
+    """
+
+    def __init__(self, years, data):
+        self.years = np.asarray(years, dtype=int)
+        self.data = {col: arr if isinstance(arr, np.ndarray) and arr.dtype == np.float32
+                     else np.asarray(arr, dtype=float)
+                     for col, arr in data.items()}
+
+    @staticmethod
+    def _as_float(values):
+        if values.dtype == np.float32:
+            return np.round(values.astype(float), POWER_DECIMALS)
+        return values
+
+    def values(self, column):
+        """Full (years x 366) float64 array for one column"""
+        return self._as_float(self.data[column])
+
+    @classmethod
+    def empty(cls, start_year, end_year, columns=COLUMNS):
+        years = np.arange(start_year, end_year + 1)
+        shape = (len(years), DAYS_PER_YEAR)
+        return cls(years, {col: np.full(shape, np.nan) for col in columns})
+
+    @classmethod
+    def from_day_arrays(cls, arrays, start_year, end_year):
+        """
+        Build a series from per-parameter arrays indexed by day offset
+
+        arrays maps POWER parameter name -> float array whose element i
+        is the value for Jan 1 of start_year + i days (as returned by
+        power_stream.parse_power_stream).
+        """
+        series = cls.empty(start_year, end_year)
+        dates = np.arange(f'{start_year}-01-01', f'{end_year + 1}-01-01', dtype='datetime64[D]')
+        months = dates.astype('datetime64[M]')
+        year_idx = dates.astype('datetime64[Y]').astype(int) + 1970 - start_year
+        doy = (_MONTH_OFFSET[months.astype(int) % 12 + 1]
+               + (dates - months.astype('datetime64[D]')).astype(int))
+
+        for power_name, column in DAILY_PARAMETERS.items():
+            values = arrays.get(power_name)
+            if values is not None:
+                series.data[column][year_idx, doy] = values[:len(dates)]
+        return series
+
+    def select(self, start_year, end_year):
+        """Rows for start_year..end_year (views, no copy)"""
+        rows = slice(start_year - int(self.years[0]), end_year - int(self.years[0]) + 1)
+        return DailySeries(self.years[rows], {col: arr[rows] for col, arr in self.data.items()})
+
+    def gap_years(self):
+        """Years with a missing value on any real calendar day"""
+        leap = (self.years % 4 == 0) & ((self.years % 100 != 0) | (self.years % 400 == 0))
+        real_day = np.ones((len(self.years), DAYS_PER_YEAR), dtype=bool)
+        real_day[~leap, _MONTH_OFFSET[3] - 1] = False  # Feb 29
+
+        gaps = np.zeros(len(self.years), dtype=bool)
+        for col in self.data:
+            gaps |= (np.isnan(self.data[col]) & real_day).any(axis=1)
+        return self.years[gaps]
+
+    def for_date(self, month, day):
+        """
+        Per-year values for one calendar date
+
+        Returns a DataFrame with one row per year that has complete data,
+        in the same layout fetch_nasa_data has always returned.
+        """
+        import pandas as pd
+
+        doy = day_of_year(month, day)
+        df = pd.DataFrame({'year': self.years})
+        for col in COLUMNS:
+            df[col] = self._as_float(self.data[col][:, doy])
+        return df.dropna().reset_index(drop=True)
+
+    def window(self, month, day, days_before=0, days_after=0):
+        """
+        Per-year values for a window of days around a calendar date
+
+        Windows wrap across year boundaries (Dec 28 +7 days reaches into
+        January of the following year); slots outside the series are NaN.
+
+        Returns a dict of column -> (years x window) arrays.
+        """
+        offsets = np.arange(-days_before, days_after + 1)
+        flat_idx = (np.arange(len(self.years))[:, None] * DAYS_PER_YEAR
+                    + day_of_year(month, day) + offsets[None, :])
+        valid = (flat_idx >= 0) & (flat_idx < len(self.years) * DAYS_PER_YEAR)
+        clipped = np.clip(flat_idx, 0, len(self.years) * DAYS_PER_YEAR - 1)
+
+        window = {}
+        for col in COLUMNS:
+            values = self._as_float(self.data[col].reshape(-1)[clipped])
+            window[col] = np.where(valid, values, np.nan)
+        return window
+
+    def pooled_days(self, days):
+        """
+        Every calendar day together with its +/- days neighbours
+
+        The flattened series is padded once and viewed through
+        sliding_window_view, so the windows for all 366 days are strided
+        views of the same buffer rather than copies. Windows wrap across
+        year boundaries; slots outside the series (and Feb 29 of non-leap
+        years) are NaN.
+
+        Returns a dict of column -> (years x 366 x (2 * days + 1)) arrays.
+        """
+        width = 2 * days + 1
+        pooled = {}
+        for col in COLUMNS:
+            flat = np.pad(self.values(col).reshape(-1), days, constant_values=np.nan)
+            pooled[col] = sliding_window_view(flat, width).reshape(len(self.years), DAYS_PER_YEAR, width)
+        return pooled
@@ -0,0 +1,207 @@
+"""
+Linear trends and rolling pass probabilities for every calendar day
+
+A series holds one (years x 366) array per parameter, so the trend of
+every parameter on every day of year is a batch of independent straight
+line fits sharing the same x (the years). Instead of one np.polyfit per
+series, the least-squares sums are computed for all columns at once;
+missing values are masked out per column, so each day is fitted on the
+years it actually has.
+
+The criteria get the same treatment: the pass rate (0 or 100 per year)
+is fitted like any other parameter, and its rolling-window average gives
+the pass probability of every run of consecutive years.
+"""
+
+import numpy as np
+
+from climate_series import COLUMNS, calendar_dates
+from criteria import criteria_mask, valid_mask
+
+
+def fit_trends(years, values):
+    """
+    Least-squares line through each series along axis 0
+
+    Args:
+        years: 1-D array of years (the x values)
+        values: Array of shape (len(years), ...); NaN values are ignored
+
+    Returns a dict of arrays shaped values.shape[1:]: n (years used),
+    mean, slope (units per year), intercept, stderr of the slope and
+    p_value of the two-sided t-test for a zero slope (NaN with fewer
+    than 3 years or constant values).
+    """
+    from scipy import stats
+
+    y = np.asarray(values, dtype=float)
+    x = np.asarray(years, dtype=float).reshape((-1,) + (1,) * (y.ndim - 1))
+    w = np.isfinite(y)
+    y0 = np.where(w, y, 0.0)
+
+    n = w.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = (w * x).sum(axis=0) / n
+        y_mean = y0.sum(axis=0) / n
+        dx = np.where(w, x - x_mean, 0.0)
+        dy = np.where(w, y0 - y_mean, 0.0)
+        sxx = (dx * dx).sum(axis=0)
+        slope = (dx * dy).sum(axis=0) / sxx
+        intercept = y_mean - slope * x_mean
+
+        residual = np.where(w, dy - slope * dx, 0.0)
+        dof = n - 2
+        stderr = np.sqrt((residual * residual).sum(axis=0) / dof / sxx)
+        t = slope / stderr
+        p_value = np.where(dof > 0, 2 * stats.t.sf(np.abs(t), np.maximum(dof, 1)), np.nan)
+
+    undefined = (n < 2) | (sxx == 0)
+    return {
+        'n': n,
+        'mean': y_mean,
+        'slope': np.where(undefined, np.nan, slope),
+        'intercept': np.where(undefined, np.nan, intercept),
+        'stderr': np.where(dof > 0, stderr, np.nan),
+        'p_value': p_value
+    }
+
+
+def rolling_pass_probability(passes, valid, window):
+    """
+    Pass probability (%) of every run of window consecutive years
+
+    passes and valid are boolean arrays of shape (years, ...). Returns
+    an array of shape (years - window + 1, ...); NaN where a run has no
+    complete year.
+    """
+    def run_sums(mask):
+        cumulative = np.cumsum(np.asarray(mask, dtype=float), axis=0)
+        cumulative = np.concatenate([np.zeros((1,) + cumulative.shape[1:]), cumulative])
+        return cumulative[window:] - cumulative[:-window]
+
+    passed, counted = run_sums(passes), run_sums(valid)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counted > 0, passed / np.where(counted > 0, counted, 1) * 100, np.nan)
+
+
+def compute_trends(years, data, criteria, window=10):
+    """
+    Trends of every column and of the criteria pass rate
+
+    Args:
+        years: 1-D array of consecutive years
+        data: Mapping of column name -> array of shape (len(years), ...),
+              e.g. the (years x 366) arrays of a DailySeries
+        criteria: Criteria dict (see CLIMATE_CRITERIA)
+        window: Years per rolling pass-probability window (capped at
+                the number of years)
+
+    Returns a dict with years, window, 'columns' (column -> fit_trends
+    result), 'pass' (fit of the pass rate in %, so its slope is in
+    percentage points per year), 'rolling' (rolling_pass_probability)
+    and 'rolling_years' ((first, last) year of each window).
+    """
+    years = np.asarray(years, dtype=int)
+    window = max(1, min(window, len(years)))
+    valid = valid_mask(data, criteria)
+    passes = criteria_mask(data, criteria) & valid
+
+    return {
+        'years': years,
+        'window': window,
+        'columns': {col: fit_trends(years, values) for col, values in data.items()},
+        'pass': fit_trends(years, np.where(valid, passes * 100.0, np.nan)),
+        'rolling': rolling_pass_probability(passes, valid, window),
+        'rolling_years': [(int(years[i]), int(years[i + window - 1])) for i in range(len(years) - window + 1)]
+    }
+
+
+def series_trends(series, criteria, window=10):
+    """compute_trends for all 366 calendar days of a DailySeries"""
+    return compute_trends(series.years, {col: series.values(col) for col in series.data}, criteria, window)
+
+
+def dataframe_trends(df, criteria, window=10):
+    """
+    compute_trends for a per-year DataFrame (fetch_nasa_data layout)
+
+    Years missing from the DataFrame become NaN rows, so the rolling
+    windows still span consecutive calendar years.
+    """
+    years = np.arange(int(df['year'].min()), int(df['year'].max()) + 1)
+    rows = df['year'].to_numpy(dtype=int) - years[0]
+    data = {}
+    for col in COLUMNS:
+        values = np.full(len(years), np.nan)
+        values[rows] = df[col].to_numpy(dtype=float)
+        data[col] = values
+    return compute_trends(years, data, criteria, window)
+
+
+def _float(value):
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+def _fit_at(fit, index):
+    return {key: _float(values[index]) for key, values in fit.items()}
+
+
+def trends_at(trends, index=()):
+    """
+    One date of a compute_trends result as plain Python values
+
+    index selects the trailing axes (the day of year for series_trends;
+    the default () fits results that are already scalars). Missing
+    values become None, so the result is JSON-serializable.
+    """
+    index = index if isinstance(index, tuple) else (index,)
+    return {
+        'years': trends['years'].tolist(),
+        'window': trends['window'],
+        'columns': {col: _fit_at(fit, index) for col, fit in trends['columns'].items()},
+        'pass': _fit_at(trends['pass'], index),
+        'rolling': [_float(v) for v in trends['rolling'][(slice(None),) + index]],
+        'rolling_years': trends['rolling_years']
+    }
+
+
+def trend_direction(fit, alpha=0.05):
+    """'positive', 'negative' or 'stable' (slope not significant at alpha)"""
+    slope, p_value = fit['slope'], fit['p_value']
+    if slope is None or p_value is None or np.isnan(slope) or np.isnan(p_value) or p_value >= alpha:
+        return 'stable'
+    return 'positive' if slope > 0 else 'negative'
+
+
+def trend_table(trends, alpha=0.05):
+    """
+    series_trends result as a DataFrame with one row per calendar date
+
+    Columns: month, day, years (complete years), probability (%),
+    pass_slope (points per decade), pass_p, pass_trend, then
+    <column>_mean, <column>_slope (per decade) and <column>_p for every
+    parameter, and one probability column per rolling window
+    (window_<first>_<last>).
+    """
+    import pandas as pd
+
+    dates = calendar_dates()
+    fit = trends['pass']
+    table = pd.DataFrame({
+        'month': [m for m, _ in dates],
+        'day': [d for _, d in dates],
+        'years': fit['n'],
+        'probability': fit['mean'],
+        'pass_slope': fit['slope'] * 10,
+        'pass_p': fit['p_value'],
+        'pass_trend': [trend_direction({'slope': s, 'p_value': p}, alpha)
+                       for s, p in zip(fit['slope'], fit['p_value'])]
+    })
+    for col, fit in trends['columns'].items():
+        table[f'{col}_mean'] = fit['mean']
+        table[f'{col}_slope'] = fit['slope'] * 10
+        table[f'{col}_p'] = fit['p_value']
+    for (first, last), probabilities in zip(trends['rolling_years'], trends['rolling']):
+        table[f'window_{first}_{last}'] = probabilities
+    return table
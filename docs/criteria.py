@@ -0,0 +1,188 @@
+"""
+Vectorized climate criteria evaluation
+
+Criteria are the dicts used throughout the generator (see
+CLIMATE_CRITERIA). Each rule becomes one boolean mask over a whole
+column, so the same code evaluates a 20-row DataFrame or a
+(locations x years x days) array without per-row Python overhead.
+"""
+
+import json
+
+import numpy as np
+
+# (criteria key, data column, comparison)
+CRITERIA_RULES = [
+    ('temp_min', 'temp_min', np.greater_equal),
+    ('temp_max', 'temp_max', np.less_equal),
+    ('precipitation_min', 'precipitation', np.greater_equal),
+    ('precipitation_max', 'precipitation', np.less_equal),
+    ('wind_max', 'wind', np.less_equal),
+    ('humidity_min', 'humidity', np.greater_equal),
+    ('humidity_max', 'humidity', np.less_equal),
+]
+
+# Criteria names used by the web app's event presets
+WEB_CRITERIA_KEYS = {
+    'temp_min_ideal': 'temp_min',
+    'temp_max_ideal': 'temp_max',
+}
+
+
+def _active_rules(criteria):
+    return [(key, column, op) for key, column, op in CRITERIA_RULES
+            if criteria.get(key) is not None]
+
+
+def criteria_mask(data, criteria):
+    """
+    Boolean mask of samples that meet every rule in criteria
+
+    Args:
+        data: DataFrame or mapping of column name -> array (any shape,
+              all columns broadcastable against each other)
+        criteria: Dict of thresholds; missing or None keys are skipped
+
+    Missing values (NaN) never pass.
+    """
+    mask = None
+    for key, column, op in _active_rules(criteria):
+        passed = op(np.asarray(data[column], dtype=float), criteria[key])
+        if mask is None:
+            mask = passed
+        else:
+            mask &= passed
+
+    if mask is None:
+        # No rules: every complete sample passes
+        return valid_mask(data, criteria)
+    return mask
+
+
+def valid_mask(data, criteria):
+    """Boolean mask of samples with a value for every column criteria uses"""
+    columns = {column for _, column, _ in _active_rules(criteria)} or {'temp_max'}
+    mask = None
+    for column in sorted(columns):
+        finite = np.isfinite(np.asarray(data[column], dtype=float))
+        mask = finite if mask is None else mask & finite
+    return mask
+
+
+def pass_probability(data, criteria, axis=0):
+    """
+    Percentage of samples that meet the criteria along axis
+
+    Samples with missing values are left out of the denominator. Returns
+    NaN where no sample is complete.
+    """
+    passes = criteria_mask(data, criteria).sum(axis=axis)
+    valid = valid_mask(data, criteria).sum(axis=axis)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(valid > 0, passes / np.maximum(valid, 1) * 100, np.nan)
+
+
+# Shapes of the weights used when pooling neighbouring days
+WINDOW_WEIGHTS = ('uniform', 'triangular', 'gaussian')
+
+
+def window_weights(days, weighting='uniform'):
+    """
+    Weights for offsets -days..+days around a date
+
+    'uniform' counts every day the same, 'triangular' falls off linearly
+    and 'gaussian' uses a normal curve with sigma = days / 2.
+    """
+    offsets = np.arange(-days, days + 1)
+    if weighting == 'uniform':
+        return np.ones(len(offsets))
+    if weighting == 'triangular':
+        return (days + 1 - np.abs(offsets)) / (days + 1)
+    if weighting == 'gaussian':
+        return np.exp(-0.5 * (offsets / max(days / 2, 1)) ** 2)
+    raise ValueError(f"Unknown window weighting '{weighting}' (expected one of {', '.join(WINDOW_WEIGHTS)})")
+
+
+def weighted_pass_probability(data, criteria, weights, axis=0):
+    """
+    Weighted percentage of samples that meet the criteria along axis
+
+    weights must broadcast against the data (e.g. per-offset weights for
+    the last axis of pooled windows). Missing samples carry no weight.
+    """
+    passes = (criteria_mask(data, criteria) * weights).sum(axis=axis)
+    valid = (valid_mask(data, criteria) * weights).sum(axis=axis)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(valid > 0, passes / np.where(valid > 0, valid, 1) * 100, np.nan)
+
+
+def load_profiles(path):
+    """
+    Load named criteria sets from a JSON file
+
+    The file maps profile name -> criteria dict. Both the generator's keys
+    (temp_min, temp_max) and the web app's preset keys (temp_min_ideal,
+    temp_max_ideal) are accepted; any other key raises ValueError, so a
+    misspelled threshold is not silently skipped.
+    """
+    with open(path, encoding='utf-8') as f:
+        raw = json.load(f)
+
+    known = [key for key, _, _ in CRITERIA_RULES] + list(WEB_CRITERIA_KEYS)
+    profiles = {}
+    for name, criteria in raw.items():
+        for key in criteria:
+            if key not in known:
+                raise ValueError(f"Unknown criteria key '{key}' in profile '{name}' of {path} "
+                                 f"(expected one of {', '.join(known)})")
+        profiles[name] = {WEB_CRITERIA_KEYS.get(key, key): value for key, value in criteria.items()}
+    return profiles
+
+
+def profiles_mask(data, profiles):
+    """
+    Evaluate many criteria sets in one pass
+
+    Args:
+        data: DataFrame or mapping of column name -> array of shape S
+        profiles: Dict of profile name -> criteria dict
+
+    Returns a boolean array of shape (len(profiles),) + S.
+    """
+    names = list(profiles)
+    columns = {}
+    mask = None
+    for key, column, op in CRITERIA_RULES:
+        thresholds = np.array([np.nan if profiles[name].get(key) is None else profiles[name][key]
+                               for name in names], dtype=float)
+        unset = np.isnan(thresholds)
+        if unset.all():
+            continue
+
+        if column not in columns:
+            columns[column] = np.asarray(data[column], dtype=float)
+        values = columns[column]
+        shape = (len(names),) + (1,) * values.ndim
+
+        passed = op(values[None, ...], thresholds.reshape(shape)) | unset.reshape(shape)
+        mask = passed if mask is None else mask & passed
+
+    if mask is None:
+        mask = np.ones((len(names),) + np.shape(data['temp_max']), dtype=bool)
+    return mask
+
+
+def evaluate_profiles(df, profiles):
+    """
+    Evaluate named criteria sets against the DataFrame from fetch_nasa_data
+
+    Returns (pass_matrix, probabilities): a profiles x years boolean
+    DataFrame and a Series of pass probabilities (%) per profile.
+    """
+    import pandas as pd
+
+    mask = profiles_mask(df, profiles)
+    pass_matrix = pd.DataFrame(mask, index=list(profiles), columns=df['year'].tolist())
+    probabilities = pass_matrix.mean(axis=1) * 100
+    probabilities.name = 'probability'
+    return pass_matrix, probabilities
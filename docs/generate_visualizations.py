@@ -10,22 +10,82 @@ Usage:
 python generate_visualizations.py
 """
 
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
-import pandas as pd
 from datetime import datetime, timedelta
+from calendar import monthrange
 import os
-import requests
+import argparse
+import contextlib
+import hashlib
+import importlib
+import inspect
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from power_cache import ResponseCache, POWER_GRID, snap_to_grid
+from power_fetcher import PowerClient, POWER_API_URL
+from power_stream import parse_power_stream
+from series_store import SeriesStore, year_ranges
+from hourly_series import HourlyMonth, HOURLY_PARAMETERS
+from climate_series import DailySeries, DAILY_PARAMETERS, DAYS_PER_YEAR, calendar_dates, day_of_year
+from probability_grid import grid_cells, grid_probabilities
+from probability_intervals import probability_intervals, bootstrap_interval, wilson_interval, year_bootstrap_interval
+from climate_trends import series_trends, dataframe_trends, trends_at, trend_direction
+from pipeline_metrics import LOG, METRICS, configure_logging
+from memory_cache import LRUCache
+from criteria import (criteria_mask, valid_mask, pass_probability, weighted_pass_probability,
+                      window_weights, WINDOW_WEIGHTS, evaluate_profiles, load_profiles)
+
+
+class _LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access
 
-# Set style
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (12, 6)
-plt.rcParams['font.size'] = 10
+    matplotlib, seaborn and pandas take most of the startup time, and a
+    data-only run (see evaluate_location) never needs them.
+    """
 
-# Create output directory
+    def __init__(self, name, setup=None):
+        self._name = name
+        self._setup = setup
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            if self._setup is not None:
+                self._setup()
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+_plotting_lock = threading.Lock()
+_plotting_ready = False
+
+def setup_plotting():
+    """Import matplotlib/seaborn and apply the figure style, once per process"""
+    global _plotting_ready
+    with _plotting_lock:
+        if _plotting_ready:
+            return
+        with METRICS.stage('import:plotting'):
+            import matplotlib.pyplot as pyplot
+            import seaborn
+
+            # Set style
+            seaborn.set_style("whitegrid")
+            pyplot.rcParams['figure.figsize'] = (12, 6)
+            pyplot.rcParams['font.size'] = 10
+        _plotting_ready = True
+
+plt = _LazyModule('matplotlib.pyplot', setup_plotting)
+sns = _LazyModule('seaborn', setup_plotting)
+pd = _LazyModule('pandas')
+
+# Output directory (created when the first figure or table is written)
 OUTPUT_DIR = "visualizations"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 # ============================================================================
 # EVENT CONFIGURATION - Edit these values to customize your analysis
@@ -46,6 +106,55 @@ EVENT_DATE = {
                            # Example: 14 for 2:00 PM, None for all-day data
 }
 
+# Figure export profiles: each is a list of (format, savefig options).
+# Several profiles can be combined in one run; every format is written
+# from the same rendered figure.
+EXPORT_PROFILES = {
+    'draft': [('png', {'dpi': 72})],
+    'web': [('webp', {'dpi': 110, 'pil_kwargs': {'quality': 80, 'method': 4}})],
+    'print': [('png', {'dpi': 300})],
+    'vector': [('svg', {}), ('pdf', {})]
+}
+EXPORT_PROFILE = 'print'
+
+# Alternative dates scanned around EVENT_DATE (Figure 6), up to a full year in total
+DATE_WINDOW = {
+    'days_before': 10,
+    'days_after': 6
+}
+
+# Pool each year's neighbouring days into the evaluation of a date, so it
+# rests on years x (2 * days + 1) samples instead of one per year
+POOLING_CONFIG = {
+    'days': 0,                  # +/- days pooled around each date (0 = off)
+    'weighting': 'triangular'   # 'uniform', 'triangular' or 'gaussian'
+}
+
+# Uncertainty of the pass probability (roughly 20 years per date)
+CONFIDENCE_CONFIG = {
+    'level': 0.95,           # Confidence level of the intervals
+    'resamples': 10000,      # Bootstrap resamples
+    'seed': 0                # Fixed seed keeps figures reproducible
+}
+
+# Linear trends per calendar day (figure 7 and batch trend tables)
+TREND_CONFIG = {
+    'window': 10,            # Years per rolling pass-probability window
+    'alpha': 0.05            # Significance level of a trend
+}
+
+# Hour-of-day x day heatmap for the event month (figure 12). Rendered
+# whenever EVENT_DATE['hour'] is set, since that data is fetched anyway.
+HOURLY_PROFILE = False
+
+# Probability map over a region (figure 11). POWER data comes on a
+# 0.5° x 0.625° grid, so sample points closer than that share a cell.
+GRID_CONFIG = {
+    'enabled': False,
+    'bbox': (-23.4, -44.9, -20.8, -41.0),  # (lat_min, lon_min, lat_max, lon_max): Rio de Janeiro state
+    'resolution': 0.25                      # Spacing of sample points (degrees)
+}
+
 # Climate criteria - ideal weather conditions
 CLIMATE_CRITERIA = {
     'temp_min': 27,          # Minimum temperature (°C)
@@ -54,8 +163,288 @@ CLIMATE_CRITERIA = {
     'wind_max': 15,          # Maximum wind speed (m/s)
     'humidity_max': 75       # Maximum relative humidity (%)
 }
+
+# Local cache for NASA POWER responses
+CACHE_CONFIG = {
+    'enabled': True,
+    'dir': '.power_cache',   # Cache directory (relative to where the script runs)
+    'max_size_mb': 500,      # Evict least recently used entries above this size
+    'max_age_days': 30,      # Re-download entries older than this
+    'offline': False         # Serve only from the cache, never call the API
+}
+
+# Concurrent fetching (hourly data is requested one year at a time)
+FETCH_CONFIG = {
+    'max_workers': 8,        # Concurrent requests in flight
+    'rate_per_sec': 5,       # Request rate ceiling, halved on every HTTP 429
+    'max_retries': 5         # Retries with jittered backoff on 429/5xx
+}
+
+# On-disk store of parsed daily series (float32 .npy columns, memory-mapped)
+STORE_CONFIG = {
+    'enabled': True,
+    'dir': '.series_store',  # Store directory (relative to where the script runs)
+    'gap_retry_days': [1, 7, 30]  # Re-request years with -999 gaps after these waits
+}
+
+# Parsed series kept in memory per process (least recently used dropped first)
+MEMORY_CACHE_CONFIG = {
+    'daily_series': 128,     # Locations x year ranges
+    'hourly_months': 64      # Locations x months
+}
+
+# Stage timings and profiling (see pipeline_metrics.py)
+METRICS_CONFIG = {
+    'jsonl': None,           # Append every stage event and the final summary to this JSON lines file
+    'profile_dir': None,     # Dump a cProfile .prof per top-level stage into this directory
+    'trace_memory': False,   # Record the tracemalloc peak of every top-level stage
+    'summary': True          # Print the stage timing table at the end of a run
+}
 # ============================================================================
 
+_response_cache = None
+_power_client = None
+_series_store = None
+_cell_locks = {}
+_shared_lock = threading.Lock()
+
+def get_response_cache():
+    """Return the shared response cache, or None if caching is disabled"""
+    global _response_cache
+    with _shared_lock:
+        if _response_cache is None and CACHE_CONFIG['enabled']:
+            _response_cache = ResponseCache(
+                cache_dir=CACHE_CONFIG['dir'],
+                max_size_mb=CACHE_CONFIG['max_size_mb'],
+                max_age_days=CACHE_CONFIG['max_age_days'],
+                offline=CACHE_CONFIG['offline']
+            )
+    return _response_cache
+
+def get_power_client():
+    """Return the shared pooled NASA POWER client"""
+    global _power_client
+    with _shared_lock:
+        if _power_client is None:
+            _power_client = PowerClient(
+                max_workers=FETCH_CONFIG['max_workers'],
+                rate_per_sec=FETCH_CONFIG['rate_per_sec'],
+                max_retries=FETCH_CONFIG['max_retries']
+            )
+    return _power_client
+
+def get_series_store():
+    """Return the shared daily series store, or None if it is disabled"""
+    global _series_store
+    with _shared_lock:
+        if _series_store is None and STORE_CONFIG['enabled']:
+            _series_store = SeriesStore(STORE_CONFIG['dir'])
+    return _series_store
+
+# Bytes read per step when streaming a response body
+STREAM_CHUNK_SIZE = 1 << 16
+
+def fetch_power_arrays(base_url, params, hourly=False, refresh=False):
+    """
+    GET a NASA POWER endpoint through the local response cache and
+    stream-parse the body into per-parameter float arrays
+
+    The body is never materialized as a dict: it is parsed chunk by chunk
+    (and written to the cache on the fly when downloading).
+
+    Returns dict of POWER parameter -> array indexed by day offset from
+    params['start'] (hour offset when hourly), NaN for missing values.
+    refresh=True skips the cached copy but still stores the new response.
+    Raises RuntimeError in offline mode when the response is not cached.
+    """
+    start = datetime.strptime(params['start'], '%Y%m%d')
+    n_days = (datetime.strptime(params['end'], '%Y%m%d') - start).days + 1
+
+    read_seconds = [0.0]
+
+    def metered(chunks, source):
+        """Count bytes and time spent waiting on the body, so parse time excludes it"""
+        chunks = iter(chunks)
+        while True:
+            started = time.perf_counter()
+            chunk = next(chunks, None)
+            read_seconds[0] += time.perf_counter() - started
+            if chunk is None:
+                return
+            METRICS.count(f'bytes_{source}', len(chunk))
+            yield chunk
+
+    def parse(chunks, source):
+        started = time.perf_counter()
+        arrays = parse_power_stream(metered(chunks, source), (start.year, start.month, start.day),
+                                    n_days, hourly=hourly)
+        METRICS.add(f'read:{source}', read_seconds[0])
+        METRICS.add('parse', time.perf_counter() - started - read_seconds[0])
+        return arrays
+
+    cache = get_response_cache()
+    if cache is not None:
+        key = ResponseCache.make_key(base_url, params['latitude'], params['longitude'],
+                                     params['parameters'], params['start'], params['end'])
+        cached = None if refresh and not cache.offline else cache.open(key)
+        if cached is not None:
+            with cached:
+                return parse(iter(lambda: cached.read(STREAM_CHUNK_SIZE), b''), 'cache')
+        if cache.offline:
+            raise RuntimeError(f"Offline mode: no cached response for {params['start']}-{params['end']}")
+
+    with get_power_client().get(base_url, params) as response:
+        body = response.iter_content(STREAM_CHUNK_SIZE)
+        if cache is None:
+            return parse(body, 'network')
+
+        with cache.writer(key) as out:
+            def tee():
+                for chunk in body:
+                    out.write(chunk)
+                    yield chunk
+
+            chunks = tee()
+            arrays = parse(chunks, 'network')
+            # Drain the trailing header/messages so the cached body is complete
+            for chunk in chunks:
+                METRICS.count('bytes_network', len(chunk))
+        return arrays
+
+# Full daily series already fetched in this process, keyed by grid cell and years
+_daily_series = LRUCache(MEMORY_CACHE_CONFIG['daily_series'])
+
+def default_year_range():
+    """Last 20 complete years"""
+    current_year = datetime.now().year
+    return current_year - 20, current_year - 1
+
+def _fetch_daily_range(latitude, longitude, start_year, end_year, refresh=False):
+    """Download and parse whole years of daily data in one request"""
+    params = {
+        'parameters': ','.join(DAILY_PARAMETERS),
+        'community': 'RE',
+        'longitude': longitude,
+        'latitude': latitude,
+        'start': f'{start_year}0101',
+        'end': f'{end_year}1231',
+        'format': 'JSON'
+    }
+    arrays = fetch_power_arrays(f"{POWER_API_URL}/temporal/daily/point", params, refresh=refresh)
+    with METRICS.stage('build:daily'):
+        return DailySeries.from_day_arrays(arrays, start_year, end_year)
+
+def _cell_lock(latitude, longitude):
+    """Lock serializing store updates for one grid cell"""
+    with _shared_lock:
+        return _cell_locks.setdefault(snap_to_grid(latitude, longitude), threading.Lock())
+
+def refresh_daily_series(latitude, longitude, start_year, end_year):
+    """
+    Bring the stored series for a location up to date incrementally
+
+    Only years that are not stored yet, or that were stored with -999
+    gaps and are due for a retry (STORE_CONFIG['gap_retry_days']), are
+    requested, one request per run of consecutive years. New data is
+    merged into the store; values already stored are never replaced
+    by gaps.
+
+    Returns the list of years that were requested.
+    """
+    store = get_series_store()
+    retry_days = [] if CACHE_CONFIG['offline'] else STORE_CONFIG['gap_retry_days']
+
+    with _cell_lock(latitude, longitude):
+        meta = store.meta(latitude, longitude)
+        stored = range(meta['start_year'], meta['end_year'] + 1) if meta else range(0)
+        stale = store.stale_years(latitude, longitude, start_year, end_year, retry_days)
+        if not stale:
+            return []
+
+        def fetch(run):
+            first, last = run
+            # Gap retries must skip the response cache or the same gaps come back
+            retry = any(year in stored for year in range(first, last + 1))
+            return _fetch_daily_range(latitude, longitude, first, last, refresh=retry)
+
+        for series in get_power_client().map(fetch, year_ranges(stale)):
+            store.write(latitude, longitude, series)
+        store.record_gaps(latitude, longitude, stale)
+    return stale
+
+def fetch_daily_series(latitude, longitude, start_year=None, end_year=None):
+    """
+    Fetch the full daily series for a location from NASA POWER
+
+    One request covers every day of every year, so any month/day can then
+    be answered with DailySeries.for_date() / window() without further
+    network calls. Parsed series are kept in the series store, so later
+    runs memory-map them and only download the years that are missing or
+    due for a gap retry (see refresh_daily_series).
+
+    Returns a DailySeries with (years x 366) arrays per parameter
+    """
+    if start_year is None or end_year is None:
+        start_year, end_year = default_year_range()
+
+    def fetch():
+        if get_series_store() is None:
+            return _fetch_daily_range(latitude, longitude, start_year, end_year)
+        refreshed = refresh_daily_series(latitude, longitude, start_year, end_year)
+        if refreshed:
+            years = ', '.join(str(a) if a == b else f'{a}-{b}' for a, b in year_ranges(refreshed))
+            METRICS.event('series_downloaded', f"   Downloaded daily data for {years}",
+                          latitude=latitude, longitude=longitude, years=refreshed)
+        return get_series_store().open(latitude, longitude).select(start_year, end_year)
+
+    # Concurrent callers for the same cell share one fetch
+    return _daily_series.get_or_compute((snap_to_grid(latitude, longitude), start_year, end_year), fetch)
+
+# Hourly months already fetched in this process, keyed by grid cell, month and years
+_hourly_months = LRUCache(MEMORY_CACHE_CONFIG['hourly_months'])
+
+def fetch_hourly_month(latitude, longitude, month, start_year=None, end_year=None):
+    """
+    Fetch every hour of one calendar month for each year from NASA POWER
+
+    The hourly endpoint has size limits, so one request per year covers
+    just that month; the requests run concurrently through the shared
+    client and response cache.
+
+    Returns an HourlyMonth with (years x 31 x 24) arrays per parameter
+    """
+    if start_year is None or end_year is None:
+        start_year, end_year = default_year_range()
+
+    key = (snap_to_grid(latitude, longitude), month, start_year, end_year)
+    return _hourly_months.get_or_compute(
+        key, lambda: _fetch_hourly_month(latitude, longitude, month, start_year, end_year))
+
+def _fetch_hourly_month(latitude, longitude, month, start_year, end_year):
+    """Download and parse one month of hourly data, one request per year"""
+    base_url = f"{POWER_API_URL}/temporal/hourly/point"
+    client = get_power_client()
+    METRICS.event('hourly_fetch', f"   Fetching hourly data year by year ({client.max_workers} concurrent requests)...",
+                  latitude=latitude, longitude=longitude, month=month, workers=client.max_workers)
+
+    def year_params(year):
+        # Request only the specific month for this year
+        _, days_in_month = monthrange(year, month)
+        return {
+            'parameters': ','.join(HOURLY_PARAMETERS),
+            'community': 'RE',
+            'longitude': longitude,
+            'latitude': latitude,
+            'start': f'{year}{month:02d}01',
+            'end': f'{year}{month:02d}{days_in_month:02d}',
+            'format': 'JSON'
+        }
+
+    years = list(range(start_year, end_year + 1))
+    payloads = client.map(lambda year: fetch_power_arrays(base_url, year_params(year), hourly=True), years)
+    with METRICS.stage('build:hourly'):
+        return HourlyMonth.from_hour_arrays(years, month, payloads)
+
 def fetch_nasa_data(latitude=-22.9068, longitude=-43.1729, month=12, day=25, hour=None):
     """
     Fetch real historical climate data from NASA POWER API
@@ -71,232 +460,300 @@ def fetch_nasa_data(latitude=-22.9068, longitude=-43.1729, month=12, day=25, hou
     Returns DataFrame with 20 years of data for the specified date/time
     """
     time_str = f" at {hour:02d}:00" if hour is not None else " (daily)"
-    print(f"📡 Fetching real NASA data for lat={latitude}, lon={longitude}, month={month:02d}/{day:02d}{time_str}...")
+    METRICS.event('fetch_start',
+                  f"📡 Fetching real NASA data for lat={latitude}, lon={longitude}, "
+                  f"month={month:02d}/{day:02d}{time_str}...",
+                  latitude=latitude, longitude=longitude, month=month, day=day, hour=hour)
 
     # Get last 20 years of data
-    current_year = datetime.now().year
-    start_year = current_year - 20
-    end_year = current_year - 1
-
-    # Choose API endpoint based on whether we need hourly data
-    if hour is not None:
-        # Hourly data endpoint - request only the specific month to avoid size limits
-        # We'll need to make multiple requests (one per year)
-        base_url = "https://power.larc.nasa.gov/api/temporal/hourly/point"
-        # We'll build this in the loop below
-        params = None
-    else:
-        # Daily data endpoint - can request all years at once
-        base_url = "https://power.larc.nasa.gov/api/temporal/daily/point"
-        params = {
-            'parameters': 'T2M_MAX,T2M_MIN,PRECTOTCORR,WS10M,RH2M',
-            'community': 'RE',
-            'longitude': longitude,
-            'latitude': latitude,
-            'start': f'{start_year}0101',
-            'end': f'{end_year}1231',
-            'format': 'JSON'
-        }
-
-    # Extract data for the specific date (month/day) across all years
-    years = []
-    temp_max = []
-    temp_min = []
-    precipitation = []
-    wind = []
-    humidity = []
+    start_year, end_year = default_year_range()
 
     try:
         if hour is not None:
-            # For hourly data: make separate requests for each year to avoid size limits
-            print(f"   Fetching hourly data year by year (this may take a moment)...")
-
-            from calendar import monthrange
-            # Get the number of days in the target month
-            _, days_in_month = monthrange(start_year, month)
-
-            for year in range(start_year, end_year + 1):
-                # Request only the specific month for this year
-                params = {
-                    'parameters': 'T2M,PRECTOTCORR,WS10M,RH2M',
-                    'community': 'RE',
-                    'longitude': longitude,
-                    'latitude': latitude,
-                    'start': f'{year}{month:02d}01',
-                    'end': f'{year}{month:02d}{days_in_month}',
-                    'format': 'JSON'
-                }
-
-                response = requests.get(base_url, params=params, timeout=30)
-                response.raise_for_status()
-                data = response.json()
-
-                if 'properties' not in data or 'parameter' not in data['properties']:
-                    continue
-
-                parameters = data['properties']['parameter']
-
-                # Extract data for the specific hour
-                date_key = f'{year}{month:02d}{day:02d}{hour:02d}'
-
-                if date_key in parameters.get('T2M', {}):
-                    temp = parameters['T2M'][date_key]
-                    precip = parameters['PRECTOTCORR'][date_key]
-                    ws = parameters['WS10M'][date_key]
-                    rh = parameters['RH2M'][date_key]
-
-                    # Skip if any value is missing (-999)
-                    if all(v != -999 for v in [temp, precip, ws, rh]):
-                        years.append(year)
-                        temp_max.append(temp)
-                        temp_min.append(temp)
-                        precipitation.append(precip)
-                        wind.append(ws)
-                        humidity.append(rh)
-
-                # Small delay to avoid rate limiting
-                import time
-                time.sleep(0.1)
+            # Every hour of the month is kept; this run only needs one of them
+            hourly = fetch_hourly_month(latitude, longitude, month, start_year, end_year)
+            with METRICS.stage('build:dataframe'):
+                df = hourly.for_hour(day, hour)
         else:
-            # For daily data: single request for all years
-            response = requests.get(base_url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-
-            if 'properties' not in data or 'parameter' not in data['properties']:
-                raise ValueError("Invalid response from NASA POWER API")
-
-            parameters = data['properties']['parameter']
-
-            for year in range(start_year, end_year + 1):
-                # For daily data: YYYYMMDD format
-                date_key = f'{year}{month:02d}{day:02d}'
-
-                # Check if data exists for this date
-                if date_key in parameters.get('T2M_MAX', {}):
-                    t_max = parameters['T2M_MAX'][date_key]
-                    t_min = parameters['T2M_MIN'][date_key]
-                    precip = parameters['PRECTOTCORR'][date_key]
-                    ws = parameters['WS10M'][date_key]
-                    rh = parameters['RH2M'][date_key]
-
-                    # Skip if any value is missing (-999)
-                    if all(v != -999 for v in [t_max, t_min, precip, ws, rh]):
-                        years.append(year)
-                        temp_max.append(t_max)
-                        temp_min.append(t_min)
-                        precipitation.append(precip)
-                        wind.append(ws)
-                        humidity.append(rh)
-
-        df = pd.DataFrame({
-            'year': years,
-            'temp_max': temp_max,
-            'temp_min': temp_min,
-            'precipitation': precipitation,
-            'wind': wind,
-            'humidity': humidity
-        })
-
-        print(f"✓ Fetched {len(df)} years of real NASA data")
-        print(f"  Temperature range: {df['temp_max'].min():.1f}°C - {df['temp_max'].max():.1f}°C")
-        print(f"  Precipitation range: {df['precipitation'].min():.1f} - {df['precipitation'].max():.1f} mm/day")
-
-        return df
+            # For daily data: a single request for all years, sliced locally
+            series = fetch_daily_series(latitude, longitude, start_year, end_year)
+            with METRICS.stage('build:dataframe'):
+                df = series.for_date(month, day)
 
     except Exception as e:
-        print(f"❌ Error fetching NASA data: {e}")
-        raise RuntimeError(f"Failed to fetch data from NASA POWER API: {e}")
+        # The caller reports it; the counter keeps failures in the summary
+        METRICS.count('fetch_errors')
+        raise RuntimeError(f"Failed to fetch data from NASA POWER API: {e}") from e
+
+    METRICS.event('fetch_done',
+                  f"✓ Fetched {len(df)} years of real NASA data\n"
+                  f"  Temperature range: {df['temp_max'].min():.1f}°C - {df['temp_max'].max():.1f}°C\n"
+                  f"  Precipitation range: {df['precipitation'].min():.1f} - {df['precipitation'].max():.1f} mm/day",
+                  years=len(df), temp_max_range=[float(df['temp_max'].min()), float(df['temp_max'].max())],
+                  precipitation_range=[float(df['precipitation'].min()), float(df['precipitation'].max())])
+    return df
+
+def fetch_grid(bbox, resolution, month, day, criteria):
+    """
+    Pass probabilities for every POWER cell in a bounding box
+
+    Cells are fetched concurrently through the shared client, response
+    cache and series store; see probability_grid.grid_probabilities for
+    the returned DataFrame.
+    """
+    cells = grid_cells(bbox, resolution)
+    METRICS.event('grid_cells', f"   Grid: {len(cells)} POWER cells in {bbox} at {resolution}°",
+                  cells=len(cells), bbox=list(bbox), resolution=resolution)
+    series_list = get_power_client().map(lambda cell: fetch_daily_series(*cell), cells)
+    with METRICS.stage('evaluate:grid'):
+        return grid_probabilities(cells, series_list, month, day, criteria)
+
+def default_context():
+    """
+    Plot inputs taken from the module-level configuration
+
+    Every plot_N function takes its location, event date, criteria and
+    output directory from a context dict like this one, so figures can be
+    rendered in worker processes without relying on globals.
+    """
+    return {
+        'location': dict(LOCATION),
+        'event_date': dict(EVENT_DATE),
+        'criteria': dict(CLIMATE_CRITERIA),
+        'date_window': dict(DATE_WINDOW),
+        'pooling': dict(POOLING_CONFIG),
+        'confidence': dict(CONFIDENCE_CONFIG),
+        'trends': dict(TREND_CONFIG),
+        'grid': dict(GRID_CONFIG),
+        'output_dir': OUTPUT_DIR,
+        'export': EXPORT_PROFILE,
+        'reuse_figures': False
+    }
+
+def export_formats(profiles):
+    """
+    Resolve a comma-separated list of export profile names to (format, options) pairs
+
+    Every format is written to <name>.<format>, so two profiles that
+    export the same format with different options (e.g. draft,print)
+    are rejected instead of overwriting each other's file.
+    """
+    formats = []
+    for name in profiles.split(','):
+        name = name.strip()
+        if name not in EXPORT_PROFILES:
+            raise ValueError(f"Unknown export profile '{name}' (choose from {', '.join(EXPORT_PROFILES)})")
+        for fmt, options in EXPORT_PROFILES[name]:
+            chosen = next((o for f, o in formats if f == fmt), None)
+            if chosen is None:
+                formats.append((fmt, options))
+            elif chosen != options:
+                raise ValueError(f"Export profiles '{profiles}' write {fmt} with different options; "
+                                 f"choose one of them")
+    return formats
+
+def save_figure(fig, name, ctx, keep=False):
+    """
+    Lay out, export and close a finished figure
+
+    Writes ctx['output_dir']/<name>.<ext> for every format in the
+    context's export profiles and returns the written paths. With keep
+    the figure stays open for the next dataset (see render_template).
+    """
+    with METRICS.stage('layout'):
+        if keep:
+            # tight_layout starts from the current subplot parameters;
+            # reset them so a reused figure lays out like a new one
+            fig.subplots_adjust(**{k: plt.rcParams[f'figure.subplot.{k}']
+                                   for k in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')})
+        fig.tight_layout()
+    paths = []
+    for fmt, options in export_formats(ctx['export']):
+        path = f"{ctx['output_dir']}/{name}.{fmt}"
+        with METRICS.stage(f'savefig:{fmt}'):
+            fig.savefig(path, format=fmt, bbox_inches='tight', **options)
+        paths.append(path)
+    if not keep:
+        plt.close(fig)
+    return paths
+
+# Figures kept open for reuse in this process: name -> (layout key, artists)
+_figure_templates = {}
+
+def render_template(name, args, ctx):
+    """
+    Render a figure from its template in FIGURE_TEMPLATES
+
+    The layout function builds the figure and everything that does not
+    depend on the data; the draw function then sets the data artists,
+    titles and limits. With ctx['reuse_figures'] the built figure is
+    kept and later datasets only go through the draw step, as long as
+    the parts of the context the layout reads are unchanged. The saved
+    files are the same either way, and the same as the original
+    single-pass plot functions (test_figure_templates.py checks both).
+    """
+    layout, draw, layout_key = FIGURE_TEMPLATES[name]
+    reuse = ctx.get('reuse_figures', False)
+    key = json.dumps(layout_key(ctx), sort_keys=True, default=str)
+
+    cached = _figure_templates.pop(name, None)
+    if cached is not None and cached[0] == key and reuse:
+        artists = cached[1]
+    else:
+        if cached is not None:
+            plt.close(cached[1]['fig'])
+        with METRICS.stage('template:build'):
+            artists = layout(ctx)
+
+    draw(artists, *args, ctx=ctx)
+    paths = save_figure(artists['fig'], name, ctx, keep=reuse)
+    if reuse:
+        _figure_templates[name] = (key, artists)
+    return paths
+
+def _relim_data(ax, thresholds):
+    """relim() over the data artists only, leaving out the threshold lines"""
+    for line in thresholds:
+        line.set_visible(False)
+    ax.relim(visible_only=True)
+    for line in thresholds:
+        line.set_visible(True)
+
+def _autoscale_thresholds(ax, thresholds):
+    """
+    Autoscale as if the axhline thresholds were drawn after the data
+
+    The original figures plotted the data and then called axhline, which
+    only rescales when its value is outside the current limits; fitting
+    every threshold would move the limits whenever one sits in the
+    margins. Call after _relim_data and any collections are added.
+    """
+    ax.autoscale_view()
+    for line in thresholds:
+        low, high = ax.get_ybound()
+        y = line.get_ydata()[0]
+        ax.update_datalim([(0, y)], updatex=False)
+        if y < low or y > high:
+            ax.autoscale_view()
+
+def _layout_1(ctx):
+    """Figure 1 layout: empty temperature lines, thresholds, labels and legend"""
+    event_date = ctx['event_date']
+    criteria = ctx['criteria']
 
-def plot_1_temperature_timeseries(df):
-    """Figure 1: Temperature variation over 20 years"""
     fig, ax = plt.subplots(figsize=(14, 6))
 
     # Check if we're using hourly or daily data
-    is_hourly = EVENT_DATE['hour'] is not None
+    is_hourly = event_date['hour'] is not None
 
     if is_hourly:
         # For hourly data, temp_max and temp_min are the same
-        ax.plot(df['year'], df['temp_max'], 'o-', color='#e74c3c',
-                linewidth=2, markersize=8, label=f'Temperature at {EVENT_DATE["hour"]:02d}:00')
+        lines = ax.plot([], [], 'o-', color='#e74c3c',
+                        linewidth=2, markersize=8, label=f'Temperature at {event_date["hour"]:02d}:00')
     else:
-        ax.plot(df['year'], df['temp_max'], 'o-', color='#e74c3c',
-                linewidth=2, markersize=8, label='Maximum Temperature')
-        ax.plot(df['year'], df['temp_min'], 's-', color='#3498db',
-                linewidth=2, markersize=8, label='Minimum Temperature')
+        lines = ax.plot([], [], 'o-', color='#e74c3c',
+                        linewidth=2, markersize=8, label='Maximum Temperature')
+        lines += ax.plot([], [], 's-', color='#3498db',
+                         linewidth=2, markersize=8, label='Minimum Temperature')
 
     # Add threshold lines
-    ax.axhline(y=CLIMATE_CRITERIA['temp_min'], color='green', linestyle='--', alpha=0.5,
-               label=f'Ideal Min ({CLIMATE_CRITERIA["temp_min"]}°C)')
-    ax.axhline(y=CLIMATE_CRITERIA['temp_max'], color='red', linestyle='--', alpha=0.5,
-               label=f'Max Safe ({CLIMATE_CRITERIA["temp_max"]}°C)')
+    thresholds = [
+        ax.axhline(y=criteria['temp_min'], color='green', linestyle='--', alpha=0.5,
+                   label=f'Ideal Min ({criteria["temp_min"]}°C)'),
+        ax.axhline(y=criteria['temp_max'], color='red', linestyle='--', alpha=0.5,
+                   label=f'Max Safe ({criteria["temp_max"]}°C)')
+    ]
 
     ax.set_xlabel('Year', fontsize=12, fontweight='bold')
     ax.set_ylabel('Temperature (°C)', fontsize=12, fontweight='bold')
+    ax.legend(loc='upper left', fontsize=10)
+    ax.grid(True, alpha=0.3)
+
+    return {'fig': fig, 'ax': ax, 'lines': lines, 'thresholds': thresholds}
+
+def _draw_1(t, df, ctx):
+    """Figure 1 data: temperature lines and title"""
+    event_date = ctx['event_date']
+    location = ctx['location']
+    ax = t['ax']
+
+    for line, column in zip(t['lines'], ('temp_max', 'temp_min')):
+        line.set_data(df['year'], df[column])
+    _relim_data(ax, t['thresholds'])
+    _autoscale_thresholds(ax, t['thresholds'])
 
     # Dynamic title based on data type
-    time_str = f" at {EVENT_DATE['hour']:02d}:00" if is_hourly else ""
-    date_str = f"{EVENT_DATE['month']:02d}/{EVENT_DATE['day']:02d}"
-    ax.set_title(f'Temperature Over 20 Years - {date_str}{time_str}\n{LOCATION["name"]}',
+    time_str = f" at {event_date['hour']:02d}:00" if event_date['hour'] is not None else ""
+    date_str = f"{event_date['month']:02d}/{event_date['day']:02d}"
+    ax.set_title(f'Temperature Over 20 Years - {date_str}{time_str}\n{location["name"]}',
                  fontsize=14, fontweight='bold')
-    ax.legend(loc='upper left', fontsize=10)
-    ax.grid(True, alpha=0.3)
 
-    plt.tight_layout()
-    plt.savefig(f'{OUTPUT_DIR}/01_temperature_timeseries.png', dpi=300, bbox_inches='tight')
-    print("✓ Generated: 01_temperature_timeseries.png")
-    plt.close()
+def plot_1_temperature_timeseries(df, ctx=None):
+    """Figure 1: Temperature variation over 20 years"""
+    render_template('01_temperature_timeseries', (df,), ctx or default_context())
 
-def plot_2_precipitation_pattern(df):
-    """Figure 2: Precipitation pattern over years"""
-    fig, ax = plt.subplots(figsize=(14, 6))
+def _layout_2(ctx):
+    """Figure 2 layout: threshold line, labels and legend"""
+    event_date = ctx['event_date']
+    criteria = ctx['criteria']
 
-    colors = ['green' if p <= CLIMATE_CRITERIA['precipitation_max'] else 'red' for p in df['precipitation']]
-    bars = ax.bar(df['year'], df['precipitation'], color=colors, alpha=0.7, edgecolor='black')
+    fig, ax = plt.subplots(figsize=(14, 6))
 
     # Add threshold line
-    ax.axhline(y=CLIMATE_CRITERIA['precipitation_max'], color='orange', linestyle='--', linewidth=2,
-               label=f'Maximum Acceptable ({CLIMATE_CRITERIA["precipitation_max"]}mm)')
+    threshold = ax.axhline(y=criteria['precipitation_max'], color='orange', linestyle='--', linewidth=2,
+                           label=f'Maximum Acceptable ({criteria["precipitation_max"]}mm)')
 
     ax.set_xlabel('Year', fontsize=12, fontweight='bold')
-    precip_unit = 'mm/hour' if EVENT_DATE['hour'] is not None else 'mm/day'
+    precip_unit = 'mm/hour' if event_date['hour'] is not None else 'mm/day'
     ax.set_ylabel(f'Precipitation ({precip_unit})', fontsize=12, fontweight='bold')
+    ax.legend(fontsize=10)
+    ax.grid(True, alpha=0.3, axis='y')
+
+    return {'fig': fig, 'ax': ax, 'bars': None, 'thresholds': [threshold]}
+
+def _draw_2(t, df, ctx):
+    """Figure 2 data: one bar per year, colored by the threshold, and title"""
+    event_date = ctx['event_date']
+    criteria = ctx['criteria']
+    ax = t['ax']
+
+    # The number of years varies, so the bars are rebuilt
+    if t['bars'] is not None:
+        t['bars'].remove()
+    colors = ['green' if p <= criteria['precipitation_max'] else 'red' for p in df['precipitation']]
+    t['bars'] = ax.bar(df['year'], df['precipitation'], color=colors, alpha=0.7, edgecolor='black')
+    _relim_data(ax, t['thresholds'])
+    _autoscale_thresholds(ax, t['thresholds'])
 
-    time_str = f" at {EVENT_DATE['hour']:02d}:00" if EVENT_DATE['hour'] is not None else ""
-    date_str = f"{EVENT_DATE['month']:02d}/{EVENT_DATE['day']:02d}"
+    time_str = f" at {event_date['hour']:02d}:00" if event_date['hour'] is not None else ""
+    date_str = f"{event_date['month']:02d}/{event_date['day']:02d}"
     ax.set_title(f'Precipitation Pattern - {date_str}{time_str}\nGreen = Acceptable, Red = Too Much Rain',
                  fontsize=14, fontweight='bold')
-    ax.legend(fontsize=10)
-    ax.grid(True, alpha=0.3, axis='y')
 
-    plt.tight_layout()
-    plt.savefig(f'{OUTPUT_DIR}/02_precipitation_pattern.png', dpi=300, bbox_inches='tight')
-    print("✓ Generated: 02_precipitation_pattern.png")
-    plt.close()
+def plot_2_precipitation_pattern(df, ctx=None):
+    """Figure 2: Precipitation pattern over years"""
+    render_template('02_precipitation_pattern', (df,), ctx or default_context())
 
-def plot_3_multi_parameter_dashboard(df):
-    """Figure 3: All parameters in one dashboard"""
-    fig, axes = plt.subplots(2, 2, figsize=(16, 10))
+def _layout_3(ctx):
+    """Figure 3 layout: four panels with empty lines, thresholds, labels and legends"""
+    event_date = ctx['event_date']
+    criteria = ctx['criteria']
 
-    time_str = f" at {EVENT_DATE['hour']:02d}:00" if EVENT_DATE['hour'] is not None else ""
-    date_str = f"{EVENT_DATE['month']:02d}/{EVENT_DATE['day']:02d}"
-    fig.suptitle(f'Complete Climate Profile - {date_str}{time_str} ({LOCATION["name"]})',
-                 fontsize=16, fontweight='bold')
+    fig, axes = plt.subplots(2, 2, figsize=(16, 10))
 
     # Temperature
     ax1 = axes[0, 0]
-    is_hourly = EVENT_DATE['hour'] is not None
+    is_hourly = event_date['hour'] is not None
 
     if is_hourly:
         # For hourly data, show only one temperature line
-        ax1.plot(df['year'], df['temp_max'], 'o-', color='#e74c3c',
-                linewidth=2, markersize=6, label=f'Temperature at {EVENT_DATE["hour"]:02d}:00')
+        temp_lines = ax1.plot([], [], 'o-', color='#e74c3c',
+                              linewidth=2, markersize=6, label=f'Temperature at {event_date["hour"]:02d}:00')
         ax1.set_title('Temperature', fontweight='bold')
     else:
-        # For daily data, show min and max
-        ax1.fill_between(df['year'], df['temp_min'], df['temp_max'], alpha=0.3, color='orange')
-        ax1.plot(df['year'], df['temp_max'], 'o-', color='red', label='Max')
-        ax1.plot(df['year'], df['temp_min'], 's-', color='blue', label='Min')
+        # For daily data, show min and max (the band between them is data)
+        temp_lines = ax1.plot([], [], 'o-', color='red', label='Max')
+        temp_lines += ax1.plot([], [], 's-', color='blue', label='Min')
         ax1.set_title('Temperature Range', fontweight='bold')
 
     ax1.set_ylabel('Temperature (°C)', fontweight='bold')
@@ -305,9 +762,7 @@ def plot_3_multi_parameter_dashboard(df):
 
     # Precipitation
     ax2 = axes[0, 1]
-    ax2.scatter(df['year'], df['precipitation'], s=100, c=df['precipitation'],
-                cmap='Blues', edgecolors='black', linewidth=1)
-    ax2.axhline(y=1, color='red', linestyle='--', label='Max (1mm)')
+    precipitation_max = ax2.axhline(y=1, color='red', linestyle='--', label='Max (1mm)')
     ax2.set_ylabel('Precipitation (mm)', fontweight='bold')
     ax2.set_title('Precipitation', fontweight='bold')
     ax2.legend()
@@ -315,9 +770,9 @@ def plot_3_multi_parameter_dashboard(df):
 
     # Wind Speed
     ax3 = axes[1, 0]
-    ax3.plot(df['year'], df['wind'], 'D-', color='green', linewidth=2, markersize=6)
-    ax3.axhline(y=CLIMATE_CRITERIA['wind_max'], color='orange', linestyle='--',
-                label=f'Max Safe ({CLIMATE_CRITERIA["wind_max"]}m/s)')
+    wind_line, = ax3.plot([], [], 'D-', color='green', linewidth=2, markersize=6)
+    wind_max = ax3.axhline(y=criteria['wind_max'], color='orange', linestyle='--',
+                           label=f'Max Safe ({criteria["wind_max"]}m/s)')
     ax3.set_xlabel('Year', fontweight='bold')
     ax3.set_ylabel('Wind Speed (m/s)', fontweight='bold')
     ax3.set_title('Wind Speed', fontweight='bold')
@@ -326,58 +781,67 @@ def plot_3_multi_parameter_dashboard(df):
 
     # Humidity
     ax4 = axes[1, 1]
-    ax4.plot(df['year'], df['humidity'], '^-', color='purple', linewidth=2, markersize=6)
-    ax4.axhline(y=CLIMATE_CRITERIA['humidity_max'], color='red', linestyle='--',
-                label=f'Max ({CLIMATE_CRITERIA["humidity_max"]}%)')
+    humidity_line, = ax4.plot([], [], '^-', color='purple', linewidth=2, markersize=6)
+    humidity_max = ax4.axhline(y=criteria['humidity_max'], color='red', linestyle='--',
+                               label=f'Max ({criteria["humidity_max"]}%)')
     ax4.set_xlabel('Year', fontweight='bold')
     ax4.set_ylabel('Humidity (%)', fontweight='bold')
     ax4.set_title('Relative Humidity', fontweight='bold')
     ax4.legend()
     ax4.grid(True, alpha=0.3)
 
-    plt.tight_layout()
-    plt.savefig(f'{OUTPUT_DIR}/03_multi_parameter_dashboard.png', dpi=300, bbox_inches='tight')
-    print("✓ Generated: 03_multi_parameter_dashboard.png")
-    plt.close()
+    return {'fig': fig, 'axes': axes, 'temp_lines': temp_lines, 'wind_line': wind_line,
+            'humidity_line': humidity_line, 'band': None, 'scatter': None,
+            'thresholds': {'precipitation': precipitation_max, 'wind': wind_max, 'humidity': humidity_max}}
 
-def plot_4_criteria_evaluation(df):
-    """Figure 4: Year-by-year criteria evaluation"""
-    # Use global climate criteria
-    criteria = CLIMATE_CRITERIA
-
-    # Evaluate each year
-    ideal_years = []
-    failed_years = []
-
-    for _, row in df.iterrows():
-        is_ideal = (
-            row['temp_min'] >= criteria['temp_min'] and
-            row['temp_max'] <= criteria['temp_max'] and
-            row['precipitation'] <= criteria['precipitation_max'] and
-            row['wind'] <= criteria['wind_max'] and
-            row['humidity'] <= criteria['humidity_max']
-        )
+def _draw_3(t, df, ctx):
+    """Figure 3 data: all four parameters and the title"""
+    event_date = ctx['event_date']
+    location = ctx['location']
+    axes = t['axes']
 
-        if is_ideal:
-            ideal_years.append(row['year'])
-        else:
-            failed_years.append(row['year'])
+    time_str = f" at {event_date['hour']:02d}:00" if event_date['hour'] is not None else ""
+    date_str = f"{event_date['month']:02d}/{event_date['day']:02d}"
+    t['fig'].suptitle(f'Complete Climate Profile - {date_str}{time_str} ({location["name"]})',
+                      fontsize=16, fontweight='bold')
 
-    # Create bar chart
-    fig, ax = plt.subplots(figsize=(14, 6))
+    # Collections are not covered by relim(), so they are rebuilt after it
+    for key in ('band', 'scatter'):
+        if t[key] is not None:
+            t[key].remove()
 
-    ideal_mask = df['year'].isin(ideal_years)
-    colors = ['#2ecc71' if ideal else '#e74c3c' for ideal in ideal_mask]
+    ax1 = axes[0, 0]
+    for line, column in zip(t['temp_lines'], ('temp_max', 'temp_min')):
+        line.set_data(df['year'], df[column])
+    ax1.relim()
+    if event_date['hour'] is None:
+        t['band'] = ax1.fill_between(df['year'], df['temp_min'], df['temp_max'], alpha=0.3, color='orange')
+    ax1.autoscale_view()
 
-    bars = ax.bar(df['year'], [1]*len(df), color=colors, alpha=0.8, edgecolor='black')
+    ax2 = axes[0, 1]
+    thresholds = [t['thresholds']['precipitation']]
+    _relim_data(ax2, thresholds)
+    t['scatter'] = ax2.scatter(df['year'], df['precipitation'], s=100, c=df['precipitation'],
+                               cmap='Blues', edgecolors='black', linewidth=1)
+    _autoscale_thresholds(ax2, thresholds)
+
+    for ax, line, column in ((axes[1, 0], t['wind_line'], 'wind'),
+                             (axes[1, 1], t['humidity_line'], 'humidity')):
+        line.set_data(df['year'], df[column])
+        _relim_data(ax, [t['thresholds'][column]])
+        _autoscale_thresholds(ax, [t['thresholds'][column]])
+
+def plot_3_multi_parameter_dashboard(df, ctx=None):
+    """Figure 3: All parameters in one dashboard"""
+    render_template('03_multi_parameter_dashboard', (df,), ctx or default_context())
+
+def _layout_4(ctx):
+    """Figure 4 layout: pass/fail axis, labels and legend"""
+    fig, ax = plt.subplots(figsize=(14, 6))
 
     ax.set_ylim(0, 1.2)
     ax.set_ylabel('Status', fontweight='bold')
     ax.set_xlabel('Year', fontweight='bold')
-    ax.set_title(f'Year-by-Year Evaluation (Beach Event Criteria)\n' +
-                 f'✓ Ideal: {len(ideal_years)} years | ✗ Failed: {len(failed_years)} years | ' +
-                 f'Probability: {len(ideal_years)/len(df)*100:.0f}%',
-                 fontsize=14, fontweight='bold')
     ax.set_yticks([0.5])
     ax.set_yticklabels(['PASS/FAIL'])
 
@@ -389,21 +853,44 @@ def plot_4_criteria_evaluation(df):
     ]
     ax.legend(handles=legend_elements, loc='upper right', fontsize=11)
 
-    plt.tight_layout()
-    plt.savefig(f'{OUTPUT_DIR}/04_criteria_evaluation.png', dpi=300, bbox_inches='tight')
-    print("✓ Generated: 04_criteria_evaluation.png")
-    plt.close()
+    return {'fig': fig, 'ax': ax, 'bars': None}
 
-    return len(ideal_years), len(df)
+def _draw_4(t, df, ctx):
+    """Figure 4 data: one pass/fail bar per year and the counts in the title"""
+    criteria = ctx['criteria']
+    ax = t['ax']
 
-def plot_5_probability_gauge(ideal_years, total_years):
-    """Figure 5: Probability gauge visualization"""
-    probability = (ideal_years / total_years) * 100
+    # Evaluate every year at once
+    ideal_mask = criteria_mask(df, criteria)
+    ideal_years = df['year'][ideal_mask].tolist()
+    failed_years = df['year'][~ideal_mask].tolist()
 
-    fig, ax = plt.subplots(figsize=(10, 6), subplot_kw={'projection': 'polar'})
+    if t['bars'] is not None:
+        t['bars'].remove()
+    colors = ['#2ecc71' if ideal else '#e74c3c' for ideal in ideal_mask]
+    t['bars'] = ax.bar(df['year'], [1]*len(df), color=colors, alpha=0.8, edgecolor='black')
+    ax.relim()
+    ax.autoscale_view()
+
+    # With pooling the headline probability comes from the pooled days;
+    # this figure shows the event day alone
+    pooled = ctx['pooling']['days'] > 0 and ctx['event_date']['hour'] is None
+    ax.set_title(f'Year-by-Year Evaluation (Beach Event Criteria)\n' +
+                 f'✓ Ideal: {len(ideal_years)} years | ✗ Failed: {len(failed_years)} years | ' +
+                 f'Probability: {len(ideal_years)/len(df)*100:.0f}%' + (' (event day only)' if pooled else ''),
+                 fontsize=14, fontweight='bold')
+
+def plot_4_criteria_evaluation(df, ctx=None):
+    """Figure 4: Year-by-year criteria evaluation"""
+    ctx = ctx or default_context()
+    render_template('04_criteria_evaluation', (df,), ctx)
 
-    # Create gauge
-    theta = np.linspace(0, np.pi, 100)
+    ideal_mask = criteria_mask(df, ctx['criteria'])
+    return int(ideal_mask.sum()), len(df)
+
+def _layout_5(ctx):
+    """Figure 5 layout: gauge background, scale, needle and caption artists"""
+    fig, ax = plt.subplots(figsize=(10, 6), subplot_kw={'projection': 'polar'})
 
     # Background segments
     colors_bg = ['#e74c3c', '#e67e22', '#f39c12', '#3498db', '#2ecc71']
@@ -414,9 +901,8 @@ def plot_5_probability_gauge(ideal_years, total_years):
         ax.fill_between(theta_segment, 0, 1, color=colors_bg[i], alpha=0.3)
 
     # Needle
-    needle_angle = probability * np.pi / 100
-    ax.plot([needle_angle, needle_angle], [0, 0.9], color='black', linewidth=4)
-    ax.plot(needle_angle, 0.9, 'o', color='black', markersize=15)
+    needle, = ax.plot([0, 0], [0, 0.9], color='black', linewidth=4)
+    needle_tip, = ax.plot(0, 0.9, 'o', color='black', markersize=15)
 
     # Remove grid
     ax.set_ylim(0, 1)
@@ -427,6 +913,30 @@ def plot_5_probability_gauge(ideal_years, total_years):
     ax.set_yticks([])
     ax.spines['polar'].set_visible(False)
 
+    caption = ax.text(0.5, 0.75, '', ha='center', va='center', fontsize=11, transform=ax.transAxes)
+
+    return {'fig': fig, 'ax': ax, 'needle': needle, 'needle_tip': needle_tip,
+            'caption': caption, 'band': None}
+
+def _draw_5(t, estimate, ctx):
+    """Figure 5 data: needle, confidence band, classification and caption"""
+    confidence = ctx['confidence']
+    ax = t['ax']
+
+    probability = estimate['probability']
+    intervals = estimate_intervals(estimate, confidence)
+    ci_low, ci_high = intervals['bootstrap']
+
+    # Bootstrap confidence band along the rim
+    if t['band'] is not None:
+        t['band'].remove()
+    theta_ci = np.linspace(ci_low * np.pi/100, ci_high * np.pi/100, 50)
+    t['band'] = ax.fill_between(theta_ci, 0.93, 1, color='black', alpha=0.6)
+
+    needle_angle = probability * np.pi / 100
+    t['needle'].set_data([needle_angle, needle_angle], [0, 0.9])
+    t['needle_tip'].set_data([needle_angle], [0.9])
+
     # Title
     classification = (
         "EXCELLENT" if probability >= 80 else
@@ -436,24 +946,144 @@ def plot_5_probability_gauge(ideal_years, total_years):
         "VERY LOW"
     )
 
-    plt.title(f'Climate Probability Gauge\n{probability:.1f}% - {classification}',
-              fontsize=16, fontweight='bold', pad=20)
+    ax.set_title(f'Climate Probability Gauge\n{probability:.1f}% - {classification}',
+                 fontsize=16, fontweight='bold', pad=20)
 
-    plt.tight_layout()
-    plt.savefig(f'{OUTPUT_DIR}/05_probability_gauge.png', dpi=300, bbox_inches='tight')
-    print("✓ Generated: 05_probability_gauge.png")
-    plt.close()
+    level = f"{confidence['level'] * 100:.0f}%"
+    wilson_low, wilson_high = intervals['wilson']
+    jeffreys_low, jeffreys_high = intervals['jeffreys']
+    t['caption'].set_text(
+        f'{level} CI (bootstrap, dark band): {ci_low:.0f}-{ci_high:.0f}%\n'
+        f'Wilson: {wilson_low:.0f}-{wilson_high:.0f}% | Jeffreys: {jeffreys_low:.0f}-{jeffreys_high:.0f}% '
+        f'| n = {estimate["total"]} {estimate["unit"]}')
 
-def plot_6_date_range_heatmap():
-    """Figure 6: Probability heatmap for date range"""
-    # Generate probabilities for Dec 15 - Dec 31
-    dates = pd.date_range('2025-12-15', '2025-12-31', freq='D')
-    probabilities = [65, 68, 72, 75, 78, 85, 82, 70, 68, 63, 75, 71, 66, 69, 73, 77, 80]
+def plot_5_probability_gauge(estimate, ctx=None):
+    """Figure 5: Probability gauge visualization (estimate from event_estimate)"""
+    render_template('05_probability_gauge', (estimate,), ctx or default_context())
 
-    # Create figure
-    fig, ax = plt.subplots(figsize=(14, 8))
+def pooled_probabilities(series, criteria, days, weighting='triangular'):
+    """
+    Criteria probability for each of the 366 calendar days, pooling the
+    +/- days around every date of every year
+
+    All dates are evaluated at once over the sliding-window views from
+    DailySeries.pooled_days.
+
+    Returns (probabilities, samples): float arrays of length 366 with the
+    weighted probability (%) and the number of pooled samples with data.
+    """
+    with METRICS.stage('evaluate:pooled'):
+        pooled = series.pooled_days(days)
+        probabilities = weighted_pass_probability(pooled, criteria, window_weights(days, weighting), axis=(0, 2))
+        samples = valid_mask(pooled, criteria).sum(axis=(0, 2))
+    return probabilities, samples
+
+def event_estimate(ideal_years, total_years, series, event_date, criteria, pooling):
+    """
+    Headline pass probability of the event and the sample behind it
+
+    Normally the share of complete years that pass. With pooling enabled
+    (days > 0) for a daily event it is the weighted pass rate over the
+    +/- days pooled around the date in every year, so the gauge, the
+    dashboard and the batch summary all report the less noisy estimate.
+    The sampling unit stays the year: the pooled days of one year are
+    correlated, so total is the number of years with data and passes the
+    pooled rate times that (fractional), and year_passes/year_weights
+    (weighted passes and weights per year) let the bootstrap resample
+    whole years (see estimate_intervals).
+
+    Returns a dict with probability (%), passes and total (years) and
+    unit (how the estimate was made), plus year_passes and year_weights
+    when pooled.
+    """
+    if pooling['days'] > 0 and event_date.get('hour') is None:
+        with METRICS.stage('evaluate:pooled'):
+            doy = day_of_year(event_date['month'], event_date['day'])
+            window = {col: values[:, doy] for col, values in series.pooled_days(pooling['days']).items()}
+            weights = window_weights(pooling['days'], pooling['weighting'])
+            year_passes = (criteria_mask(window, criteria) * weights).sum(axis=1)
+            year_weights = (valid_mask(window, criteria) * weights).sum(axis=1)
+        counted = year_weights > 0
+        year_passes, year_weights = year_passes[counted], year_weights[counted]
+        total = int(counted.sum())
+        probability = year_passes.sum() / year_weights.sum() * 100 if total else float('nan')
+        return {'probability': float(probability), 'passes': probability / 100 * total if total else 0.0,
+                'total': total, 'unit': f"years, pooled ±{pooling['days']} days ({pooling['weighting']})",
+                'year_passes': year_passes.tolist(), 'year_weights': year_weights.tolist()}
+    return {'probability': ideal_years / total_years * 100 if total_years else float('nan'),
+            'passes': ideal_years, 'total': total_years, 'unit': 'years'}
+
+def estimate_bootstrap(estimate, confidence):
+    """Bootstrap interval of an event_estimate: over whole years when pooled"""
+    if 'year_passes' in estimate:
+        return year_bootstrap_interval(estimate['year_passes'], estimate['year_weights'], **confidence)
+    return bootstrap_interval(estimate['passes'], estimate['total'], **confidence)
+
+def estimate_intervals(estimate, confidence):
+    """
+    probability_intervals for an event_estimate
+
+    The score and beta intervals use the years as the sample size; the
+    bootstrap comes from estimate_bootstrap.
+    """
+    intervals = probability_intervals(estimate['passes'], estimate['total'], **confidence)
+    intervals['bootstrap'] = estimate_bootstrap(estimate, confidence)
+    return intervals
+
+def calendar_probabilities(series, criteria, pooling=None):
+    """
+    Criteria probability for each of the 366 calendar days
+
+    Evaluated as one (years x 366) operation over the daily series; Feb 29
+    only counts leap years. With pooling ({'days', 'weighting'}, days > 0)
+    each date pools its neighbouring days (see pooled_probabilities).
+    """
+    if pooling and pooling['days'] > 0:
+        return pooled_probabilities(series, criteria, pooling['days'], pooling['weighting'])[0]
+    with METRICS.stage('evaluate:calendar'):
+        return pass_probability({col: series.values(col) for col in series.data}, criteria, axis=0)
+
+def date_window_probabilities(series, month, day, days_before, days_after, criteria, pooling=None):
+    """
+    Criteria probability for every day in a window around month/day
+
+    Evaluated as one (years x days) operation over the daily series, or
+    picked from the pooled calendar when pooling is enabled.
+
+    Returns (dates, probabilities): (month, day) tuples and a float array (%)
+    """
+    if days_before + days_after + 1 > DAYS_PER_YEAR:
+        raise ValueError(f"Date window cannot exceed {DAYS_PER_YEAR} days")
+
+    start = day_of_year(month, day) - days_before
+    slots = (start + np.arange(days_before + days_after + 1)) % DAYS_PER_YEAR
+    if pooling and pooling['days'] > 0:
+        probabilities = calendar_probabilities(series, criteria, pooling)[slots]
+    else:
+        with METRICS.stage('evaluate:window'):
+            window = series.window(month, day, days_before, days_after)
+            probabilities = pass_probability(window, criteria, axis=0)
+
+    calendar = calendar_dates()
+    dates = [calendar[slot] for slot in slots]
+    return dates, probabilities
+
+def plot_6_date_range_heatmap(series, ctx=None):
+    """Figure 6: Probability heatmap for date range"""
+    ctx = ctx or default_context()
+    event_date = ctx['event_date']
+    location = ctx['location']
+    criteria = ctx['criteria']
+    date_window = ctx['date_window']
+    pooling = ctx['pooling']
+
+    dates, probabilities = date_window_probabilities(
+        series, event_date['month'], event_date['day'],
+        date_window['days_before'], date_window['days_after'], criteria, pooling
+    )
+    probabilities = np.nan_to_num(probabilities)
+    date_labels = [datetime(2000, m, d).strftime('%b %d') for m, d in dates]
 
-    # Create bars
     colors = [
         '#2ecc71' if p >= 80 else
         '#3498db' if p >= 60 else
@@ -463,39 +1093,70 @@ def plot_6_date_range_heatmap():
         for p in probabilities
     ]
 
-    bars = ax.barh(range(len(dates)), probabilities, color=colors,
-                   edgecolor='black', linewidth=1.5)
-
     # Highlight selected date and best date
-    selected_idx = 10  # Dec 25
-    best_idx = 5       # Dec 20 (85%)
+    selected_idx = date_window['days_before']
+    best_idx = int(np.argmax(probabilities))
+
+    # Short windows get one labelled bar per day, long windows a compact strip
+    compact = len(dates) > 45
+
+    # Create figure
+    fig, ax = plt.subplots(figsize=(14, 8) if not compact else (16, 6))
+
+    if not compact:
+        bars = ax.barh(range(len(dates)), probabilities, color=colors,
+                       edgecolor='black', linewidth=1.5)
+    else:
+        bars = ax.bar(range(len(dates)), probabilities, width=1.0, color=colors,
+                      edgecolor='black', linewidth=0.3)
 
     bars[selected_idx].set_edgecolor('blue')
     bars[selected_idx].set_linewidth(3)
-    bars[best_idx].set_edgecolor('gold')
-    bars[best_idx].set_linewidth(3)
+    if best_idx != selected_idx:
+        bars[best_idx].set_edgecolor('gold')
+        bars[best_idx].set_linewidth(3)
 
     # Labels
-    date_labels = [d.strftime('Dec %d') for d in dates]
-    ax.set_yticks(range(len(dates)))
-    ax.set_yticklabels(date_labels, fontsize=10)
-    ax.set_xlabel('Probability (%)', fontsize=12, fontweight='bold')
-    ax.set_title('Probability Heatmap - Rio de Janeiro (December 15-31)\n' +
-                 'Blue Border = Selected Date | Gold Border = Best Alternative',
-                 fontsize=14, fontweight='bold')
-
-    # Add percentage labels
-    for i, (bar, prob) in enumerate(zip(bars, probabilities)):
-        width = bar.get_width()
-        label = f'{prob}%'
+    title = (f'Probability Heatmap - {location["name"]} ({date_labels[0]} - {date_labels[-1]})\n' +
+             'Blue Border = Selected Date | Gold Border = Best Alternative')
+    if pooling['days'] > 0:
+        title += f' | ±{pooling["days"]} days pooled ({pooling["weighting"]})'
+
+    if not compact:
+        ax.set_yticks(range(len(dates)))
+        ax.set_yticklabels(date_labels, fontsize=10)
+        ax.set_xlabel('Probability (%)', fontsize=12, fontweight='bold')
+
+        # Add percentage labels
+        for i, (bar, prob) in enumerate(zip(bars, probabilities)):
+            width = bar.get_width()
+            label = f'{prob:.0f}%'
+
+            if i == selected_idx:
+                label += ' (Selected)'
+            elif i == best_idx:
+                label += ' ★ BEST'
+
+            ax.text(width + 2, bar.get_y() + bar.get_height()/2, label,
+                    ha='left', va='center', fontweight='bold', fontsize=9)
+
+        ax.set_xlim(0, 110)
+        ax.grid(True, alpha=0.3, axis='x')
+    else:
+        # One tick per month start inside the window
+        ticks = [i for i, (m, d) in enumerate(dates) if d == 1] or [0]
+        ax.set_xticks(ticks)
+        ax.set_xticklabels([date_labels[i] for i in ticks], fontsize=10)
+        ax.set_ylabel('Probability (%)', fontsize=12, fontweight='bold')
+        ax.set_xlim(-0.5, len(dates) - 0.5)
+        ax.set_ylim(0, 110)
 
-        if i == selected_idx:
-            label += ' (Selected)'
-        elif i == best_idx:
-            label += ' ★ BEST'
+        ax.annotate(f'★ BEST {date_labels[best_idx]} ({probabilities[best_idx]:.0f}%)',
+                    xy=(best_idx, probabilities[best_idx]), xytext=(0, 12),
+                    textcoords='offset points', ha='center', fontweight='bold', fontsize=10)
+        ax.grid(True, alpha=0.3, axis='y')
 
-        ax.text(width + 2, bar.get_y() + bar.get_height()/2, label,
-                ha='left', va='center', fontweight='bold', fontsize=9)
+    ax.set_title(title, fontsize=14, fontweight='bold')
 
     # Legend
     from matplotlib.patches import Patch
@@ -506,88 +1167,75 @@ def plot_6_date_range_heatmap():
         Patch(facecolor='#e67e22', label='Low (20-39%)'),
         Patch(facecolor='#e74c3c', label='Very Low (<20%)')
     ]
-    ax.legend(handles=legend_elements, loc='lower right', fontsize=10)
-
-    ax.set_xlim(0, 110)
-    ax.grid(True, alpha=0.3, axis='x')
-
-    plt.tight_layout()
-    plt.savefig(f'{OUTPUT_DIR}/06_date_range_heatmap.png', dpi=300, bbox_inches='tight')
-    print("✓ Generated: 06_date_range_heatmap.png")
-    plt.close()
-
-def plot_7_trend_analysis(df):
-    """Figure 7: Recent vs Historical trend analysis"""
-    # Split into decades
-    first_decade = df[df['year'] < 2015]
-    second_decade = df[df['year'] >= 2015]
-
-    # Use global climate criteria
-    criteria = CLIMATE_CRITERIA
-
-    def calc_prob(data):
-        ideal = sum([
-            (row['temp_min'] >= criteria['temp_min'] and
-             row['precipitation'] <= criteria['precipitation_max'] and
-             row['wind'] <= criteria['wind_max'] and
-             row['humidity'] <= criteria['humidity_max'])
-            for _, row in data.iterrows()
-        ])
-        return (ideal / len(data)) * 100
-
-    prob_first = calc_prob(first_decade)
-    prob_second = calc_prob(second_decade)
+    ax.legend(handles=legend_elements, loc='lower right' if not compact else 'upper right', fontsize=10)
 
-    # Create figure
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+    save_figure(fig, '06_date_range_heatmap', ctx)
 
-    # Left: Probability comparison
-    periods = ['2005-2014\n(Historical)', '2015-2024\n(Recent)']
-    probabilities = [prob_first, prob_second]
-    colors_bars = ['#3498db', '#2ecc71']
+def plot_7_trend_analysis(df, trends, ctx=None):
+    """Figure 7: Rolling-window pass probability and linear trends of the event date"""
+    ctx = ctx or default_context()
+    alpha = ctx['trends']['alpha']
 
-    bars = ax1.bar(periods, probabilities, color=colors_bars, alpha=0.8,
-                   edgecolor='black', linewidth=2)
+    def p_text(p_value):
+        return 'n/a' if p_value is None else f'{p_value:.2f}'
 
-    for bar, prob in zip(bars, probabilities):
-        height = bar.get_height()
-        ax1.text(bar.get_x() + bar.get_width()/2, height + 2,
-                f'{prob:.1f}%', ha='center', va='bottom',
-                fontsize=14, fontweight='bold')
+    # Create figure
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
 
+    # Left: pass probability of each run of consecutive years
+    pass_fit = trends['pass']
+    window_ends = [last for _, last in trends['rolling_years']]
+    rolling = np.array([np.nan if p is None else p for p in trends['rolling']])
+
+    ax1.plot(window_ends, rolling, 'o-', linewidth=2, markersize=6, color='#3498db',
+             label=f"{trends['window']}-year window")
+    ax1.fill_between(window_ends, rolling, alpha=0.2, color='#3498db')
+    for x, prob in [(window_ends[0], rolling[0]), (window_ends[-1], rolling[-1])]:
+        if not np.isnan(prob):
+            ax1.text(x, prob + 3, f'{prob:.0f}%', ha='center', va='bottom',
+                     fontsize=14, fontweight='bold')
+
+    if pass_fit['slope'] is not None:
+        years = np.array(trends['years'])
+        fitted = np.clip(pass_fit['intercept'] + pass_fit['slope'] * years, 0, 100)
+        ax1.plot(years, fitted, '--', linewidth=2,
+                 color='red', alpha=0.5,
+                 label=f"Pass-rate trend ({pass_fit['slope'] * 10:+.1f} pts/decade, p={p_text(pass_fit['p_value'])})")
+
+    ax1.set_xlabel('Last Year of Window', fontsize=12, fontweight='bold')
     ax1.set_ylabel('Probability (%)', fontsize=12, fontweight='bold')
-    ax1.set_title('Probability Comparison by Decade', fontsize=14, fontweight='bold')
-    ax1.set_ylim(0, 100)
-    ax1.grid(True, alpha=0.3, axis='y')
+    ax1.set_title(f"Probability over {trends['window']}-Year Rolling Windows", fontsize=14, fontweight='bold')
+    ax1.set_ylim(0, 105)
+    ax1.xaxis.set_major_locator(plt.MaxNLocator(integer=True))
+    ax1.legend(fontsize=10)
+    ax1.grid(True, alpha=0.3)
 
     # Right: Trend visualization
-    difference = prob_second - prob_first
-    trend = "POSITIVE" if difference > 10 else "NEGATIVE" if difference < -10 else "STABLE"
-    trend_color = '#2ecc71' if difference > 10 else '#e74c3c' if difference < -10 else '#3498db'
+    trend = trend_direction(pass_fit, alpha).upper()
+    trend_color = {'POSITIVE': '#2ecc71', 'NEGATIVE': '#e74c3c', 'STABLE': '#3498db'}[trend]
 
     ax2.plot(df['year'], df['temp_max'], 'o-', linewidth=2, markersize=6,
              color=trend_color, label='Temperature Trend')
 
     # Add regression line
-    z = np.polyfit(df['year'], df['temp_max'], 1)
-    p = np.poly1d(z)
-    ax2.plot(df['year'], p(df['year']), '--', linewidth=2, color='red',
-             alpha=0.5, label=f'Trend Line (slope: +{z[0]:.2f}°C/year)')
+    temp_fit = trends['columns']['temp_max']
+    if temp_fit['slope'] is not None:
+        ax2.plot(df['year'], temp_fit['intercept'] + temp_fit['slope'] * df['year'], '--', linewidth=2,
+                 color='red', alpha=0.5,
+                 label=f"Trend Line (slope: {temp_fit['slope']:+.2f}°C/year, p={p_text(temp_fit['p_value'])})")
 
+    pass_slope = 'n/a' if pass_fit['slope'] is None else f"{pass_fit['slope'] * 10:+.1f} pts/decade"
     ax2.set_xlabel('Year', fontsize=12, fontweight='bold')
     ax2.set_ylabel('Max Temperature (°C)', fontsize=12, fontweight='bold')
-    ax2.set_title(f'Climate Trend: {trend}\nDifference: {difference:+.1f}%',
+    ax2.set_title(f'Climate Trend: {trend}\nPass rate: {pass_slope} (p={p_text(pass_fit["p_value"])})',
                   fontsize=14, fontweight='bold')
     ax2.legend(fontsize=10)
     ax2.grid(True, alpha=0.3)
 
-    plt.tight_layout()
-    plt.savefig(f'{OUTPUT_DIR}/07_trend_analysis.png', dpi=300, bbox_inches='tight')
-    print("✓ Generated: 07_trend_analysis.png")
-    plt.close()
+    save_figure(fig, '07_trend_analysis', ctx)
 
-def plot_8_processing_pipeline():
-    """Figure 8: Processing pipeline flowchart (text-based)"""
+def _layout_8(ctx):
+    """Figure 8 layout: the whole flowchart (it does not depend on the data)"""
     fig, ax = plt.subplots(figsize=(12, 10))
     ax.axis('off')
 
@@ -620,21 +1268,33 @@ def plot_8_processing_pipeline():
     ax.set_ylim(0, 1)
     ax.set_title('Data Processing Pipeline', fontsize=16, fontweight='bold', pad=20)
 
-    plt.tight_layout()
-    plt.savefig(f'{OUTPUT_DIR}/08_processing_pipeline.png', dpi=300, bbox_inches='tight')
-    print("✓ Generated: 08_processing_pipeline.png")
-    plt.close()
+    return {'fig': fig}
 
-def plot_9_probability_distribution(df):
-    """Figure 9: Probability distribution histogram"""
-    # Simulate probabilities for different dates
-    np.random.seed(42)
-    probabilities = np.random.beta(7, 3, 100) * 100  # Beta distribution for realistic spread
+def _draw_8(t, ctx):
+    """Figure 8 has no data artists"""
+
+def plot_8_processing_pipeline(ctx=None):
+    """Figure 8: Processing pipeline flowchart (text-based)"""
+    render_template('08_processing_pipeline', (), ctx or default_context())
+
+def plot_9_probability_distribution(series, ctx=None):
+    """Figure 9: Distribution of daily pass probabilities over the calendar"""
+    ctx = ctx or default_context()
+    event_date = ctx['event_date']
+    location = ctx['location']
+    criteria = ctx['criteria']
+    pooling = ctx['pooling']
+
+    # One probability per calendar day, all days evaluated at once
+    calendar_probs = calendar_probabilities(series, criteria, pooling)
+    probabilities = calendar_probs[~np.isnan(calendar_probs)]
+    selected = calendar_probs[day_of_year(event_date['month'], event_date['day'])]
 
     fig, ax = plt.subplots(figsize=(12, 6))
 
     # Histogram
-    n, bins, patches = ax.hist(probabilities, bins=20, edgecolor='black', linewidth=1.5)
+    bins = np.linspace(0, 100, 21)
+    n, bins, patches = ax.hist(probabilities, bins=bins, edgecolor='black', linewidth=1.5)
 
     # Color bars by probability range
     for i, patch in enumerate(patches):
@@ -650,50 +1310,100 @@ def plot_9_probability_distribution(df):
         else:
             patch.set_facecolor('#e74c3c')
 
-    # Add normal curve overlay
+    # Kernel density estimate over the actual daily probabilities
     mu = probabilities.mean()
-    sigma = probabilities.std()
-
-    # Gaussian fit
-    x = np.linspace(0, 100, 1000)
-    from scipy import stats
-    gaussian = stats.norm.pdf(x, mu, sigma) * len(probabilities) * (100 / 20)  # Scale to histogram
-    ax.plot(x, gaussian, 'r--', linewidth=2, label=f'Normal Distribution\n(μ={mu:.1f}%, σ={sigma:.1f}%)')
+    if len(probabilities) > 1 and np.ptp(probabilities) > 0:
+        from scipy import stats
+        x = np.linspace(0, 100, 1000)
+        density = stats.gaussian_kde(probabilities)(x) * len(probabilities) * (bins[1] - bins[0])  # Scale to histogram
+        ax.plot(x, density, 'r--', linewidth=2, label=f'Kernel Density Estimate\n(μ={mu:.1f}%, σ={probabilities.std():.1f}%)')
 
-    # Vertical line for mean
+    # Vertical lines for the mean and the selected date
     ax.axvline(mu, color='red', linestyle='--', linewidth=2, alpha=0.7)
     ax.text(mu + 2, ax.get_ylim()[1] * 0.9, f'Mean: {mu:.1f}%',
             fontsize=12, fontweight='bold', color='red')
 
+    if not np.isnan(selected):
+        rank = (probabilities <= selected).mean() * 100
+        date_label = datetime(2000, event_date['month'], event_date['day']).strftime('%b %d')
+        ax.axvline(selected, color='blue', linewidth=3,
+                   label=f'{date_label}: {selected:.0f}% (at or above {rank:.0f}% of days)')
+
     ax.set_xlabel('Probability (%)', fontsize=12, fontweight='bold')
-    ax.set_ylabel('Frequency', fontsize=12, fontweight='bold')
-    ax.set_title('Probability Distribution Across All Analyzed Dates\n' +
-                 '(Simulated data for 100 date samples)',
+    ax.set_ylabel('Number of Calendar Days', fontsize=12, fontweight='bold')
+    ax.set_title(f'Probability Distribution Across All Calendar Days - {location["name"]}\n' +
+                 f'({len(probabilities)} days x {len(series.years)} years of daily data'
+                 + (f', ±{pooling["days"]} days pooled' if pooling['days'] > 0 else '') + ')',
                  fontsize=14, fontweight='bold')
-    ax.legend(fontsize=10, loc='upper left')
+    ax.set_xlim(0, 100)
+    ax.legend(fontsize=10, loc='upper right')
     ax.grid(True, alpha=0.3, axis='y')
 
-    plt.tight_layout()
-    plt.savefig(f'{OUTPUT_DIR}/09_probability_distribution.png', dpi=300, bbox_inches='tight')
-    print("✓ Generated: 09_probability_distribution.png")
-    plt.close()
+    save_figure(fig, '09_probability_distribution', ctx)
 
-def plot_10_summary_infographic(df, ideal_years, total_years):
-    """Figure 10: Summary infographic with key metrics"""
-    probability = (ideal_years / total_years) * 100
+def _layout_10(ctx):
+    """Figure 10 layout: dashboard grid, static panels and text artists"""
+    criteria = ctx['criteria']
 
     fig = plt.figure(figsize=(16, 10))
     gs = fig.add_gridspec(3, 3, hspace=0.3, wspace=0.3)
 
+    # 1. Big probability number
+    ax1 = fig.add_subplot(gs[0, :])
+    ax1.axis('off')
+    big_number = ax1.text(0.5, 0.5, '', ha='center', va='center', fontsize=80, fontweight='bold')
+    classification = ax1.text(0.5, 0.2, '', ha='center', va='center', fontsize=24, fontweight='bold')
+    interval = ax1.text(0.5, -0.05, '', ha='center', va='center', fontsize=13, color='#555555')
+
+    # 2. Temperature gauge
+    ax2 = fig.add_subplot(gs[1, 0])
+    temp_bar, = ax2.barh(['Avg Max Temp'], [0], color='#e74c3c', edgecolor='black', linewidth=2)
+    ax2.set_xlim(0, 50)
+    ax2.set_xlabel('°C', fontweight='bold')
+    ax2.set_title('Average Temperature', fontweight='bold')
+    temp_label = ax2.text(0, 0, '', va='center', fontweight='bold', fontsize=12)
+
+    # 3. Rain days
+    ax3 = fig.add_subplot(gs[1, 1])
+    ax3.set_title('Rain Distribution', fontweight='bold')
+
+    # 4. Wind analysis
+    ax4 = fig.add_subplot(gs[1, 2])
+    wind_bars = ax4.bar(['Safe', 'High'], [0, 0],
+                        color=['#2ecc71', '#e74c3c'], edgecolor='black', linewidth=2)
+    ax4.set_ylabel('Number of Years', fontweight='bold')
+    ax4.set_title(f'Wind Speed Safety\n(≤{criteria["wind_max"]}m/s = Safe)', fontweight='bold')
+    ax4.grid(True, alpha=0.3, axis='y')
+
+    # 5. Timeline
+    ax5 = fig.add_subplot(gs[2, :])
+    ax5.set_ylim(0.5, 1.5)
+    ax5.set_yticks([])
+    ax5.set_xlabel('Year', fontsize=12, fontweight='bold')
+    ax5.grid(True, alpha=0.3, axis='x')
+
+    return {'fig': fig, 'axes': (ax1, ax2, ax3, ax4, ax5), 'big_number': big_number,
+            'classification': classification, 'interval': interval, 'temp_bar': temp_bar,
+            'temp_label': temp_label, 'wind_bars': wind_bars, 'pie': (), 'timeline': None}
+
+def _draw_10(t, df, ideal_years, total_years, estimate, ctx):
+    """Figure 10 data: probability, panels, timeline and title"""
+    event_date = ctx['event_date']
+    location = ctx['location']
+    criteria = ctx['criteria']
+    confidence = ctx['confidence']
+    fig = t['fig']
+    _, ax2, ax3, ax4, ax5 = t['axes']
+
+    probability = estimate['probability']
+
     # Title
-    time_str = f" at {EVENT_DATE['hour']:02d}:00" if EVENT_DATE['hour'] is not None else ""
-    date_str = f"{EVENT_DATE['month']:02d}/{EVENT_DATE['day']:02d}"
-    fig.suptitle(f'NASA Climate Analysis - Summary Dashboard\n{date_str}{time_str} | {LOCATION["name"]}',
+    time_str = f" at {event_date['hour']:02d}:00" if event_date['hour'] is not None else ""
+    date_str = f"{event_date['month']:02d}/{event_date['day']:02d}"
+    fig.suptitle(f'NASA Climate Analysis - Summary Dashboard\n{date_str}{time_str} | {location["name"]}',
                  fontsize=18, fontweight='bold')
 
     # 1. Big probability number
-    ax1 = fig.add_subplot(gs[0, :])
-    ax1.axis('off')
     classification = (
         "EXCELLENT ⭐" if probability >= 80 else
         "GOOD 👍" if probability >= 60 else
@@ -709,64 +1419,640 @@ def plot_10_summary_infographic(df, ideal_years, total_years):
         '#e74c3c'
     )
 
-    ax1.text(0.5, 0.5, f'{probability:.0f}%', ha='center', va='center',
-             fontsize=80, fontweight='bold', color=color_text)
-    ax1.text(0.5, 0.2, classification, ha='center', va='center',
-             fontsize=24, fontweight='bold', color=color_text)
+    intervals = estimate_intervals(estimate, confidence)
+    ci_low, ci_high = intervals['bootstrap']
+    wilson_low, wilson_high = intervals['wilson']
+
+    t['big_number'].set_text(f'{probability:.0f}%')
+    t['big_number'].set_color(color_text)
+    t['classification'].set_text(classification)
+    t['classification'].set_color(color_text)
+    t['interval'].set_text(f"{confidence['level'] * 100:.0f}% CI: {ci_low:.0f}-{ci_high:.0f}% (bootstrap) | "
+                           f"{wilson_low:.0f}-{wilson_high:.0f}% (Wilson)" +
+                           (f" | n = {estimate['total']} {estimate['unit']}" if estimate['unit'] != 'years' else ''))
 
     # 2. Temperature gauge
-    ax2 = fig.add_subplot(gs[1, 0])
     avg_temp = df['temp_max'].mean()
-    ax2.barh(['Avg Max Temp'], [avg_temp], color='#e74c3c', edgecolor='black', linewidth=2)
-    ax2.set_xlim(0, 50)
-    ax2.set_xlabel('°C', fontweight='bold')
-    ax2.set_title('Average Temperature', fontweight='bold')
-    ax2.text(avg_temp + 1, 0, f'{avg_temp:.1f}°C', va='center', fontweight='bold', fontsize=12)
+    t['temp_bar'].set_width(avg_temp)
+    t['temp_label'].set_x(avg_temp + 1)
+    t['temp_label'].set_text(f'{avg_temp:.1f}°C')
 
     # 3. Rain days
-    ax3 = fig.add_subplot(gs[1, 1])
+    for artist in t['pie']:
+        artist.remove()
     rain_days = sum(df['precipitation'] > 1)
     dry_days = len(df) - rain_days
-    ax3.pie([dry_days, rain_days], labels=['Dry', 'Rainy'], autopct='%1.0f%%',
-            colors=['#2ecc71', '#3498db'], startangle=90,
-            textprops={'fontsize': 12, 'fontweight': 'bold'})
-    ax3.set_title('Rain Distribution', fontweight='bold')
+    wedges, labels, percents = ax3.pie([dry_days, rain_days], labels=['Dry', 'Rainy'], autopct='%1.0f%%',
+                                       colors=['#2ecc71', '#3498db'], startangle=90,
+                                       textprops={'fontsize': 12, 'fontweight': 'bold'})
+    t['pie'] = wedges + labels + percents
 
     # 4. Wind analysis
-    ax4 = fig.add_subplot(gs[1, 2])
-    avg_wind = df['wind'].mean()
-    safe_wind = sum(df['wind'] <= CLIMATE_CRITERIA['wind_max'])
-    ax4.bar(['Safe', 'High'], [safe_wind, len(df) - safe_wind],
-            color=['#2ecc71', '#e74c3c'], edgecolor='black', linewidth=2)
-    ax4.set_ylabel('Number of Years', fontweight='bold')
-    ax4.set_title(f'Wind Speed Safety\n(≤{CLIMATE_CRITERIA["wind_max"]}m/s = Safe)', fontweight='bold')
-    ax4.grid(True, alpha=0.3, axis='y')
+    safe_wind = sum(df['wind'] <= criteria['wind_max'])
+    for bar, height in zip(t['wind_bars'], [safe_wind, len(df) - safe_wind]):
+        bar.set_height(height)
+    ax4.relim()
+    ax4.autoscale_view()
 
     # 5. Timeline
-    ax5 = fig.add_subplot(gs[2, :])
-    ideal_mask = [(
-        row['temp_min'] >= CLIMATE_CRITERIA['temp_min'] and
-        row['precipitation'] <= CLIMATE_CRITERIA['precipitation_max'] and
-        row['wind'] <= CLIMATE_CRITERIA['wind_max']
-    ) for _, row in df.iterrows()]
+    ideal_mask = criteria_mask(df, criteria)
 
+    if t['timeline'] is not None:
+        t['timeline'].remove()
+    ax5.relim()
     colors_timeline = ['#2ecc71' if ideal else '#e74c3c' for ideal in ideal_mask]
-    ax5.scatter(df['year'], [1]*len(df), s=300, c=colors_timeline,
-                edgecolors='black', linewidth=2, zorder=3)
+    t['timeline'] = ax5.scatter(df['year'], [1]*len(df), s=300, c=colors_timeline,
+                                edgecolors='black', linewidth=2, zorder=3)
+    ax5.autoscale_view()
 
-    ax5.set_ylim(0.5, 1.5)
-    ax5.set_yticks([])
-    ax5.set_xlabel('Year', fontsize=12, fontweight='bold')
     ax5.set_title(f'Historical Timeline: ✓ Ideal Years = {ideal_years} | ✗ Failed Years = {total_years - ideal_years}',
                   fontsize=12, fontweight='bold')
-    ax5.grid(True, alpha=0.3, axis='x')
 
-    plt.tight_layout()
-    plt.savefig(f'{OUTPUT_DIR}/10_summary_infographic.png', dpi=300, bbox_inches='tight')
-    print("✓ Generated: 10_summary_infographic.png")
-    plt.close()
+def plot_10_summary_infographic(df, ideal_years, total_years, estimate, ctx=None):
+    """Figure 10: Summary infographic with key metrics"""
+    render_template('10_summary_infographic', (df, ideal_years, total_years, estimate), ctx or default_context())
+
+def _cell_edges(centers, step):
+    """
+    pcolormesh edges for sorted cell centers: midpoints between neighbours,
+    half a gap beyond the outer centers (half of step for a single center)
+    """
+    centers = np.asarray(centers, dtype=float)
+    if len(centers) < 2:
+        return np.array([centers[0] - step / 2, centers[0] + step / 2])
+    midpoints = (centers[:-1] + centers[1:]) / 2
+    return np.concatenate([[centers[0] - (midpoints[0] - centers[0])], midpoints,
+                           [centers[-1] + (centers[-1] - midpoints[-1])]])
+
+def plot_11_probability_map(grid, ctx=None):
+    """Figure 11: Probability map over the grid bounding box"""
+    ctx = ctx or default_context()
+    event_date = ctx['event_date']
+    location = ctx['location']
+    bbox = ctx['grid']['bbox']
+
+    table = grid.pivot(index='latitude', columns='longitude', values='probability')
+    lats = table.index.to_numpy()
+    lons = table.columns.to_numpy()
+    lat_step, lon_step = POWER_GRID
+
+    fig, ax = plt.subplots(figsize=(12, 9))
+
+    # One rectangle per sampled cell, reaching halfway to its neighbours
+    # (the sample spacing follows --resolution, not the POWER grid)
+    mesh = ax.pcolormesh(_cell_edges(lons, lon_step), _cell_edges(lats, lat_step),
+                         table.to_numpy(), cmap='RdYlGn', vmin=0, vmax=100,
+                         edgecolors='white', linewidth=0.5)
+    cbar = fig.colorbar(mesh, ax=ax, shrink=0.8)
+    cbar.set_label('Probability (%)', fontsize=12, fontweight='bold')
+
+    if table.size <= 150:
+        for i, lat in enumerate(lats):
+            for j, lon in enumerate(lons):
+                value = table.iat[i, j]
+                if not np.isnan(value):
+                    ax.text(lon, lat, f'{value:.0f}%', ha='center', va='center',
+                            fontsize=9, fontweight='bold')
+
+    # Requested area and the configured location
+    lat_min, lon_min, lat_max, lon_max = bbox
+    ax.add_patch(plt.Rectangle((lon_min, lat_min), lon_max - lon_min, lat_max - lat_min,
+                               fill=False, edgecolor='black', linestyle='--', linewidth=1.5,
+                               label='Requested area'))
+    ax.plot(location['longitude'], location['latitude'], marker='*', markersize=20,
+            color='blue', markeredgecolor='white', linestyle='none', label=location['name'])
+
+    best = grid.loc[grid['probability'].idxmax()] if grid['probability'].notna().any() else None
+    title = f'Probability Map - {datetime(2000, event_date["month"], event_date["day"]).strftime("%B %d")}'
+    if best is not None:
+        title += (f'\nBest Cell: {best["latitude"]:.2f}°, {best["longitude"]:.2f}° '
+                  f'({best["probability"]:.0f}%)')
+
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.set_xlabel('Longitude (°)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Latitude (°)', fontsize=12, fontweight='bold')
+    ax.set_aspect('equal')
+    ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.08), ncol=2, fontsize=10)
+
+    save_figure(fig, '11_probability_map', ctx)
+
+def hourly_probabilities(hourly, criteria):
+    """
+    Criteria probability for every hour of every day of the month
+
+    Evaluated as one (years x 31 x 24) operation; returns a (31 x 24)
+    float array (%), NaN for days the month does not have.
+    """
+    with METRICS.stage('evaluate:hourly'):
+        return pass_probability(hourly.data, criteria, axis=0)
+
+def plot_12_hourly_profile(hourly, ctx=None):
+    """Figure 12: Hour-of-day x day-of-month probability heatmap"""
+    ctx = ctx or default_context()
+    event_date = ctx['event_date']
+    location = ctx['location']
+    criteria = ctx['criteria']
+
+    probabilities = hourly_probabilities(hourly, criteria)
+    days = int((~np.isnan(probabilities)).any(axis=1).sum())
+    probabilities = probabilities[:days]
+
+    fig, (ax, ax_hour) = plt.subplots(1, 2, figsize=(16, 8), sharey=True,
+                                      gridspec_kw={'width_ratios': [5, 1]})
+
+    # Rows are hours, columns are days of the month
+    image = ax.imshow(probabilities.T, aspect='auto', origin='lower', cmap='RdYlGn',
+                      vmin=0, vmax=100, extent=(0.5, days + 0.5, -0.5, 23.5))
+    cbar = fig.colorbar(image, ax=ax_hour, shrink=0.8)
+    cbar.set_label('Probability (%)', fontsize=12, fontweight='bold')
+
+    ax.set_xticks(range(1, days + 1, 2))
+    ax.set_yticks(range(0, 24, 2))
+    ax.set_yticklabels([f'{h:02d}:00' for h in range(0, 24, 2)])
+    ax.set_xlabel('Day of Month', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Hour of Day', fontsize=12, fontweight='bold')
+    ax.grid(False)
+
+    # Selected date/time and the best hour of the month
+    if event_date['hour'] is not None:
+        ax.add_patch(plt.Rectangle((event_date['day'] - 0.5, event_date['hour'] - 0.5), 1, 1,
+                                   fill=False, edgecolor='blue', linewidth=3, label='Selected'))
+    if not np.isnan(probabilities).all():
+        best_day, best_hour = np.unravel_index(np.nanargmax(probabilities), probabilities.shape)
+        ax.plot(best_day + 1, best_hour, marker='*', markersize=18, color='gold',
+                markeredgecolor='black', linestyle='none',
+                label=f'Best: day {best_day + 1} at {best_hour:02d}:00 ({probabilities[best_day, best_hour]:.0f}%)')
+    ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.08), ncol=2, fontsize=10)
+
+    # Average over the month for each hour
+    by_hour = np.nanmean(probabilities, axis=0)
+    ax_hour.barh(range(24), by_hour, color='#3498db', edgecolor='black', linewidth=1)
+    ax_hour.set_xlim(0, 100)
+    ax_hour.set_xlabel('Month Average (%)', fontsize=12, fontweight='bold')
+    ax_hour.grid(True, alpha=0.3, axis='x')
+
+    month_name = datetime(2000, hourly.month, 1).strftime('%B')
+    fig.suptitle(f'Hourly Probability Profile - {location["name"]} ({month_name}, '
+                 f'{hourly.years[0]}-{hourly.years[-1]})',
+                 fontsize=14, fontweight='bold')
+
+    save_figure(fig, '12_hourly_profile', ctx)
+
+# Figure name -> (plot function, inputs it takes, context keys it reads).
+# Figures are independent of each other, so they can be rendered in any
+# order or in parallel, and skipped when none of their inputs changed.
+FIGURES = [
+    ('01_temperature_timeseries', plot_1_temperature_timeseries, ('df',),
+     ('event_date', 'location', 'criteria')),
+    ('02_precipitation_pattern', plot_2_precipitation_pattern, ('df',),
+     ('event_date', 'criteria')),
+    ('03_multi_parameter_dashboard', plot_3_multi_parameter_dashboard, ('df',),
+     ('event_date', 'location', 'criteria')),
+    ('04_criteria_evaluation', plot_4_criteria_evaluation, ('df',),
+     ('criteria', 'pooling', 'event_date')),
+    ('05_probability_gauge', plot_5_probability_gauge, ('estimate',),
+     ('confidence',)),
+    ('06_date_range_heatmap', plot_6_date_range_heatmap, ('series',),
+     ('event_date', 'location', 'criteria', 'date_window', 'pooling')),
+    ('07_trend_analysis', plot_7_trend_analysis, ('df', 'trends'),
+     ('event_date', 'trends')),
+    ('08_processing_pipeline', plot_8_processing_pipeline, (),
+     ()),
+    ('09_probability_distribution', plot_9_probability_distribution, ('series',),
+     ('event_date', 'location', 'criteria', 'pooling')),
+    ('10_summary_infographic', plot_10_summary_infographic, ('df', 'ideal_years', 'total_years', 'estimate'),
+     ('event_date', 'location', 'criteria', 'confidence')),
+    ('11_probability_map', plot_11_probability_map, ('grid',),
+     ('event_date', 'location', 'grid')),
+    ('12_hourly_profile', plot_12_hourly_profile, ('hourly',),
+     ('event_date', 'location', 'criteria')),
+]
+
+# Figures drawn through render_template: name -> (layout, draw, layout key).
+# The layout key picks the context values the layout function reads; a
+# kept figure is rebuilt when they change.
+FIGURE_TEMPLATES = {
+    '01_temperature_timeseries': (_layout_1, _draw_1,
+                                  lambda ctx: (ctx['criteria'], ctx['event_date']['hour'])),
+    '02_precipitation_pattern': (_layout_2, _draw_2,
+                                 lambda ctx: (ctx['criteria'], ctx['event_date']['hour'] is None)),
+    '03_multi_parameter_dashboard': (_layout_3, _draw_3,
+                                     lambda ctx: (ctx['criteria'], ctx['event_date']['hour'])),
+    '04_criteria_evaluation': (_layout_4, _draw_4, lambda ctx: ()),
+    '05_probability_gauge': (_layout_5, _draw_5, lambda ctx: ()),
+    '08_processing_pipeline': (_layout_8, _draw_8, lambda ctx: ()),
+    '10_summary_infographic': (_layout_10, _draw_10, lambda ctx: ctx['criteria']),
+}
+
+MANIFEST_FILE = 'manifest.json'
+
+def event_trends(df, series, ctx):
+    """
+    Trends of the event date (see climate_trends.compute_trends)
+
+    Daily events take their row of the all-days trend arrays of the
+    series; hourly events are fitted on the per-year values in df.
+    """
+    event_date = ctx['event_date']
+    window = ctx['trends']['window']
+    with METRICS.stage('evaluate:trends'):
+        if event_date['hour'] is None:
+            trends = series_trends(series, ctx['criteria'], window)
+            return trends_at(trends, day_of_year(event_date['month'], event_date['day']))
+        return trends_at(dataframe_trends(df, ctx['criteria'], window))
+
+def figure_inputs(df, series, ctx, grid=None, hourly=None):
+    """Everything the plot functions take, computed once up front"""
+    with METRICS.stage('evaluate:criteria'):
+        ideal_mask = criteria_mask(df, ctx['criteria'])
+    ideal_years, total_years = int(ideal_mask.sum()), len(df)
+    return {
+        'df': df,
+        'series': series,
+        'grid': grid,
+        'hourly': hourly,
+        'trends': event_trends(df, series, ctx),
+        'ideal_years': ideal_years,
+        'total_years': total_years,
+        'estimate': event_estimate(ideal_years, total_years, series, ctx['event_date'], ctx['criteria'],
+                                   ctx['pooling'])
+    }
+
+def _hash_update(h, value):
+    """Feed a plot input into a hash in a stable, content-based way"""
+    if isinstance(value, pd.DataFrame):
+        h.update(repr(list(value.columns)).encode())
+        h.update(pd.util.hash_pandas_object(value, index=False).values.tobytes())
+    elif isinstance(value, HourlyMonth):
+        h.update(value.years.tobytes())
+        h.update(str(value.month).encode())
+        for col in sorted(value.data):
+            h.update(col.encode())
+            h.update(value.data[col].tobytes())
+    elif isinstance(value, DailySeries):
+        h.update(value.years.tobytes())
+        for col in sorted(value.data):
+            h.update(col.encode())
+            h.update(value.values(col).tobytes())
+    else:
+        h.update(json.dumps(value, sort_keys=True, default=str).encode())
+
+_figure_sources = {}
+
+def _is_project_code(obj):
+    try:
+        path = inspect.getsourcefile(obj)
+    except TypeError:
+        return False
+    return path is not None and os.path.dirname(os.path.abspath(path)) == os.path.dirname(os.path.abspath(__file__))
+
+def figure_sources(func):
+    """
+    Source of func and of every function or class of this project it
+    reaches through module globals (helpers, save_figure, the series
+    store, ...), sorted by file and name so the result does not depend
+    on how the module was imported
+    """
+    if func in _figure_sources:
+        return _figure_sources[func]
+    sources, pending = {}, [func]
+    while pending:
+        obj = inspect.unwrap(pending.pop())
+        key = (os.path.basename(inspect.getsourcefile(obj)), obj.__qualname__)
+        if key in sources:
+            continue
+        sources[key] = inspect.getsource(obj)
+        if inspect.isclass(obj):
+            members = [getattr(m, 'fget', None) or getattr(m, '__func__', m) for m in vars(obj).values()]
+            codes = [m.__code__ for m in members if inspect.isfunction(m)]
+        else:
+            codes = [obj.__code__]
+        module_globals = vars(sys.modules[obj.__module__])
+        while codes:
+            code = codes.pop()
+            codes.extend(const for const in code.co_consts if inspect.iscode(const))
+            for name in code.co_names:
+                dep = module_globals.get(name)
+                if (inspect.isfunction(dep) or inspect.isclass(dep)) and _is_project_code(dep):
+                    pending.append(dep)
+    _figure_sources[func] = [sources[key] for key in sorted(sources)]
+    return _figure_sources[func]
+
+def figure_hash(index, inputs, ctx):
+    """
+    Content hash of everything that determines one figure's output:
+    its data inputs, the context keys it reads, export formats, the
+    matplotlib style and the source of the plot function, its template
+    and every project function they call.
+    """
+    _, func, arg_names, ctx_keys = FIGURES[index]
+    h = hashlib.sha256()
+    for name in arg_names:
+        _hash_update(h, inputs[name])
+    _hash_update(h, {key: ctx[key] for key in ctx_keys})
+    _hash_update(h, export_formats(ctx['export']))
+    style = {k: v for k, v in plt.rcParams.items() if not k.startswith('backend')}
+    _hash_update(h, sorted(style.items()))
+    for part in (func, *FIGURE_TEMPLATES.get(FIGURES[index][0], ())[:2]):
+        for source in figure_sources(part):
+            h.update(source.encode())
+    return h.hexdigest()
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(f'{path}.tmp', path)
+
+def _render_worker_init():
+    # Worker processes never open windows
+    plt.switch_backend('Agg')
+    METRICS.worker_init()
+
+def _render_figure(index, args, ctx):
+    """Render FIGURES[index] and return the elapsed seconds"""
+    start = time.perf_counter()
+    with METRICS.stage(f'render:{FIGURES[index][0]}'):
+        FIGURES[index][1](*args, ctx=ctx)
+    return time.perf_counter() - start
+
+def _render_figure_in_worker(index, args, ctx):
+    """
+    _render_figure for worker processes: also returns the stage timings
+    recorded there, which the parent replays into its own METRICS
+    """
+    elapsed = _render_figure(index, args, ctx)
+    return elapsed, METRICS.drain()
+
+def plan_figures(inputs, ctx, force=False):
+    """
+    Figures of one location that need rendering
+
+    Figures whose inputs are missing are left out; so are figures whose
+    hash in ctx['output_dir']'s manifest is unchanged and whose files
+    exist, unless force is set.
+
+    Returns (jobs, hashes, manifest): jobs are (index, args, ctx) tuples
+    for _render_figure, hashes maps each figure name to its content hash
+    and manifest is the manifest currently on disk.
+    """
+    output_dir = ctx['output_dir']
+    formats = [fmt for fmt, _ in export_formats(ctx['export'])]
+    manifest = load_manifest(output_dir)
+
+    jobs = []
+    hashes = {}
+    for i, (name, _, arg_names, _) in enumerate(FIGURES):
+        if any(inputs[arg] is None for arg in arg_names):
+            continue
+        hashes[name] = figure_hash(i, inputs, ctx)
+        files = [f'{name}.{fmt}' for fmt in formats]
+        up_to_date = (
+            manifest.get(name, {}).get('hash') == hashes[name] and
+            all(os.path.exists(os.path.join(output_dir, f)) for f in files)
+        )
+        if up_to_date and not force:
+            METRICS.event('figure_skipped', f"• Up to date: {name}", figure=name, output_dir=output_dir)
+            continue
+        jobs.append((i, tuple(inputs[arg] for arg in arg_names), ctx))
+    return jobs, hashes, manifest
+
+def record_figure(manifest, name, digest, formats, elapsed):
+    """Manifest entry of a freshly rendered figure"""
+    manifest[name] = {
+        'hash': digest,
+        'files': [f'{name}.{fmt}' for fmt in formats],
+        'render_seconds': round(elapsed, 3)
+    }
+
+def generate_figures(df, series, ctx=None, workers=1, force=False, grid=None, hourly=None):
+    """
+    Render all figures into ctx['output_dir']
+
+    A manifest in the output directory records a content hash of each
+    figure's inputs; figures whose hash and files are unchanged are
+    skipped unless force is set.
+
+    Args:
+        df: Per-year DataFrame from fetch_nasa_data
+        series: DailySeries for the same location
+        ctx: Plot context (default_context() when None)
+        workers: Render processes; 1 renders serially in this process
+        force: Re-render every figure regardless of the manifest
+        grid: Cell probabilities from fetch_grid; the probability map is
+              skipped when None
+        hourly: HourlyMonth from fetch_hourly_month; the hourly profile is
+                skipped when None
+
+    Returns (estimate, timings): the headline estimate of event_estimate
+    (the one the gauge shows) and the render time in seconds of each
+    rendered figure.
+    """
+    ctx = ctx or default_context()
+    output_dir = ctx['output_dir']
+    os.makedirs(output_dir, exist_ok=True)
+
+    inputs = figure_inputs(df, series, ctx, grid, hourly)
+    formats = [fmt for fmt, _ in export_formats(ctx['export'])]
+    jobs, hashes, manifest = plan_figures(inputs, ctx, force)
 
-def main():
+    timings = {}
+    if workers <= 1 or len(jobs) <= 1:
+        results = (_render_figure(*job) for job in jobs)
+    else:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(jobs)),
+                                   initializer=_render_worker_init)
+        futures = [pool.submit(_render_figure_in_worker, *job) for job in jobs]
+
+        def collect():
+            for future in futures:
+                elapsed, drained = future.result()
+                METRICS.replay(drained)
+                yield elapsed
+        results = collect()
+
+    try:
+        for (index, _, _), elapsed in zip(jobs, results):
+            name = FIGURES[index][0]
+            timings[name] = elapsed
+            record_figure(manifest, name, hashes[name], formats, elapsed)
+            METRICS.event('figure_rendered', f"✓ Generated: {name}.{'/'.join(formats)} ({elapsed:.2f}s)",
+                          figure=name, formats=formats, seconds=round(elapsed, 6))
+    finally:
+        if workers > 1 and len(jobs) > 1:
+            pool.shutdown()
+        # Record whatever finished, even if a later figure failed
+        save_manifest(output_dir, manifest)
+
+    return inputs['estimate'], timings
+
+def _json_list(values):
+    """Float array -> list with None for missing values"""
+    return [None if np.isnan(v) else float(v) for v in np.asarray(values, dtype=float)]
+
+def evaluate_location(latitude, longitude, month, day, hour=None, criteria=None, date_window=None,
+                      pooling=None, confidence=None):
+    """
+    Data-only mode: fetch one location and evaluate the criteria
+
+    Nothing here imports matplotlib, seaborn or pandas, so short-lived
+    jobs that only need the numbers skip their startup cost. Only years
+    with every parameter present count towards the event-day
+    probability.
+
+    Returns a JSON-serializable dict with the per-year values, pass flags,
+    event-day probability with confidence intervals and the date-window
+    probabilities, plus per-hour probabilities when an hour is set. With
+    pooling on (daily events), 'pooled' holds the pooled estimate with
+    its own intervals; that is the headline probability the gauge and
+    the batch summary report.
+    """
+    criteria = criteria or CLIMATE_CRITERIA
+    date_window = date_window or DATE_WINDOW
+    pooling = pooling or POOLING_CONFIG
+    confidence = confidence or CONFIDENCE_CONFIG
+    start_year, end_year = default_year_range()
+
+    series = fetch_daily_series(latitude, longitude, start_year, end_year)
+    hourly = None
+    if hour is None:
+        doy = day_of_year(month, day)
+        years = series.years
+        values = {col: series.values(col)[:, doy] for col in DAILY_PARAMETERS.values()}
+    else:
+        hourly = fetch_hourly_month(latitude, longitude, month, start_year, end_year)
+        years = hourly.years
+        values = {col: hourly.data[col][:, day - 1, hour] for col in hourly.data}
+
+    with METRICS.stage('evaluate:criteria'):
+        complete = np.logical_and.reduce([np.isfinite(v) for v in values.values()])
+        passed = criteria_mask(values, criteria) & complete
+        passes, total = int(passed.sum()), int(complete.sum())
+        ci_low, ci_high = bootstrap_interval(passes, total, **confidence)
+        wilson_low, wilson_high = wilson_interval(passes, total, confidence['level'])
+
+    dates, window = date_window_probabilities(series, month, day, date_window['days_before'],
+                                              date_window['days_after'], criteria, pooling)
+    result = {
+        'location': {'latitude': latitude, 'longitude': longitude},
+        'event_date': {'month': month, 'day': day, 'hour': hour},
+        'criteria': criteria,
+        'years': years.tolist(),
+        'values': {col: _json_list(v) for col, v in values.items()},
+        'passed': [bool(p) if c else None for p, c in zip(passed, complete)],
+        'passes': passes,
+        'total': total,
+        'probability': passes / total * 100 if total else None,
+        'confidence': {
+            'level': confidence['level'],
+            'bootstrap': _json_list([ci_low, ci_high]),
+            'wilson': _json_list([wilson_low, wilson_high])
+        },
+        'date_window': {
+            'dates': [f'{m:02d}-{d:02d}' for m, d in dates],
+            'probabilities': _json_list(window)
+        }
+    }
+    if pooling['days'] > 0 and hour is None:
+        estimate = event_estimate(passes, total, series, result['event_date'], criteria, pooling)
+        ci_low, ci_high = estimate_bootstrap(estimate, confidence)
+        wilson_low, wilson_high = wilson_interval(estimate['passes'], estimate['total'], confidence['level'])
+        result['pooled'] = {**pooling, 'probability': _json_list([estimate['probability']])[0],
+                            'years': estimate['total'],
+                            'confidence': {
+                                'level': confidence['level'],
+                                'bootstrap': _json_list([ci_low, ci_high]),
+                                'wilson': _json_list([wilson_low, wilson_high])
+                            }}
+    if hourly is not None:
+        result['hourly'] = {'probabilities': _json_list(hourly_probabilities(hourly, criteria)[day - 1])}
+    return result
+
+def main_data(output='-'):
+    """
+    Data-only entry point: write evaluate_location() for the configured
+    event as JSON to a file, or stdout when output is '-'
+
+    Progress lines and the stage timings go to stderr so stdout stays
+    valid JSON.
+    """
+    with contextlib.redirect_stdout(sys.stderr):
+        result = evaluate_location(LOCATION['latitude'], LOCATION['longitude'], EVENT_DATE['month'],
+                                   EVENT_DATE['day'], EVENT_DATE.get('hour'))
+        print_metrics_summary()
+
+    text = json.dumps(result, indent=2)
+    if output == '-':
+        print(text)
+    else:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f"✓ Saved results to '{output}'", file=sys.stderr)
+    return result
+
+def main_profiles(profiles_path):
+    """
+    Batch mode: evaluate every event profile in a JSON file against one fetch
+
+    Writes the profiles x years pass matrix and per-profile probabilities
+    to OUTPUT_DIR and returns (pass_matrix, probabilities).
+    """
+    profiles = load_profiles(profiles_path)
+    METRICS.event('profiles_start', f"📋 Evaluating {len(profiles)} event profiles from {profiles_path}\n",
+                  profiles=len(profiles), path=profiles_path)
+
+    with METRICS.stage('fetch'):
+        df = fetch_nasa_data(
+            latitude=LOCATION['latitude'],
+            longitude=LOCATION['longitude'],
+            month=EVENT_DATE['month'],
+            day=EVENT_DATE['day'],
+            hour=EVENT_DATE.get('hour')
+        )
+
+    with METRICS.stage('evaluate:profiles'):
+        pass_matrix, probabilities = evaluate_profiles(df, profiles)
+    intervals = probability_intervals(pass_matrix.sum(axis=1).to_numpy(), len(df), **CONFIDENCE_CONFIG)
+    table = probabilities.to_frame().assign(
+        ci_low=intervals['bootstrap'][0], ci_high=intervals['bootstrap'][1],
+        wilson_low=intervals['wilson'][0], wilson_high=intervals['wilson'][1]
+    )
+
+    print()
+    for name, row in table.sort_values('probability', ascending=False).iterrows():
+        print(f"  {name:<16} {row['probability']:5.1f}%  [{row['ci_low']:.0f}-{row['ci_high']:.0f}%]  "
+              f"({pass_matrix.loc[name].sum()}/{len(df)} years)")
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    pass_matrix.astype(int).to_csv(f'{OUTPUT_DIR}/profiles_pass_matrix.csv', index_label='profile')
+    table.to_csv(f'{OUTPUT_DIR}/profiles_probabilities.csv', index_label='profile')
+    print(f"\n✓ Saved profile results to '{OUTPUT_DIR}/'")
+    print_metrics_summary()
+
+    return pass_matrix, probabilities
+
+def print_metrics_summary():
+    """Print (and emit) the stage timings and counters of this run"""
+    cache = get_response_cache()
+    extra = {}
+    if cache is not None:
+        stats = cache.stats()
+        extra = {'cache_hits': stats['hits'], 'cache_misses': stats['misses'],
+                 'cache_hit_rate': f"{stats['hit_rate']*100:.0f}%"}
+    summary = METRICS.summary(extra)
+    if METRICS_CONFIG['summary']:
+        print("\n⏱️  Stage timings:")
+        print(METRICS.format_summary(summary))
+    return summary
+
+def main(workers=1, force=False):
     """Main execution function"""
     print("=" * 60)
     print("NASA Space Apps Challenge 2025")
@@ -775,41 +2061,72 @@ def main():
     print()
 
     # Fetch real NASA data using configuration
-    print("📊 Fetching historical climate data from NASA POWER API...\n")
-    print(f"   Location: {LOCATION['name']}")
-    print(f"   Date: {EVENT_DATE['month']:02d}/{EVENT_DATE['day']:02d}")
-    if EVENT_DATE['hour'] is not None:
-        print(f"   Time: {EVENT_DATE['hour']:02d}:00 (hourly data)")
-    else:
-        print(f"   Time: Daily average")
-    print()
-
-    df = fetch_nasa_data(
-        latitude=LOCATION['latitude'],
-        longitude=LOCATION['longitude'],
-        month=EVENT_DATE['month'],
-        day=EVENT_DATE['day'],
-        hour=EVENT_DATE.get('hour')
-    )
-
-    if df is None or len(df) < 10:
-        raise RuntimeError("Insufficient data received from NASA API")
+    time_str = (f"{EVENT_DATE['hour']:02d}:00 (hourly data)" if EVENT_DATE['hour'] is not None
+                else "Daily average")
+    METRICS.event('run_start',
+                  f"📊 Fetching historical climate data from NASA POWER API...\n\n"
+                  f"   Location: {LOCATION['name']}\n"
+                  f"   Date: {EVENT_DATE['month']:02d}/{EVENT_DATE['day']:02d}\n"
+                  f"   Time: {time_str}\n",
+                  location=LOCATION, event_date=EVENT_DATE)
+
+    with METRICS.stage('fetch'):
+        df = fetch_nasa_data(
+            latitude=LOCATION['latitude'],
+            longitude=LOCATION['longitude'],
+            month=EVENT_DATE['month'],
+            day=EVENT_DATE['day'],
+            hour=EVENT_DATE.get('hour')
+        )
 
-    print()
+        if df is None or len(df) < 10:
+            raise RuntimeError("Insufficient data received from NASA API")
+
+        # Full daily series for date-range figures (already fetched in daily mode)
+        series = fetch_daily_series(LOCATION['latitude'], LOCATION['longitude'])
+
+    if POOLING_CONFIG['days'] > 0 and EVENT_DATE.get('hour') is None:
+        probabilities, samples = pooled_probabilities(series, CLIMATE_CRITERIA, POOLING_CONFIG['days'],
+                                                      POOLING_CONFIG['weighting'])
+        doy = day_of_year(EVENT_DATE['month'], EVENT_DATE['day'])
+        METRICS.event('pooled_estimate', f"   Pooled ±{POOLING_CONFIG['days']} days ({POOLING_CONFIG['weighting']}): "
+                      f"{probabilities[doy]:.1f}% over {samples[doy]} daily samples",
+                      **POOLING_CONFIG, probability=float(probabilities[doy]), samples=int(samples[doy]))
+
+    # Every hour of the event month; already fetched when an hour is set
+    hourly = None
+    if EVENT_DATE.get('hour') is not None or HOURLY_PROFILE:
+        with METRICS.stage('fetch:hourly'):
+            hourly = fetch_hourly_month(LOCATION['latitude'], LOCATION['longitude'], EVENT_DATE['month'])
+        probabilities = hourly_probabilities(hourly, CLIMATE_CRITERIA)[EVENT_DATE['day'] - 1]
+        if not np.isnan(probabilities).all():
+            best = int(np.nanargmax(probabilities))
+            METRICS.event('best_hour', f"   Best hour on {EVENT_DATE['month']:02d}/{EVENT_DATE['day']:02d}: "
+                          f"{best:02d}:00 ({probabilities[best]:.0f}%)",
+                          hour=best, probability=float(probabilities[best]))
+
+    grid = None
+    if GRID_CONFIG['enabled']:
+        with METRICS.stage('fetch:grid'):
+            grid = fetch_grid(GRID_CONFIG['bbox'], GRID_CONFIG['resolution'],
+                              EVENT_DATE['month'], EVENT_DATE['day'], CLIMATE_CRITERIA)
+
+    cache = get_response_cache()
+    if cache is not None:
+        stats = cache.stats()
+        METRICS.event('cache', f"   Cache: {stats['hits']} hits, {stats['misses']} misses "
+                      f"({stats['hit_rate']*100:.0f}% hit rate)", hits=stats['hits'], misses=stats['misses'])
 
     # Generate all plots
-    print("🎨 Creating visualizations...\n")
-
-    plot_1_temperature_timeseries(df)
-    plot_2_precipitation_pattern(df)
-    plot_3_multi_parameter_dashboard(df)
-    ideal_years, total_years = plot_4_criteria_evaluation(df)
-    plot_5_probability_gauge(ideal_years, total_years)
-    plot_6_date_range_heatmap()
-    plot_7_trend_analysis(df)
-    plot_8_processing_pipeline()
-    plot_9_probability_distribution(df)
-    plot_10_summary_infographic(df, ideal_years, total_years)
+    METRICS.event('render_start', "\n🎨 Creating visualizations...\n")
+
+    start = time.perf_counter()
+    _, timings = generate_figures(df, series, workers=workers, force=force,
+                                  grid=grid, hourly=hourly)
+    wall = time.perf_counter() - start
+    METRICS.event('render_done', f"\n   Rendered {len(timings)} figures in {wall:.1f}s "
+                  f"({workers} worker{'s' if workers > 1 else ''}, {sum(timings.values()):.1f}s total render time)",
+                  figures=len(timings), seconds=round(wall, 6), workers=workers)
 
     print()
     print("=" * 60)
@@ -817,10 +2134,13 @@ def main():
     print("=" * 60)
     print()
     print("Generated files:")
-    for i in range(1, 11):
-        print(f"  {i:02d}_*.png")
+    for name, _, arg_names, _ in FIGURES:
+        if ('grid' in arg_names and grid is None) or ('hourly' in arg_names and hourly is None):
+            continue
+        print(f"  {name}.{'/'.join(fmt for fmt, _ in export_formats(EXPORT_PROFILE))}")
     print()
     print("You can now use these images in your NASA Space Apps documentation!")
+    print_metrics_summary()
 
 if __name__ == "__main__":
     # Check dependencies
@@ -841,4 +2161,77 @@ if __name__ == "__main__":
         print(f"Run: pip install {' '.join(missing_deps)}")
         print()
 
-    main()
+    parser = argparse.ArgumentParser(description="Generate NASA climate visualizations")
+    parser.add_argument('--offline', action='store_true',
+                        help="Serve NASA POWER responses only from the local cache")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Disable the local NASA POWER response cache and series store")
+    parser.add_argument('--profiles', metavar='JSON',
+                        help="Evaluate every event profile in a JSON file (e.g. event_profiles.json) "
+                             "instead of generating figures")
+    parser.add_argument('--data-only', nargs='?', const='-', metavar='JSON',
+                        help="Skip the figures: write the series and criteria results as JSON "
+                             "(to stdout, or to JSON); plotting libraries are never imported")
+    parser.add_argument('--workers', type=int, default=min(os.cpu_count() or 1, len(FIGURES)),
+                        help="Processes used to render figures (1 = serial)")
+    parser.add_argument('--export', default=EXPORT_PROFILE,
+                        help=f"Export profile(s), comma-separated: {', '.join(EXPORT_PROFILES)}")
+    parser.add_argument('--force', action='store_true',
+                        help="Re-render every figure even if its inputs did not change")
+    parser.add_argument('--pool-days', type=int, default=POOLING_CONFIG['days'],
+                        help="Pool each year's +/- N days around a date into its evaluation (0 = off)")
+    parser.add_argument('--pool-weighting', choices=WINDOW_WEIGHTS, default=POOLING_CONFIG['weighting'],
+                        help="Weighting of the pooled days")
+    parser.add_argument('--hourly-profile', action='store_true',
+                        help="Render the hour x day probability heatmap for the event month")
+    parser.add_argument('--grid', action='store_true',
+                        help="Also render a probability map over GRID_CONFIG['bbox']")
+    parser.add_argument('--bbox', metavar='LAT_MIN,LON_MIN,LAT_MAX,LON_MAX',
+                        help="Bounding box for the probability map (implies --grid)")
+    parser.add_argument('--resolution', type=float, default=GRID_CONFIG['resolution'],
+                        help="Grid sample spacing in degrees (snapped to the POWER grid)")
+    parser.add_argument('--metrics-jsonl', metavar='PATH', default=METRICS_CONFIG['jsonl'],
+                        help="Append stage timings and counters to a JSON lines file")
+    parser.add_argument('--profile-dir', metavar='DIR', default=METRICS_CONFIG['profile_dir'],
+                        help="Write a cProfile dump per pipeline stage into DIR (renders serially)")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Record the tracemalloc peak of every pipeline stage")
+    args = parser.parse_args()
+
+    export_formats(args.export)  # fail fast on unknown or conflicting profiles
+    EXPORT_PROFILE = args.export
+
+    CACHE_CONFIG['offline'] = CACHE_CONFIG['offline'] or args.offline
+    CACHE_CONFIG['enabled'] = CACHE_CONFIG['enabled'] and not args.no_cache
+    STORE_CONFIG['enabled'] = STORE_CONFIG['enabled'] and not args.no_cache
+
+    HOURLY_PROFILE = HOURLY_PROFILE or args.hourly_profile
+
+    if args.pool_days < 0:
+        parser.error("--pool-days must be 0 or positive")
+    POOLING_CONFIG.update(days=args.pool_days, weighting=args.pool_weighting)
+
+    GRID_CONFIG['enabled'] = GRID_CONFIG['enabled'] or args.grid or args.bbox is not None
+    GRID_CONFIG['resolution'] = args.resolution
+    if args.bbox:
+        GRID_CONFIG['bbox'] = tuple(float(v) for v in args.bbox.split(','))
+        grid_cells(GRID_CONFIG['bbox'], GRID_CONFIG['resolution'])  # fail fast on a bad box
+
+    METRICS_CONFIG.update(jsonl=args.metrics_jsonl, profile_dir=args.profile_dir,
+                          trace_memory=METRICS_CONFIG['trace_memory'] or args.trace_memory)
+    METRICS.configure(**{k: METRICS_CONFIG[k] for k in ('jsonl', 'profile_dir', 'trace_memory')})
+    configure_logging()
+    if METRICS_CONFIG['profile_dir'] and args.workers > 1:
+        # Worker processes are not profiled; render in this process instead
+        METRICS.event('profiling', "   Profiling: rendering figures serially")
+        args.workers = 1
+
+    try:
+        if args.profiles:
+            main_profiles(args.profiles)
+        elif args.data_only:
+            main_data(args.data_only)
+        else:
+            main(workers=args.workers, force=args.force)
+    finally:
+        METRICS.close()
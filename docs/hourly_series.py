@@ -0,0 +1,76 @@
+"""
+Hourly climate values for one calendar month across years
+
+POWER hourly data is requested one month per year. Instead of keeping a
+single hour of a single day, every hour of the month is kept as one
+(years x 31 x 24) float array per parameter, so the pass probability of
+every hour of every day can be evaluated in one pass. Days past the end
+of a month (and -999 gaps) are NaN.
+"""
+
+import numpy as np
+
+# NASA POWER hourly parameter -> DataFrame column(s) used by the plots.
+# There is no hourly min/max: T2M feeds both temperature columns.
+HOURLY_PARAMETERS = {
+    'T2M': ('temp_max', 'temp_min'),
+    'PRECTOTCORR': ('precipitation',),
+    'WS10M': ('wind',),
+    'RH2M': ('humidity',)
+}
+
+DAYS_PER_MONTH = 31
+HOURS_PER_DAY = 24
+
+
+class HourlyMonth:
+    """
+    Every hour of one calendar month, per year
+
+    Args:
+        years: 1-D array of years
+        month: Calendar month (1-12)
+        data: Mapping of column name -> (len(years), 31, 24) float array
+    """
+
+    def __init__(self, years, month, data):
+        self.years = np.asarray(years, dtype=int)
+        self.month = month
+        self.data = {col: np.asarray(arr, dtype=float) for col, arr in data.items()}
+
+    @classmethod
+    def from_hour_arrays(cls, years, month, payloads):
+        """
+        Build from one parsed payload per year
+
+        payloads holds, for each year, a dict of POWER parameter -> float
+        array indexed by hour offset from the 1st of the month (as returned
+        by power_stream.parse_power_stream with hourly=True).
+        """
+        shape = (len(years), DAYS_PER_MONTH, HOURS_PER_DAY)
+        arrays = {power_name: np.full(shape, np.nan) for power_name in HOURLY_PARAMETERS}
+        for i, payload in enumerate(payloads):
+            for power_name in HOURLY_PARAMETERS:
+                values = payload.get(power_name)
+                if values is None:
+                    continue
+                days = min(len(values) // HOURS_PER_DAY, DAYS_PER_MONTH)
+                arrays[power_name][i, :days] = values[:days * HOURS_PER_DAY].reshape(days, HOURS_PER_DAY)
+
+        data = {column: arrays[power_name]
+                for power_name, columns in HOURLY_PARAMETERS.items() for column in columns}
+        return cls(years, month, data)
+
+    def for_hour(self, day, hour):
+        """
+        Per-year values for one day and hour of the month
+
+        Returns a DataFrame with one row per year that has complete data,
+        in the layout fetch_nasa_data returns.
+        """
+        import pandas as pd
+
+        df = pd.DataFrame({'year': self.years})
+        for col in self.data:
+            df[col] = self.data[col][:, day - 1, hour]
+        return df.dropna().reset_index(drop=True)
@@ -0,0 +1,121 @@
+"""
+Bounded in-memory cache with single-flight computation
+
+LRUCache keeps the most recently used entries of anything expensive to
+rebuild (parsed series, rendered figures, JSON responses). Its
+get_or_compute() also collapses concurrent misses: when several threads
+ask for the same missing key at once, one computes it and the others
+wait for that result instead of repeating the work (and the upstream
+fetch behind it).
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class _Flight:
+    """A computation in progress that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class LRUCache:
+    """
+    Thread-safe mapping that keeps at most maxsize entries
+
+    Args:
+        maxsize: Entries kept before the least recently used is evicted
+                 (None = unbounded)
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.flights = {}
+        self.hits = 0
+        self.misses = 0
+        self.collapsed = 0
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+    def __getitem__(self, key):
+        with self.lock:
+            value = self.entries[key]
+            self.entries.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            self._store(key, value)
+
+    def _store(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while self.maxsize is not None and len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def get_or_compute(self, key, compute):
+        """
+        Cached value for key, calling compute() on a miss
+
+        Concurrent callers for the same missing key share one compute()
+        call; if it raises, all of them see the exception and nothing is
+        cached.
+        """
+        with self.lock:
+            if key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return self.entries[key]
+            flight = self.flights.get(key)
+            if flight is None:
+                self.misses += 1
+                flight = self.flights[key] = _Flight()
+                leader = True
+            else:
+                self.collapsed += 1
+                leader = False
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                if flight.error is None:
+                    self._store(key, flight.value)
+                del self.flights[key]
+            flight.done.set()
+        return flight.value
+
+    def stats(self):
+        """Entry count, hits, misses and collapsed concurrent misses"""
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'collapsed': self.collapsed
+            }
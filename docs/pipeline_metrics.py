@@ -0,0 +1,225 @@
+"""
+Stage timers, counters and optional profiling for the pipeline
+
+Code wraps each unit of work in METRICS.stage(name) and bumps counters
+with METRICS.count(name, n). Stage timings are aggregated per name
+(calls, total, max) and, when a JSON lines file is configured, every
+stage is also written as one event as it finishes.
+
+Progress and errors go through METRICS.event(name, message, **fields):
+the event is written to the JSON lines file with its fields and the
+message is logged on the 'pipeline' logger, which the command-line
+entry points show on stderr (configure_logging). Library callers such
+as the analysis server see only warnings and errors.
+
+Profiling is opt-in:
+    profile_dir   cProfile per stage, accumulated over all calls of that
+                  stage and dumped as <profile_dir>/<stage>.prof
+    trace_memory  tracemalloc peak per stage (reset when the stage starts)
+
+Only stages opened on the main thread and not nested in another stage
+are profiled; cProfile cannot follow thread pools, and nested profilers
+would steal each other's hook. Memory peaks are process-wide, so they
+include whatever other threads allocate meanwhile.
+"""
+
+import cProfile
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+LOG = logging.getLogger('pipeline')
+
+
+def configure_logging(level=logging.INFO):
+    """Show pipeline events as plain lines on stderr (command-line entry points)"""
+    if not LOG.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        LOG.addHandler(handler)
+        LOG.propagate = False
+    LOG.setLevel(level)
+
+
+class Metrics:
+    """Thread-safe stage timings and counters for one process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.jsonl = None
+        self.profile_dir = None
+        self.trace_memory = False
+        self.keep_events = False  # only workers keep events, for drain()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far (configuration is kept)"""
+        with self.lock:
+            self.timings = {}    # stage -> [calls, total seconds, max seconds]
+            self.counters = {}
+            self.peaks = {}      # stage -> peak traced bytes
+            self.events = []
+            self.profiles = {}
+
+    def configure(self, jsonl=None, profile_dir=None, trace_memory=False):
+        """
+        Enable outputs
+
+        Args:
+            jsonl: Path of a JSON lines file that receives every event
+            profile_dir: Directory for per-stage cProfile dumps
+            trace_memory: Record the tracemalloc peak of every stage
+        """
+        if jsonl:
+            self.jsonl = open(jsonl, 'a', encoding='utf-8')
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+            self.profile_dir = profile_dir
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def emit(self, event):
+        if self.jsonl is not None:
+            line = json.dumps({'ts': round(time.time(), 3), **event}, default=str)
+            with self.lock:
+                self.jsonl.write(line + '\n')
+                self.jsonl.flush()
+
+    def event(self, name, message, level=logging.INFO, **fields):
+        """
+        Record a progress or error event
+
+        The JSON lines file gets {'event': name, 'level', 'message',
+        **fields}; the message is logged on the 'pipeline' logger.
+        """
+        self.emit({'event': name, 'level': logging.getLevelName(level).lower(), 'message': message, **fields})
+        LOG.log(level, message)
+
+    def add(self, name, seconds, **fields):
+        """Record one finished stage"""
+        with self.lock:
+            entry = self.timings.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+            if self.keep_events:
+                self.events.append((name, seconds, fields))
+        self.emit({'event': 'stage', 'stage': name, 'seconds': round(seconds, 6), **fields})
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def stage(self, name, **fields):
+        """Time a block as stage `name`; extra fields go into its event"""
+        depth = getattr(self.local, 'depth', 0)
+        top_level = depth == 0 and threading.current_thread() is threading.main_thread()
+
+        profiler = None
+        if top_level and self.profile_dir:
+            with self.lock:
+                profiler = self.profiles.setdefault(name, cProfile.Profile())
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is active (e.g. running under python -m cProfile)
+                profiler = None
+        if top_level and self.trace_memory:
+            tracemalloc.reset_peak()
+
+        self.local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.local.depth = depth
+            if profiler is not None:
+                profiler.disable()
+            if top_level and self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                with self.lock:
+                    self.peaks[name] = max(self.peaks.get(name, 0), peak)
+                fields = dict(fields, peak_mb=round(peak / 1e6, 3))
+            self.add(name, elapsed, **fields)
+
+    def worker_init(self):
+        """
+        Start clean in a worker process: forget what the parent had
+        recorded before forking and leave its outputs to the parent,
+        which replays what drain() returns
+        """
+        self.jsonl = None
+        self.profile_dir = None
+        self.keep_events = True
+        self.reset()
+
+    def drain(self):
+        """Return and clear the recorded stage events and counters (for worker processes)"""
+        with self.lock:
+            events, counters = self.events, self.counters
+            self.events, self.counters = [], {}
+        return events, counters
+
+    def replay(self, drained):
+        """Record events and counters drained in another process"""
+        events, counters = drained
+        for name, seconds, fields in events:
+            self.add(name, seconds, **fields)
+        for name, value in counters.items():
+            self.count(name, value)
+
+    def summary(self, extra=None):
+        """
+        Aggregated timings and counters as a dict; also emitted as a
+        'summary' event
+        """
+        with self.lock:
+            stages = {name: {'calls': calls, 'total_s': round(total, 6), 'max_s': round(longest, 6),
+                             **({'peak_mb': round(self.peaks[name] / 1e6, 3)} if name in self.peaks else {})}
+                      for name, (calls, total, longest) in self.timings.items()}
+            counters = dict(self.counters)
+        summary = {'stages': stages, 'counters': {**counters, **(extra or {})}}
+        self.emit({'event': 'summary', **summary})
+        return summary
+
+    def format_summary(self, summary):
+        """
+        Render a summary dict as a text table, slowest stage first
+
+        Totals add up every call, so stages that run on several threads
+        at once (http:*, read:*, parse) can exceed the wall time.
+        """
+        width = max([len(name) for name in list(summary['stages']) + list(summary['counters'])] + [5])
+        lines = [f"   {'stage':<{width}} {'calls':>6} {'total':>9} {'max':>9}" +
+                 (f" {'peak':>9}" if self.trace_memory else '')]
+        for name, s in sorted(summary['stages'].items(), key=lambda item: -item[1]['total_s']):
+            line = f"   {name:<{width}} {s['calls']:>6} {s['total_s']:8.3f}s {s['max_s']:8.3f}s"
+            if 'peak_mb' in s:
+                line += f" {s['peak_mb']:7.1f}MB"
+            lines.append(line)
+        for name, value in sorted(summary['counters'].items()):
+            lines.append(f"   {name:<{width}} {value:>6}")
+        return '\n'.join(lines)
+
+    def close(self):
+        """Write profile dumps and close the JSON lines file"""
+        if self.profile_dir:
+            for name, profiler in self.profiles.items():
+                profiler.dump_stats(os.path.join(self.profile_dir, re.sub(r'[^\w.-]+', '_', name) + '.prof'))
+        if self.jsonl is not None:
+            self.jsonl.close()
+            self.jsonl = None
+
+
+# Shared by every module of the process
+METRICS = Metrics()
@@ -0,0 +1,160 @@
+"""
+On-disk cache for NASA POWER API responses
+
+Response bodies are stored as gzip-compressed JSON files keyed by
+(endpoint, lat/lon snapped to the POWER grid, parameters, date range).
+The cache is bounded both by total size and by entry age; the least
+recently used entries are evicted first when the size limit is reached.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Native resolution of the MERRA-2 meteorology grid served by POWER
+# (degrees latitude, degrees longitude). Points inside the same cell
+# return identical data, so they share one cache entry.
+POWER_GRID = (0.5, 0.625)
+
+
+def snap_to_grid(latitude, longitude):
+    """Snap a coordinate to the center of its POWER grid cell"""
+    lat_step, lon_step = POWER_GRID
+    lat = round(round(latitude / lat_step) * lat_step, 4)
+    lon = round(round(longitude / lon_step) * lon_step, 4)
+    return lat, lon
+
+
+def _remove(path):
+    # Another worker may have evicted the same entry already
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ResponseCache:
+    """
+    Size- and age-bounded cache of POWER response bodies
+
+    Args:
+        cache_dir: Directory where cache entries are written
+        max_size_mb: Total size limit; oldest entries are evicted past it
+        max_age_days: Entries older than this are treated as misses
+        offline: Serve only from the cache, never touch the network
+    """
+
+    def __init__(self, cache_dir='.power_cache', max_size_mb=500, max_age_days=30, offline=False):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.max_age = max_age_days * 86400
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(endpoint, latitude, longitude, parameters, start, end):
+        """Build the cache key for one POWER request"""
+        lat, lon = snap_to_grid(latitude, longitude)
+        params = ','.join(sorted(parameters.split(',')))
+        raw = f'{endpoint}|{lat:.4f}|{lon:.4f}|{params}|{start}|{end}'
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.json.gz')
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def open(self, key):
+        """
+        Open the cached response body for key as a binary file
+
+        Returns None on a miss; the caller closes the file.
+        """
+        path = self._path(key)
+        try:
+            age = time.time() - os.path.getmtime(path)
+        except OSError:
+            self._count(False)
+            return None
+
+        if age > self.max_age and not self.offline:
+            # Stale entries are still served in offline mode
+            self._count(False)
+            return None
+
+        try:
+            f = gzip.open(path, 'rb')
+        except OSError:
+            self._count(False)
+            return None
+
+        # Touch the access time so eviction is least-recently-used
+        try:
+            os.utime(path, (time.time(), os.path.getmtime(path)))
+        except OSError:
+            pass
+        self._count(True)
+        return f
+
+    @contextmanager
+    def writer(self, key):
+        """
+        Binary file to stream a response body into
+
+        The entry only becomes visible once the block exits without an
+        exception, so a failed or invalid download is never cached.
+        """
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with gzip.open(tmp_path, 'wb', compresslevel=5) as f:
+                yield f
+        except BaseException:
+            _remove(tmp_path)
+            raise
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones over the size limit"""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json.gz'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if now - st.st_mtime > self.max_age:
+                _remove(path)
+                continue
+            entries.append((st.st_atime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            _remove(path)
+            total -= size
+
+    def stats(self):
+        """Hit/miss counters for this process"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,161 @@
+"""
+Concurrent HTTP client for the NASA POWER API
+
+A single pooled requests.Session is shared by a bounded thread pool.
+Requests go through an adaptive token bucket (the rate halves on every
+429 and recovers slowly on success) and are retried with jittered
+exponential backoff on 429/5xx and connection errors.
+
+The base URL is configurable so the client can be pointed at a local
+stub server, e.g. POWER_API_URL=http://127.0.0.1:8765/api
+"""
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from pipeline_metrics import METRICS
+
+POWER_API_URL = os.environ.get('POWER_API_URL', 'https://power.larc.nasa.gov/api')
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with additive-increase/multiplicative-decrease
+
+    Args:
+        rate: Maximum tokens added per second
+        capacity: Burst size
+        min_rate: Floor the rate never drops below after penalties
+    """
+
+    def __init__(self, rate, capacity=None, min_rate=0.2):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = min(min_rate, self.max_rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def penalize(self):
+        """Halve the rate after the server pushed back"""
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def reward(self):
+        """Recover the rate slowly after a successful request"""
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class PowerClient:
+    """
+    Pooled, rate-limited POWER client
+
+    Args:
+        max_workers: Maximum concurrent requests
+        rate_per_sec: Request rate ceiling shared by all workers
+        max_retries: Retries per request on 429/5xx/connection errors
+        backoff_base: First backoff ceiling in seconds (doubles per attempt)
+        backoff_cap: Largest backoff ceiling in seconds
+        timeout: Per-request timeout in seconds
+    """
+
+    def __init__(self, max_workers=8, rate_per_sec=5, max_retries=5,
+                 backoff_base=0.5, backoff_cap=30, timeout=30):
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate_per_sec)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            try:
+                return min(self.backoff_cap, float(retry_after))
+            except ValueError:
+                pass
+        # Full jitter: uniform in [0, base * 2^attempt]
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def get(self, url, params):
+        """
+        GET url, retrying transient failures
+
+        The response is streamed; iterate response.iter_content() and
+        close it (or use it as a context manager) when done.
+        """
+        for attempt in range(self.max_retries + 1):
+            with METRICS.stage('http:throttle'):
+                self.bucket.acquire()
+            METRICS.count('http_requests')
+            if attempt:
+                METRICS.count('http_retries')
+            try:
+                # Time to response headers; the body is timed by the caller as it is read
+                with METRICS.stage('http:wait'):
+                    response = self.session.get(url, params=params, timeout=self.timeout, stream=True)
+            except (requests.ConnectionError, requests.Timeout):
+                METRICS.count('http_errors')
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUS and attempt < self.max_retries:
+                response.close()
+                METRICS.count(f'http_{response.status_code}')
+                if response.status_code == 429:
+                    self.bucket.penalize()
+                time.sleep(self._backoff(attempt, response.headers.get('Retry-After')))
+                continue
+
+            try:
+                response.raise_for_status()
+            except requests.HTTPError:
+                response.close()
+                raise
+            self.bucket.reward()
+            return response
+
+    def map(self, fn, items):
+        """
+        Apply fn to every item with at most max_workers in flight
+
+        Results are returned in the order of items.
+        """
+        items = list(items)
+        if len(items) <= 1 or self.max_workers <= 1:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as pool:
+            return list(pool.map(fn, items))
+
+    def close(self):
+        self.session.close()
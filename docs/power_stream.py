@@ -0,0 +1,150 @@
+"""
+Streaming parser for NASA POWER JSON payloads
+
+POWER point responses look like
+    {..., "properties": {"parameter": {"T2M": {"2005010100": 24.1, ...}, ...}}, ...}
+
+Instead of building the nested dict with json.loads, the parser scans
+the byte stream chunk by chunk, converts each run of complete
+"key": value pairs with one NumPy call and writes the values straight
+into preallocated float arrays indexed by day (or hour) offset from the
+start of the request. Peak memory stays at one chunk plus the arrays.
+"""
+
+import re
+
+import numpy as np
+
+MISSING_VALUE = -999
+
+_PARAMETER_START = re.compile(rb'"parameter"\s*:\s*\{')
+_NAME_START = re.compile(rb'\s*"([A-Za-z0-9_]+)"\s*:\s*\{')
+_OBJECT_NEXT = re.compile(rb'\s*([,}])')
+
+# Quotes, colons and commas between pairs become whitespace for np.fromstring
+_SEPARATORS = bytes.maketrans(b'":,', b'   ')
+
+
+def days_from_civil(year, month, day):
+    """Days since 1970-01-01 for (arrays of) Gregorian dates"""
+    year = np.asarray(year, dtype=np.int64) - (np.asarray(month) <= 2)
+    era = np.floor_divide(year, 400)
+    yoe = year - era * 400
+    mp = (np.asarray(month, dtype=np.int64) + 9) % 12
+    doy = (153 * mp + 2) // 5 + np.asarray(day, dtype=np.int64) - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+class _Reader:
+    """Byte buffer refilled from an iterator of chunks"""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buf = b''
+        self.pos = 0
+
+    def fill(self):
+        """Append the next chunk; False at end of stream"""
+        for chunk in self.chunks:
+            if chunk:
+                self.buf = self.buf[self.pos:] + chunk
+                self.pos = 0
+                return True
+        return False
+
+    def match(self, pattern):
+        """Match pattern at the current position, reading more input as needed"""
+        while True:
+            m = pattern.match(self.buf, self.pos)
+            # A match ending at the buffer edge may still grow with more input
+            if m and m.end() < len(self.buf):
+                self.pos = m.end()
+                return m
+            if not self.fill():
+                if m:
+                    self.pos = m.end()
+                return m
+
+    def search(self, pattern):
+        while True:
+            m = pattern.search(self.buf, self.pos)
+            if m:
+                self.pos = m.end()
+                return m
+            # Keep a small tail in case the pattern straddles two chunks
+            self.pos = max(self.pos, len(self.buf) - 64)
+            if not self.fill():
+                return None
+
+
+def _store(text, out, slot_of):
+    """Parse a run of complete `"key": value` pairs into out"""
+    text = text.translate(_SEPARATORS).replace(b'null', b'nan')
+    flat = np.fromstring(text, dtype=float, sep=' ')
+    if len(flat) % 2:
+        raise ValueError("Malformed NASA POWER parameter object")
+    keys = flat[0::2].astype(np.int64)
+    values = flat[1::2]
+    values[values == MISSING_VALUE] = np.nan
+
+    slots = slot_of(keys)
+    inside = (slots >= 0) & (slots < len(out))
+    out[slots[inside]] = values[inside]
+
+
+def parse_power_stream(chunks, start, n_days, hourly=False):
+    """
+    Parse a POWER point payload into per-parameter arrays
+
+    Args:
+        chunks: Iterable of bytes (e.g. response.iter_content())
+        start: (year, month, day) of the first requested day
+        n_days: Number of days the request covers
+        hourly: Keys are YYYYMMDDHH instead of YYYYMMDD
+
+    Returns dict of POWER parameter name -> float array of length n_days
+    (or n_days * 24 when hourly), NaN where the value is missing.
+    """
+    origin = int(days_from_civil(*start))
+    per_day = 24 if hourly else 1
+    n_slots = n_days * per_day
+
+    def slot_of(keys):
+        if hourly:
+            hours = keys % 100
+            keys = keys // 100
+        day_offset = days_from_civil(keys // 10000, (keys // 100) % 100, keys % 100) - origin
+        return day_offset * per_day + (hours if hourly else 0)
+
+    reader = _Reader(chunks)
+    if reader.search(_PARAMETER_START) is None:
+        raise ValueError("Invalid response from NASA POWER API")
+
+    arrays = {}
+    while True:
+        m = reader.match(_NAME_START)
+        if m is None:
+            # Empty "parameter": {} or end of object
+            break
+        out = arrays[m.group(1).decode('ascii')] = np.full(n_slots, np.nan)
+
+        # Convert complete pairs in bulk until this parameter's closing brace
+        while True:
+            end = reader.buf.find(b'}', reader.pos)
+            if end >= 0:
+                _store(reader.buf[reader.pos:end], out, slot_of)
+                reader.pos = end + 1
+                break
+            last_comma = reader.buf.rfind(b',', reader.pos)
+            if last_comma >= 0:
+                _store(reader.buf[reader.pos:last_comma], out, slot_of)
+                reader.pos = last_comma + 1
+            if not reader.fill():
+                raise ValueError("Truncated NASA POWER payload")
+
+        nxt = reader.match(_OBJECT_NEXT)
+        if nxt is None or nxt.group(1) == b'}':
+            break
+
+    return arrays
@@ -0,0 +1,71 @@
+"""
+Probability maps over a bounding box
+
+A bounding box is sampled at the requested resolution and every sample
+point is snapped to its POWER grid cell, so a fine resolution never
+fetches the same cell twice. Once the daily series of every cell is
+available, the criteria are evaluated for all cells and years in a
+single vectorized pass.
+"""
+
+import numpy as np
+
+from climate_series import COLUMNS, day_of_year
+from criteria import pass_probability, valid_mask
+from power_cache import POWER_GRID
+
+
+def grid_cells(bbox, resolution):
+    """
+    Distinct POWER grid cells covering a bounding box
+
+    Args:
+        bbox: (lat_min, lon_min, lat_max, lon_max) in degrees
+        resolution: Spacing of the sample points in degrees
+
+    Returns a list of (lat, lon) cell centers, sorted south to north and
+    west to east.
+    """
+    lat_min, lon_min, lat_max, lon_max = bbox
+    if lat_min > lat_max or lon_min > lon_max:
+        raise ValueError(f"Invalid bounding box {bbox}: expected (lat_min, lon_min, lat_max, lon_max)")
+    if resolution <= 0:
+        raise ValueError("Grid resolution must be positive")
+
+    # Include the upper edge even when the span is not a multiple of the step
+    lats = np.append(np.arange(lat_min, lat_max, resolution), lat_max)
+    lons = np.append(np.arange(lon_min, lon_max, resolution), lon_max)
+    # Snapping is separate per axis, so the distinct cells are every pair of
+    # distinct row and column indices (np.round rounds half to even, as
+    # snap_to_grid does); only those few indices become Python floats
+    lat_step, lon_step = POWER_GRID
+    rows = np.unique(np.round(lats / lat_step)).tolist()
+    cols = np.unique(np.round(lons / lon_step)).tolist()
+    return [(round(row * lat_step, 4), round(col * lon_step, 4)) for row in rows for col in cols]
+
+
+def grid_probabilities(cells, series_list, month, day, criteria):
+    """
+    Pass probability of the criteria on one date for every grid cell
+
+    Args:
+        cells: (lat, lon) cell centers from grid_cells
+        series_list: DailySeries for each cell, covering the same years
+        month, day: Calendar date evaluated
+        criteria: Criteria dict (see CLIMATE_CRITERIA)
+
+    Returns a DataFrame with one row per cell: latitude, longitude,
+    probability (%) and years (number of years with complete data).
+    """
+    import pandas as pd
+
+    doy = day_of_year(month, day)
+    # cells x years arrays, one per column
+    data = {col: np.stack([series.values(col)[:, doy] for series in series_list]) for col in COLUMNS}
+
+    return pd.DataFrame({
+        'latitude': [lat for lat, _ in cells],
+        'longitude': [lon for _, lon in cells],
+        'probability': pass_probability(data, criteria, axis=1),
+        'years': valid_mask(data, criteria).sum(axis=1)
+    })
@@ -0,0 +1,133 @@
+"""
+Confidence intervals for pass probabilities
+
+A pass probability is k passing years out of n, usually with n around
+20, so the point estimate alone says little. Every function here takes
+arrays of counts (any shape, broadcast together) and returns lower and
+upper bounds in percent, so one call covers a single date, every date
+of a window, every grid cell or every profile.
+
+The bootstrap does not loop over resamples: resampling n pass/fail
+outcomes with replacement and counting the passes is exactly a draw from
+Binomial(n, k/n), so all resamples for all inputs come from a single
+rng.binomial call.
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+
+
+def _split(level):
+    alpha = 1 - level
+    return alpha / 2, 1 - alpha / 2
+
+
+def _counts(passes, total):
+    k, n = np.broadcast_arrays(np.asarray(passes, dtype=float), np.asarray(total, dtype=float))
+    return k, n
+
+
+def bootstrap_interval(passes, total, level=0.95, resamples=10000, seed=0):
+    """
+    Percentile bootstrap interval
+
+    Args:
+        passes: Number of passing samples (array-like)
+        total: Number of samples, same shape or broadcastable
+        level: Confidence level
+        resamples: Bootstrap resamples per input
+        seed: Seed for the random generator, so figures are reproducible
+
+    Returns (lower, upper) in percent; NaN where total is 0.
+    """
+    k, n = _counts(passes, total)
+    p = np.divide(k, n, out=np.zeros_like(k), where=n > 0)
+    n_int = n.astype(np.int64)
+
+    rng = np.random.default_rng(seed)
+    draws = rng.binomial(n_int, p, size=(resamples,) + k.shape)
+    rates = draws / np.maximum(n_int, 1) * 100
+
+    lower, upper = np.quantile(rates, _split(level), axis=0)
+    empty = n == 0
+    return np.where(empty, np.nan, lower), np.where(empty, np.nan, upper)
+
+
+def year_bootstrap_interval(passes, weights, level=0.95, resamples=10000, seed=0):
+    """
+    Percentile bootstrap over whole years for a pooled (weighted) rate
+
+    Pooled neighbouring days of the same year are correlated, so they
+    are not resampled one by one: each resample draws years with
+    replacement and recomputes sum(passes) / sum(weights).
+
+    Args:
+        passes: Weighted passing samples of each year (1-D)
+        weights: Weight of the complete samples of each year (1-D, > 0)
+        level: Confidence level
+        resamples: Bootstrap resamples
+        seed: Seed for the random generator, so figures are reproducible
+
+    Returns (lower, upper) in percent; NaN when there are no years.
+    """
+    passes, weights = np.asarray(passes, dtype=float), np.asarray(weights, dtype=float)
+    if len(passes) == 0:
+        return np.nan, np.nan
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(passes), size=(resamples, len(passes)))
+    rates = passes[picks].sum(axis=1) / weights[picks].sum(axis=1) * 100
+    lower, upper = np.quantile(rates, _split(level))
+    return lower, upper
+
+
+def wilson_interval(passes, total, level=0.95):
+    """Wilson score interval, returned as (lower, upper) in percent"""
+    k, n = _counts(passes, total)
+    z = NormalDist().inv_cdf(_split(level)[1])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = k / n
+        center = (p + z ** 2 / (2 * n)) / (1 + z ** 2 / n)
+        half = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / (1 + z ** 2 / n)
+    return (center - half) * 100, (center + half) * 100
+
+
+def beta_interval(passes, total, level=0.95, method='jeffreys'):
+    """
+    Beta-quantile interval, returned as (lower, upper) in percent
+
+    method is 'jeffreys' (Beta(1/2, 1/2) prior) or 'clopper-pearson'
+    (exact, conservative).
+    """
+    from scipy import stats
+
+    k, n = _counts(passes, total)
+    low_q, high_q = _split(level)
+    with np.errstate(invalid='ignore'):
+        if method == 'jeffreys':
+            lower = stats.beta.ppf(low_q, k + 0.5, n - k + 0.5)
+            upper = stats.beta.ppf(high_q, k + 0.5, n - k + 0.5)
+        elif method == 'clopper-pearson':
+            lower = stats.beta.ppf(low_q, k, n - k + 1)
+            upper = stats.beta.ppf(high_q, k + 1, n - k)
+        else:
+            raise ValueError(f"Unknown beta interval method '{method}'")
+    # The bounds are exact at the edges
+    lower = np.where(k == 0, 0.0, lower)
+    upper = np.where(k == n, 1.0, upper)
+    empty = n == 0
+    return np.where(empty, np.nan, lower * 100), np.where(empty, np.nan, upper * 100)
+
+
+def probability_intervals(passes, total, level=0.95, resamples=10000, seed=0):
+    """
+    All interval estimates for the same counts
+
+    Returns a dict of method name -> (lower, upper) in percent.
+    """
+    return {
+        'bootstrap': bootstrap_interval(passes, total, level, resamples, seed),
+        'wilson': wilson_interval(passes, total, level),
+        'jeffreys': beta_interval(passes, total, level, 'jeffreys'),
+        'clopper-pearson': beta_interval(passes, total, level, 'clopper-pearson'),
+    }
@@ -0,0 +1,249 @@
+"""
+Compact columnar on-disk store for daily climate series
+
+One directory per POWER grid cell:
+
+    <root>/<lat>_<lon>/
+        meta.json          start year, end year, coordinates
+        temp_max.npy       float32, shape (years, 366)
+        temp_min.npy
+        ...
+
+Each column is a plain .npy file, so a series can be opened as read-only
+memory maps and only the slices a job touches are paged in. New years are
+appended in place by growing the row count in the .npy header, without
+rewriting the existing data.
+
+meta.json also tracks years that came back with -999 gaps, so they can be
+re-requested on a backoff schedule instead of on every run.
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from climate_series import COLUMNS, DAYS_PER_YEAR, DailySeries
+from power_cache import snap_to_grid
+
+STORE_DTYPE = np.float32
+
+
+def cell_id(latitude, longitude):
+    """Directory name for the grid cell containing a point"""
+    lat, lon = snap_to_grid(latitude, longitude)
+    return f'{lat:+08.3f}_{lon:+09.3f}'
+
+
+def year_ranges(years):
+    """Group years into inclusive (first, last) runs of consecutive years"""
+    ranges = []
+    for year in sorted(years):
+        if ranges and year == ranges[-1][1] + 1:
+            ranges[-1][1] = year
+        else:
+            ranges.append([year, year])
+    return [tuple(r) for r in ranges]
+
+
+def _write_header(f, shape):
+    np.lib.format.write_array_header_1_0(
+        f, {'descr': np.lib.format.dtype_to_descr(np.dtype(STORE_DTYPE)),
+            'fortran_order': False, 'shape': shape})
+
+
+class SeriesStore:
+    """
+    Persisted per-location DailySeries
+
+    Args:
+        root: Directory holding one subdirectory per grid cell
+    """
+
+    def __init__(self, root='.series_store'):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _dir(self, latitude, longitude):
+        return os.path.join(self.root, cell_id(latitude, longitude))
+
+    def meta(self, latitude, longitude):
+        """Stored metadata for a location, or None if it is not stored"""
+        try:
+            with open(os.path.join(self._dir(latitude, longitude), 'meta.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, path, latitude, longitude, start_year, end_year, extra=None):
+        lat, lon = snap_to_grid(latitude, longitude)
+        meta = {'latitude': lat, 'longitude': lon,
+                'start_year': int(start_year), 'end_year': int(end_year),
+                'columns': COLUMNS, 'dtype': np.dtype(STORE_DTYPE).name}
+        meta.update({key: value for key, value in (extra or {}).items() if key not in meta})
+        tmp = os.path.join(path, 'meta.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, os.path.join(path, 'meta.json'))
+
+    def save(self, latitude, longitude, series, extra_meta=None):
+        """Write a whole series, replacing anything stored for the cell"""
+        path = self._dir(latitude, longitude)
+        os.makedirs(path, exist_ok=True)
+        for col in COLUMNS:
+            tmp = os.path.join(path, f'{col}.npy.tmp')
+            with open(tmp, 'wb') as f:
+                np.save(f, series.values(col).astype(STORE_DTYPE))
+            os.replace(tmp, os.path.join(path, f'{col}.npy'))
+        self._write_meta(path, latitude, longitude, series.years[0], series.years[-1], extra_meta)
+
+    def open(self, latitude, longitude, mmap=True):
+        """
+        Open a stored series
+
+        With mmap=True the columns are read-only memory maps; nothing is
+        read from disk until a slice is accessed.
+
+        Returns a DailySeries, or None if the location is not stored.
+        """
+        meta = self.meta(latitude, longitude)
+        if meta is None:
+            return None
+        path = self._dir(latitude, longitude)
+        data = {col: np.load(os.path.join(path, f'{col}.npy'), mmap_mode='r' if mmap else None)
+                for col in COLUMNS}
+        return DailySeries(np.arange(meta['start_year'], meta['end_year'] + 1), data)
+
+    def write(self, latitude, longitude, series, extra_meta=None):
+        """
+        Merge a series into the stored one
+
+        Years already stored are overwritten in place (NaN in the new
+        series keeps the stored value), years after the stored range are
+        appended, and a series that starts before the stored range falls
+        back to a full rewrite.
+        """
+        meta = self.meta(latitude, longitude)
+        if meta is None:
+            self.save(latitude, longitude, series, extra_meta)
+            return
+
+        start, end = meta['start_year'], meta['end_year']
+        new_start, new_end = int(series.years[0]), int(series.years[-1])
+        if new_start < start or new_start > end + 1:
+            # Gaps or earlier years: rebuild the full range in memory
+            merged = DailySeries.empty(min(start, new_start), max(end, new_end))
+            for source in (self.open(latitude, longitude, mmap=False), series):
+                rows = source.years - merged.years[0]
+                for col in COLUMNS:
+                    values = source.values(col)
+                    target = merged.data[col][rows]
+                    merged.data[col][rows] = np.where(np.isnan(values), target, values)
+            self.save(latitude, longitude, merged, {**meta, **(extra_meta or {})})
+            return
+
+        path = self._dir(latitude, longitude)
+        overlap = series.years <= end
+        for col in COLUMNS:
+            values = series.values(col).astype(STORE_DTYPE)
+            file_path = os.path.join(path, f'{col}.npy')
+
+            if overlap.any():
+                stored = np.load(file_path, mmap_mode='r+')
+                rows = series.years[overlap] - start
+                new = values[overlap]
+                stored[rows] = np.where(np.isnan(new), stored[rows], new)
+                stored.flush()
+                del stored
+
+            if (~overlap).any():
+                self._append_rows(file_path, values[~overlap])
+
+        self._write_meta(path, latitude, longitude, start, max(end, new_end), {**meta, **(extra_meta or {})})
+
+    @staticmethod
+    def _append_rows(file_path, rows):
+        """Append (n x 366) rows to a .npy file, growing its header shape in place"""
+        with open(file_path, 'r+b') as f:
+            np.lib.format.read_magic(f)
+            shape, _, _ = np.lib.format.read_array_header_1_0(f)
+            data_offset = f.tell()
+
+            f.seek(0)
+            _write_header(f, (shape[0] + len(rows), DAYS_PER_YEAR))
+            if f.tell() != data_offset:
+                # Header length changed: the data has to move, rewrite the file
+                f.seek(0)
+                existing = np.load(file_path)
+                f.seek(0)
+                f.truncate()
+                np.save(f, np.concatenate([existing, rows]))
+                return
+
+            f.seek(0, os.SEEK_END)
+            f.write(np.ascontiguousarray(rows, dtype=STORE_DTYPE).tobytes())
+
+    def update_meta(self, latitude, longitude, fields):
+        """Merge extra fields into a stored location's meta.json"""
+        meta = self.meta(latitude, longitude)
+        self._write_meta(self._dir(latitude, longitude), latitude, longitude,
+                         meta['start_year'], meta['end_year'], {**meta, **fields})
+
+    def empty_years(self, latitude, longitude):
+        """Stored years without a single value in any column"""
+        series = self.open(latitude, longitude)
+        if series is None:
+            return []
+        empty = np.ones(len(series.years), dtype=bool)
+        for col in COLUMNS:
+            empty &= np.isnan(series.data[col]).all(axis=1)
+        return series.years[empty].tolist()
+
+    def stale_years(self, latitude, longitude, start_year, end_year, retry_days, now=None):
+        """
+        Years in start_year..end_year that need to be (re-)requested
+
+        A year is stale when it is not stored yet (including the all-NaN
+        filler rows write() leaves between non-contiguous ranges), or when
+        it was stored with gaps and the wait for its next retry has
+        passed. A year that was fetched and came back empty is a gap
+        year like any other, so only filler rows, which have never been
+        requested and have no gap record, are stale regardless of the
+        backoff. retry_days lists the waits after the 1st, 2nd, ...
+        attempt; the last one repeats. An empty list disables gap retries.
+        """
+        wanted = set(range(start_year, end_year + 1))
+        meta = self.meta(latitude, longitude)
+        if meta is None:
+            return sorted(wanted)
+
+        gaps = meta.get('gaps', {})
+        stale = wanted - set(range(meta['start_year'], meta['end_year'] + 1))
+        stale |= wanted & {year for year in self.empty_years(latitude, longitude) if str(year) not in gaps}
+        if retry_days:
+            now = now or datetime.now()
+            for year, gap in gaps.items():
+                wait = retry_days[min(gap['attempts'], len(retry_days)) - 1]
+                if int(year) in wanted and now - datetime.fromisoformat(gap['checked']) >= timedelta(days=wait):
+                    stale.add(int(year))
+        return sorted(stale)
+
+    def record_gaps(self, latitude, longitude, years, now=None):
+        """
+        Update gap bookkeeping after years were fetched and written
+
+        Fetched years that are now complete are dropped from the gap list;
+        the others get their attempt count bumped.
+        """
+        series = self.open(latitude, longitude)
+        gaps = dict(self.meta(latitude, longitude).get('gaps', {}))
+        still_missing = set(series.gap_years().tolist())
+        checked = (now or datetime.now()).isoformat(timespec='seconds')
+        for year in years:
+            previous = gaps.pop(str(year), None)
+            if year in still_missing:
+                attempts = previous['attempts'] + 1 if previous else 1
+                gaps[str(year)] = {'attempts': attempts, 'checked': checked}
+        self.update_meta(latitude, longitude, {'gaps': dict(sorted(gaps.items()))})
+        return sorted(int(year) for year in gaps)
@@ -0,0 +1,190 @@
+"""
+Streaming pipeline of worker stages connected by bounded queues
+
+Each stage runs `workers` threads that take items from the stage's
+input queue, call the stage function and put every item it returns on
+the next stage's queue. Queues hold at most queue_size items, so a
+stage that runs ahead blocks (backpressure) instead of piling up work
+the next stage cannot take yet, and every stage starts on the first
+item as soon as it arrives instead of waiting for the whole batch.
+
+CPU-bound stages run their function in a process pool. Each of the
+stage's threads keeps exactly one call in flight, so the pool is never
+oversubscribed and its backlog stays in the bounded queue.
+
+Every stage records items, errors, busy time and throughput; every
+queue records its peak and average depth and how long producers were
+blocked putting into it.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Tells a stage thread that no more items will arrive
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of a Pipeline
+
+    Args:
+        name: Stage name used in the report
+        func: Called with one item; returns an iterable of items for the
+              next stage (an empty one drops the item)
+        workers: Items processed at the same time
+        processes: Run func in a process pool of `workers` processes
+                   (func, items and results must be picklable)
+        initializer: Process pool initializer (processes only)
+    """
+
+    def __init__(self, name, func, workers=1, processes=False, initializer=None):
+        if workers < 1:
+            raise ValueError(f"Stage '{name}' needs at least one worker")
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.processes = processes
+        self.initializer = initializer
+
+
+class StageQueue(queue.Queue):
+    """Bounded queue that records its depth and how long puts blocked"""
+
+    def __init__(self, maxsize):
+        super().__init__(maxsize)
+        self.peak = 0
+        self.depth_total = 0
+        self.puts = 0
+        self.blocked = 0.0
+
+    def put_item(self, item):
+        start = time.perf_counter()
+        self.put(item)
+        waited = time.perf_counter() - start
+        with self.mutex:
+            depth = self._qsize()
+            self.peak = max(self.peak, depth)
+            self.depth_total += depth
+            self.puts += 1
+            self.blocked += waited
+
+
+class Pipeline:
+    """
+    Run items through a list of Stages
+
+    Args:
+        stages: Stages in order; the last stage's outputs go to the sink
+        queue_size: Capacity of the queue in front of each stage
+    """
+
+    def __init__(self, stages, queue_size=8):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.stats = []
+
+    def run(self, items, sink=None, on_error=None):
+        """
+        Push items through every stage and wait for all of them
+
+        Args:
+            items: Iterable of inputs for the first stage
+            sink: Called (from a stage thread) with each output of the
+                  last stage; outputs are collected and returned when None
+            on_error: Called as on_error(stage name, item, exception)
+                      when a stage function raises; the item is dropped
+                      and the pipeline carries on
+
+        Per-stage statistics are left in self.stats (see report()).
+        """
+        results = []
+        sink = sink or results.append
+        lock = threading.Lock()
+        queues = [StageQueue(self.queue_size) for _ in self.stages]
+        self.stats = [{'stage': stage.name, 'workers': stage.workers, 'items': 0, 'outputs': 0, 'errors': 0,
+                       'busy_s': 0.0, 'started': None, 'finished': None} for stage in self.stages]
+
+        pools = {}
+        for k, stage in enumerate(self.stages):
+            if stage.processes:
+                pools[k] = ProcessPoolExecutor(max_workers=stage.workers, initializer=stage.initializer)
+                # With the fork start method the whole pool is forked on the
+                # first submit: do it now, before any stage thread exists
+                pools[k].submit(int).result()
+
+        def work(k):
+            stage, inbox, stats = self.stages[k], queues[k], self.stats[k]
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    return
+                start = time.perf_counter()
+                try:
+                    outputs = list(pools[k].submit(stage.func, item).result() if k in pools else stage.func(item))
+                    failed = False
+                except Exception as e:
+                    outputs, failed = [], True
+                    if on_error is not None:
+                        on_error(stage.name, item, e)
+                end = time.perf_counter()
+                with lock:
+                    stats['items'] += 1
+                    stats['outputs'] += len(outputs)
+                    stats['errors'] += failed
+                    stats['busy_s'] += end - start
+                    stats['started'] = start if stats['started'] is None else min(stats['started'], start)
+                    stats['finished'] = end if stats['finished'] is None else max(stats['finished'], end)
+                for output in outputs:
+                    if k + 1 < len(self.stages):
+                        queues[k + 1].put_item(output)
+                    else:
+                        try:
+                            sink(output)
+                        except Exception as e:
+                            if on_error is not None:
+                                on_error(stage.name, output, e)
+
+        threads = [[threading.Thread(target=work, args=(k,), name=f'{stage.name}-{n}', daemon=True)
+                    for n in range(stage.workers)] for k, stage in enumerate(self.stages)]
+        try:
+            for stage_threads in threads:
+                for thread in stage_threads:
+                    thread.start()
+            for item in items:
+                queues[0].put_item(item)
+            # Close the stages in order: a stage is done once everything
+            # upstream is done and it has drained its own queue
+            for k, stage_threads in enumerate(threads):
+                for _ in stage_threads:
+                    queues[k].put(_DONE)
+                for thread in stage_threads:
+                    thread.join()
+        finally:
+            for pool in pools.values():
+                pool.shutdown()
+
+        for stats, inbox in zip(self.stats, queues):
+            wall = (stats.pop('finished') - stats.pop('started')) if stats['items'] else 0.0
+            stats.update(
+                wall_s=wall,
+                per_second=stats['items'] / wall if wall > 0 else 0.0,
+                utilization=stats['busy_s'] / (wall * stats['workers']) if wall > 0 else 0.0,
+                queue_peak=inbox.peak,
+                queue_mean=inbox.depth_total / inbox.puts if inbox.puts else 0.0,
+                blocked_s=inbox.blocked
+            )
+        return results
+
+    def report(self):
+        """Per-stage statistics of the last run as a text table"""
+        width = max([len(s['stage']) for s in self.stats] + [5])
+        lines = [f"   {'stage':<{width}} {'workers':>7} {'items':>6} {'errors':>6} {'busy':>8} "
+                 f"{'items/s':>8} {'util':>5} {'queue max/avg':>14} {'blocked':>8}"]
+        for s in self.stats:
+            lines.append(f"   {s['stage']:<{width}} {s['workers']:>7} {s['items']:>6} {s['errors']:>6} "
+                         f"{s['busy_s']:7.2f}s {s['per_second']:8.2f} {s['utilization'] * 100:4.0f}% "
+                         f"{s['queue_peak']:>7}/{s['queue_mean']:<6.1f} {s['blocked_s']:7.2f}s")
+        return '\n'.join(lines)
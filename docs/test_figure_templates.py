@@ -0,0 +1,235 @@
+"""
+Templated figures against the original single-pass plotting code
+
+Run with: python -m pytest -q test_figure_templates.py
+
+Each reference function below is the plot function as it was before
+figures were split into layout and draw steps. The templated render,
+fresh and reused across datasets, must write the same PNG bytes.
+"""
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import generate_visualizations as gv
+
+gv.setup_plotting()
+plt = gv.plt
+
+
+def original_plot_1(df, ctx):
+    event_date = ctx['event_date']
+    location = ctx['location']
+    criteria = ctx['criteria']
+
+    fig, ax = plt.subplots(figsize=(14, 6))
+
+    is_hourly = event_date['hour'] is not None
+
+    if is_hourly:
+        ax.plot(df['year'], df['temp_max'], 'o-', color='#e74c3c',
+                linewidth=2, markersize=8, label=f'Temperature at {event_date["hour"]:02d}:00')
+    else:
+        ax.plot(df['year'], df['temp_max'], 'o-', color='#e74c3c',
+                linewidth=2, markersize=8, label='Maximum Temperature')
+        ax.plot(df['year'], df['temp_min'], 's-', color='#3498db',
+                linewidth=2, markersize=8, label='Minimum Temperature')
+
+    ax.axhline(y=criteria['temp_min'], color='green', linestyle='--', alpha=0.5,
+               label=f'Ideal Min ({criteria["temp_min"]}°C)')
+    ax.axhline(y=criteria['temp_max'], color='red', linestyle='--', alpha=0.5,
+               label=f'Max Safe ({criteria["temp_max"]}°C)')
+
+    ax.set_xlabel('Year', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Temperature (°C)', fontsize=12, fontweight='bold')
+
+    time_str = f" at {event_date['hour']:02d}:00" if is_hourly else ""
+    date_str = f"{event_date['month']:02d}/{event_date['day']:02d}"
+    ax.set_title(f'Temperature Over 20 Years - {date_str}{time_str}\n{location["name"]}',
+                 fontsize=14, fontweight='bold')
+    ax.legend(loc='upper left', fontsize=10)
+    ax.grid(True, alpha=0.3)
+
+    gv.save_figure(fig, '01_temperature_timeseries', ctx)
+
+
+def original_plot_2(df, ctx):
+    event_date = ctx['event_date']
+    criteria = ctx['criteria']
+
+    fig, ax = plt.subplots(figsize=(14, 6))
+
+    colors = ['green' if p <= criteria['precipitation_max'] else 'red' for p in df['precipitation']]
+    ax.bar(df['year'], df['precipitation'], color=colors, alpha=0.7, edgecolor='black')
+
+    ax.axhline(y=criteria['precipitation_max'], color='orange', linestyle='--', linewidth=2,
+               label=f'Maximum Acceptable ({criteria["precipitation_max"]}mm)')
+
+    ax.set_xlabel('Year', fontsize=12, fontweight='bold')
+    precip_unit = 'mm/hour' if event_date['hour'] is not None else 'mm/day'
+    ax.set_ylabel(f'Precipitation ({precip_unit})', fontsize=12, fontweight='bold')
+
+    time_str = f" at {event_date['hour']:02d}:00" if event_date['hour'] is not None else ""
+    date_str = f"{event_date['month']:02d}/{event_date['day']:02d}"
+    ax.set_title(f'Precipitation Pattern - {date_str}{time_str}\nGreen = Acceptable, Red = Too Much Rain',
+                 fontsize=14, fontweight='bold')
+    ax.legend(fontsize=10)
+    ax.grid(True, alpha=0.3, axis='y')
+
+    gv.save_figure(fig, '02_precipitation_pattern', ctx)
+
+
+def original_plot_3(df, ctx):
+    event_date = ctx['event_date']
+    location = ctx['location']
+    criteria = ctx['criteria']
+
+    fig, axes = plt.subplots(2, 2, figsize=(16, 10))
+
+    time_str = f" at {event_date['hour']:02d}:00" if event_date['hour'] is not None else ""
+    date_str = f"{event_date['month']:02d}/{event_date['day']:02d}"
+    fig.suptitle(f'Complete Climate Profile - {date_str}{time_str} ({location["name"]})',
+                 fontsize=16, fontweight='bold')
+
+    ax1 = axes[0, 0]
+    if event_date['hour'] is not None:
+        ax1.plot(df['year'], df['temp_max'], 'o-', color='#e74c3c',
+                 linewidth=2, markersize=6, label=f'Temperature at {event_date["hour"]:02d}:00')
+        ax1.set_title('Temperature', fontweight='bold')
+    else:
+        ax1.fill_between(df['year'], df['temp_min'], df['temp_max'], alpha=0.3, color='orange')
+        ax1.plot(df['year'], df['temp_max'], 'o-', color='red', label='Max')
+        ax1.plot(df['year'], df['temp_min'], 's-', color='blue', label='Min')
+        ax1.set_title('Temperature Range', fontweight='bold')
+    ax1.set_ylabel('Temperature (°C)', fontweight='bold')
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    ax2 = axes[0, 1]
+    ax2.scatter(df['year'], df['precipitation'], s=100, c=df['precipitation'],
+                cmap='Blues', edgecolors='black', linewidth=1)
+    ax2.axhline(y=1, color='red', linestyle='--', label='Max (1mm)')
+    ax2.set_ylabel('Precipitation (mm)', fontweight='bold')
+    ax2.set_title('Precipitation', fontweight='bold')
+    ax2.legend()
+    ax2.grid(True, alpha=0.3)
+
+    ax3 = axes[1, 0]
+    ax3.plot(df['year'], df['wind'], 'D-', color='green', linewidth=2, markersize=6)
+    ax3.axhline(y=criteria['wind_max'], color='orange', linestyle='--',
+                label=f'Max Safe ({criteria["wind_max"]}m/s)')
+    ax3.set_xlabel('Year', fontweight='bold')
+    ax3.set_ylabel('Wind Speed (m/s)', fontweight='bold')
+    ax3.set_title('Wind Speed', fontweight='bold')
+    ax3.legend()
+    ax3.grid(True, alpha=0.3)
+
+    ax4 = axes[1, 1]
+    ax4.plot(df['year'], df['humidity'], '^-', color='purple', linewidth=2, markersize=6)
+    ax4.axhline(y=criteria['humidity_max'], color='red', linestyle='--',
+                label=f'Max ({criteria["humidity_max"]}%)')
+    ax4.set_xlabel('Year', fontweight='bold')
+    ax4.set_ylabel('Humidity (%)', fontweight='bold')
+    ax4.set_title('Relative Humidity', fontweight='bold')
+    ax4.legend()
+    ax4.grid(True, alpha=0.3)
+
+    gv.save_figure(fig, '03_multi_parameter_dashboard', ctx)
+
+
+def dataset(seed, years=20, **ranges):
+    """
+    Per-year frame in the fetch_nasa_data layout, float32 like the stored
+    series, with each column drawn from its (low, high) range
+    """
+    ranges = {'temp': (18.0, 38.0), 'precipitation': (0.0, 8.0), 'wind': (2.0, 25.0), 'humidity': (40.0, 95.0),
+              **ranges}
+    rng = np.random.default_rng(seed)
+    temp = ranges.pop('temp')
+    middle = sum(temp) / 2
+    df = pd.DataFrame({
+        'year': np.arange(2025 - years, 2025),
+        'temp_max': rng.uniform(middle, temp[1], years).astype(np.float32),
+        'temp_min': rng.uniform(temp[0], middle, years).astype(np.float32),
+    })
+    for column, (low, high) in ranges.items():
+        df[column] = rng.uniform(low, high, years).astype(np.float32)
+    # Hit both ends of every range, so the margin cases really occur
+    df.loc[0, ['temp_min', *ranges]] = [temp[0]] + [low for low, _ in ranges.values()]
+    df.loc[len(df) - 1, ['temp_max', *ranges]] = [temp[1]] + [high for _, high in ranges.values()]
+    return df
+
+
+# Thresholds (CLIMATE_CRITERIA) inside the data range, outside it on
+# either side, and just outside it but inside the autoscale margins
+DATASETS = [
+    dataset(1),
+    dataset(2, 18, temp=(28.0, 34.0), precipitation=(1.2, 6.0), wind=(0.0, 10.0), humidity=(80.0, 98.0)),
+    dataset(3, temp=(27.2, 34.8), precipitation=(0.0, 0.97), wind=(5.0, 14.6), humidity=(50.0, 74.0)),
+    dataset(4, temp=(30.0, 44.0), precipitation=(3.0, 9.0), wind=(16.0, 30.0), humidity=(20.0, 60.0)),
+    dataset(5, 12, temp=(8.0, 24.0)),
+]
+
+
+def context(output_dir, hour=None, reuse=False, criteria=None):
+    ctx = gv.default_context()
+    ctx.update(output_dir=str(output_dir), export='draft', reuse_figures=reuse,
+               event_date=dict(ctx['event_date'], hour=hour))
+    if criteria is not None:
+        ctx['criteria'] = dict(ctx['criteria'], **criteria)
+    return ctx
+
+
+def read(directory, name):
+    return (directory / f'{name}.png').read_bytes()
+
+
+FIGURES = [
+    ('01_temperature_timeseries', original_plot_1, gv.plot_1_temperature_timeseries),
+    ('02_precipitation_pattern', original_plot_2, gv.plot_2_precipitation_pattern),
+    ('03_multi_parameter_dashboard', original_plot_3, gv.plot_3_multi_parameter_dashboard),
+]
+
+
+@pytest.mark.parametrize('hour', [None, 14])
+@pytest.mark.parametrize('name, original, templated', FIGURES, ids=[name for name, _, _ in FIGURES])
+def test_template_matches_original(tmp_path, name, original, templated, hour):
+    gv._figure_templates.clear()
+    for i, df in enumerate(DATASETS):
+        expected, fresh, reused = (tmp_path / f'{kind}{i}' for kind in ('original', 'fresh', 'reused'))
+        for directory in (expected, fresh, reused):
+            directory.mkdir()
+
+        original(df, context(expected, hour))
+        templated(df, context(fresh, hour))
+        # The same template is kept across all datasets
+        templated(df, context(reused, hour, reuse=True))
+
+        assert read(fresh, name) == read(expected, name), f'dataset {i}: fresh template differs'
+        assert read(reused, name) == read(expected, name), f'dataset {i}: reused template differs'
+    gv._figure_templates.clear()
+
+
+# A batch worker's sequence of locations: the template is rebuilt when
+# the mode or the criteria change and reused in between
+BATCH = [(None, None), (None, None), (14, None), (14, None),
+         (None, {'temp_max': 33, 'wind_max': 12}), (None, {'temp_max': 33, 'wind_max': 12}), (None, None)]
+
+
+@pytest.mark.parametrize('name, original, templated', FIGURES, ids=[name for name, _, _ in FIGURES])
+def test_reused_template_across_batch_matches_original(tmp_path, name, original, templated):
+    gv._figure_templates.clear()
+    for i, ((hour, criteria), df) in enumerate(zip(BATCH, DATASETS * 2)):
+        expected, reused = tmp_path / f'original{i}', tmp_path / f'reused{i}'
+        expected.mkdir()
+        reused.mkdir()
+
+        original(df, context(expected, hour, criteria=criteria))
+        templated(df, context(reused, hour, reuse=True, criteria=criteria))
+
+        assert read(reused, name) == read(expected, name), f'location {i}: reused template differs'
+    gv._figure_templates.clear()